@@ -19,9 +19,12 @@ router.post('/start', (req, res) => {
         // Spawn the python process
         // Detached: true allows the child process to run independently of the parent
         // stdio: 'ignore' or 'pipe' depending on if we want logs. Let's pipe for debug.
+        // FAST_START binds the port immediately and loads the model in the
+        // background, so the service is reachable well within the check below
         mlProcess = spawn(pythonCommand, [mlServicePath], {
             detached: false, // Keep attached so we can see output in dev
-            stdio: 'pipe'
+            stdio: 'pipe',
+            env: { ...process.env, FAST_START: '1' }
         });
 
         mlProcess.stdout.on('data', (data) => {
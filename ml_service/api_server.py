@@ -7,26 +7,76 @@ Endpoints:
   POST /predict/dmsw       — Single student prediction
   POST /predict            — Alias for /predict/dmsw
   POST /predict/batch      — Batch prediction for multiple students
+  POST /predict/stream     — Streamed NDJSON/CSV batch scoring (NDJSON out)
+  POST /predict/roster     — Incremental batch scoring (only changed students are scored)
   GET  /feature-importance — Feature importance rankings
   GET  /model/info         — Model metadata and version info
+  GET  /stats/batching     — Micro-batching queue metrics for /predict
+  GET  /stats/cache        — Prediction result cache hit/miss counters
+  GET  /health/ready       — Readiness probe (503 until the model is warmed up)
+  POST /admin/reload       — Reload model artifacts and swap them in atomically
+  GET  /metrics            — Prometheus metrics (per-stage latency, counters)
+  GET  /admin/profile      — Collapsed stacks from the sampling profiler (DELETE resets)
+  POST /students/<id>/weeks   — Append one week of attendance, grade and behaviour text
+  GET  /students/<id>/weeks   — The stored window for a student (DELETE forgets it)
+  POST /students/<id>/predict — Score a student from their stored weekly history
+
+Set FAST_START=1 to bind the port immediately and load + warm up the model on
+a background thread; /health reports liveness and readiness separately.
+
+Artifacts are served as one versioned bundle. POST /admin/reload (or, with
+ARTIFACT_WATCH_INTERVAL > 0, a change on disk) loads a new bundle in the
+background and swaps it in; in-flight requests finish on their old bundle.
+Set ADMIN_TOKEN to require a matching X-Admin-Token header on /admin routes.
+
+Set PROFILING=1 to sample the stacks of PROFILE_SAMPLE_RATE of requests (and
+of any request sent with "X-Debug-Profile: 1"); with it unset no profiling
+hooks are installed.
+
+Set DMSW_ENGINE to choose the inference backend: "numpy" evaluates the
+exported dmsw_model.npz without TensorFlow, "keras" loads dmsw_model.h5,
+"tflite" loads the quantized dmsw_model.tflite written by quantize_dmsw.py,
+and "auto" (default) prefers the NumPy weights when they exist.
 """
 
+import io
 import os
 import json
 import time
 import logging
 import pickle
+import random
+import sys
+import threading
 from datetime import datetime
 from functools import wraps
 
 import numpy as np
-import pandas as pd
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g, stream_with_context
 from flask_cors import CORS
 
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from artifacts import ArtifactBundle, ArtifactStore, fingerprint_files
+from columnar import ATTENDANCE_COL, GRADE_COL, STATIC_COLS, parse_student, parse_students
+from dmsw_engine import (
+    BEHAVIOR_PHRASES,
+    DMSW_TFLITE_PATH,
+    DMSW_WEIGHTS_PATH,
+    KerasDMSW,
+    NumpyDMSW,
+    TFLiteDMSW,
+    behavior_index,
+    behavior_tokens,
+    blend_risk,
+    risk_level,
+)
+from history_store import HistoryStore, HistoryStoreFull, parse_week
+from metrics import CONTENT_TYPE, REGISTRY, SIZE_BUCKETS, Counter, Gauge, Histogram
+from micro_batcher import MicroBatcher
+from prediction_cache import PredictionCache
+from profiler import SamplingProfiler
+from roster_state import RosterState
+from stream_io import iter_chunks, iter_csv_rows, iter_ndjson_rows
+from vocab import Vocabulary
 
 # ---------------------------------------------------------------------------
 # Logging setup
@@ -38,9 +88,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ml_api")
 
-# Suppress noisy TF logs
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
-tf.get_logger().setLevel("ERROR")
+# Suppress noisy TF logs (TensorFlow is only imported for the Keras engine)
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
 
 # ---------------------------------------------------------------------------
 # App setup
@@ -53,53 +102,218 @@ CORS(app)
 # ---------------------------------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DMSW_MODEL_PATH = os.path.join(BASE_DIR, "dmsw_model.h5")
-DMSW_TOKENIZER_PATH = os.path.join(BASE_DIR, "dmsw_tokenizer.pkl")
+DMSW_VOCAB_PATH = os.path.join(BASE_DIR, "dmsw_vocab.json")
 DMSW_SCALER_PATH = os.path.join(BASE_DIR, "dmsw_scaler.pkl")
 MODEL_METADATA_PATH = os.path.join(BASE_DIR, "model_metadata.json")
 
 # ---------------------------------------------------------------------------
-# Global model artifacts
+# Configuration
 # ---------------------------------------------------------------------------
-dmsw_model = None
-dmsw_tokenizer = None
-dmsw_scaler = None
-model_metadata = {}
-
 MAX_LEN = 15  # Sliding window length (weeks)
 
+_BEHAVIOR_KEYS = ("low", "mid", "high")
+_BEHAVIOR_LOOKUP = dict(zip(_BEHAVIOR_KEYS, BEHAVIOR_PHRASES))
 
-def load_artifacts():
-    """Load model, tokenizer, and scaler from disk."""
-    global dmsw_model, dmsw_tokenizer, dmsw_scaler, model_metadata
+DMSW_ENGINE = os.environ.get("DMSW_ENGINE", "auto").lower()  # auto | numpy | keras | tflite
+TFLITE_NUM_THREADS = int(os.environ.get("TFLITE_NUM_THREADS", "1"))
 
-    try:
-        if os.path.exists(DMSW_MODEL_PATH):
-            dmsw_model = load_model(DMSW_MODEL_PATH)
-            logger.info("DMSW model loaded successfully")
-        else:
-            logger.warning("DMSW model file not found at %s", DMSW_MODEL_PATH)
+# Deterministic scores are cached per (model version, feature tuple)
+# (PREDICTION_CACHE_SIZE=0 disables the cache, TTL of 0 means no expiry).
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
 
-        if os.path.exists(DMSW_TOKENIZER_PATH):
-            with open(DMSW_TOKENIZER_PATH, "rb") as f:
-                dmsw_tokenizer = pickle.load(f)
-            logger.info("Tokenizer loaded successfully")
+ARTIFACT_WATCH_INTERVAL = float(os.environ.get("ARTIFACT_WATCH_INTERVAL", "0"))  # seconds, 0 = off
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
 
-        if os.path.exists(DMSW_SCALER_PATH):
-            with open(DMSW_SCALER_PATH, "rb") as f:
-                dmsw_scaler = pickle.load(f)
-            logger.info("Scaler loaded successfully")
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))  # fraction of requests
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_HEADER = "X-Debug-Profile"
 
-        if os.path.exists(MODEL_METADATA_PATH):
-            with open(MODEL_METADATA_PATH, "r") as f:
-                model_metadata = json.load(f)
-            logger.info("Model metadata loaded")
+prediction_cache = (
+    PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+    if PREDICTION_CACHE_SIZE > 0 else None
+)
 
-    except Exception as e:
-        logger.error("Error loading artifacts: %s", e, exc_info=True)
+# Weekly histories posted to /students/<id>/weeks live in this process only
+HISTORY_MAX_STUDENTS = int(os.environ.get("HISTORY_MAX_STUDENTS", "100000"))
+history_store = HistoryStore(MAX_LEN, max_students=HISTORY_MAX_STUDENTS)
 
+# Last fingerprint, model version and result per student for /predict/roster
+ROSTER_MAX_STUDENTS = int(os.environ.get("ROSTER_MAX_STUDENTS", "100000"))
+roster_state = RosterState(ROSTER_MAX_STUDENTS)
 
-# Load on startup
-load_artifacts()
+# Prometheus metrics served at /metrics. Stages: parse (columnar parsing and
+# validation into the feature matrix), scaler, tokenizer (behaviour phrase ->
+# cached text branch), model and serialize (JSON encoding of the response).
+STAGE_SECONDS = Histogram(
+    "dmsw_stage_duration_seconds", "Time spent in each prediction pipeline stage.", ("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "dmsw_request_duration_seconds", "End-to-end request latency.", ("endpoint",)
+)
+REQUESTS = Counter(
+    "dmsw_requests_total", "HTTP requests by endpoint and status code.", ("endpoint", "status")
+)
+REQUEST_ERRORS = Counter(
+    "dmsw_request_errors_total", "Requests answered with a 4xx/5xx status.", ("endpoint", "status")
+)
+ROWS = Counter(
+    "dmsw_rows_total", "Students submitted to batch and stream endpoints.", ("endpoint", "outcome")
+)
+MODEL_BATCH_SIZE = Histogram(
+    "dmsw_model_batch_size", "Rows per model call.", buckets=SIZE_BUCKETS
+)
+MODEL_INFO = Gauge(
+    "dmsw_model_info", "Artifact bundle currently being served (always 1).", ("version", "engine")
+)
+
+# Startup progress reported by /health: not_loaded -> loading -> warming -> ready | failed
+startup_status = {
+    "state": "not_loaded",
+    "load_duration_ms": None,
+    "warmup_duration_ms": None,
+}
+_startup_thread = None
+
+
+# ---------------------------------------------------------------------------
+# Model artifacts
+# ---------------------------------------------------------------------------
+def _load_keras_model(path: str):
+    """Import TensorFlow lazily and load the Keras model."""
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    tf.get_logger().setLevel("ERROR")
+    return load_model(path)
+
+
+def _load_model():
+    """Return (model, engine_name) according to DMSW_ENGINE, or (None, None)."""
+    if DMSW_ENGINE == "tflite":
+        if os.path.exists(DMSW_TFLITE_PATH):
+            return TFLiteDMSW.load(DMSW_TFLITE_PATH, num_threads=TFLITE_NUM_THREADS), "tflite"
+        logger.warning("Quantized model not found at %s (run quantize_dmsw.py)", DMSW_TFLITE_PATH)
+        return None, None
+
+    use_numpy = DMSW_ENGINE == "numpy" or (
+        DMSW_ENGINE == "auto" and os.path.exists(DMSW_WEIGHTS_PATH)
+    )
+    if use_numpy:
+        if os.path.exists(DMSW_WEIGHTS_PATH):
+            return NumpyDMSW.load(DMSW_WEIGHTS_PATH), "numpy"
+        logger.warning("NumPy weights not found at %s (run dmsw_engine.py export)", DMSW_WEIGHTS_PATH)
+        return None, None
+
+    if os.path.exists(DMSW_MODEL_PATH):
+        return KerasDMSW(_load_keras_model(DMSW_MODEL_PATH)), "keras"
+    logger.warning("DMSW model file not found at %s", DMSW_MODEL_PATH)
+    return None, None
+
+
+def _artifact_paths() -> list[str]:
+    """Files that make up one artifact bundle (watched for hot-reload)."""
+    model_path = {"keras": DMSW_MODEL_PATH, "tflite": DMSW_TFLITE_PATH}.get(DMSW_ENGINE, DMSW_WEIGHTS_PATH)
+    return [model_path, DMSW_VOCAB_PATH, DMSW_SCALER_PATH, MODEL_METADATA_PATH]
+
+
+def _build_text_branch_cache(model, tokens: np.ndarray):
+    """
+    Run the text branch once per behaviour phrase and return (tokens, pooled).
+
+    The API only ever feeds one of the _BEHAVIOR_LOOKUP phrases (a single
+    token repeated MAX_LEN times), so the pooled text-branch output can be
+    computed once per phrase at load time.
+    """
+    pooled = model.text_features(np.repeat(tokens[:, np.newaxis], MAX_LEN, axis=1))
+    logger.info("Text-branch cache built for %d behaviour phrases", len(tokens))
+    return tokens, pooled
+
+
+def _load_bundle() -> ArtifactBundle:
+    """
+    Load model, vocabulary, scaler and metadata from disk into a new bundle.
+
+    Fused NumPy weights carry the scaler and the behaviour token IDs, so the
+    pickled scaler is not loaded for them; the vocabulary is still loaded when
+    present, to tokenize weekly behaviour text. Complete bundles get
+    one warm-up inference before they are returned, so they are already hot
+    when the store swaps them in.
+    """
+    started = time.perf_counter()
+    fingerprint = fingerprint_files(_artifact_paths())
+
+    model, engine_name = _load_model()
+    if model is not None:
+        logger.info("DMSW model loaded successfully (%s engine)", engine_name)
+
+    tokenizer = scaler = None
+    metadata = {}
+    fused = model is not None and model.fused
+
+    if os.path.exists(DMSW_VOCAB_PATH):
+        tokenizer = Vocabulary.load(DMSW_VOCAB_PATH)
+        logger.info("Vocabulary loaded successfully (%d words)", len(tokenizer))
+
+    if not fused and os.path.exists(DMSW_SCALER_PATH):
+        with open(DMSW_SCALER_PATH, "rb") as f:
+            scaler = pickle.load(f)
+        logger.info("Scaler loaded successfully")
+
+    if os.path.exists(MODEL_METADATA_PATH):
+        with open(MODEL_METADATA_PATH, "r") as f:
+            metadata = json.load(f)
+        logger.info("Model metadata loaded")
+
+    tokens = model.behavior_tokens if fused else None
+    if tokens is None and tokenizer is not None:
+        tokens = behavior_tokens(tokenizer)
+
+    behavior_text_features = None
+    if model is not None and tokens is not None:
+        tokens, behavior_text_features = _build_text_branch_cache(model, tokens)
+
+    bundle = ArtifactBundle(
+        model=model,
+        engine_name=engine_name,
+        tokenizer=tokenizer,
+        scaler=scaler,
+        metadata=metadata,
+        fingerprint=fingerprint,
+        behavior_tokens=tokens,
+        behavior_text_features=behavior_text_features,
+    )
+    bundle.timings["load_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    if bundle.complete:
+        if startup_status["state"] == "loading":
+            startup_status["state"] = "warming"
+        started = time.perf_counter()
+        _warm_up(bundle)
+        bundle.timings["warmup_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return bundle
+
+
+def _on_bundle_swap(bundle: ArtifactBundle):
+    # Keys carry the version, but dropping old entries frees the memory now
+    if prediction_cache is not None:
+        prediction_cache.clear()
+    MODEL_INFO.replace(1, bundle.version, bundle.engine_name)
+    history_store.set_vocabulary(bundle.tokenizer)
+
+
+artifact_store = ArtifactStore(_load_bundle, _artifact_paths(), on_swap=_on_bundle_swap)
+
+
+def load_artifacts() -> ArtifactBundle:
+    """Load artifacts from disk (single-flight) and make them current."""
+    return artifact_store.reload()
+
+
+def current_bundle() -> ArtifactBundle:
+    """The bundle a request should use from start to finish."""
+    return artifact_store.current
 
 
 # ---------------------------------------------------------------------------
@@ -107,19 +321,27 @@ load_artifacts()
 # ---------------------------------------------------------------------------
 @app.before_request
 def _start_timer():
-    g.start_time = time.time()
+    g.start_time = time.perf_counter()
 
 
 @app.after_request
 def _log_request(response):
-    duration_ms = (time.time() - g.get("start_time", time.time())) * 1000
+    duration = time.perf_counter() - g.get("start_time", time.perf_counter())
     logger.info(
         "%s %s — %s (%.1f ms)",
         request.method,
         request.path,
         response.status,
-        duration_ms,
+        duration * 1000,
     )
+
+    # Label by route pattern, not raw path, to keep label cardinality bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    status = str(response.status_code)
+    REQUESTS.inc(endpoint, status)
+    REQUEST_SECONDS.observe(duration, endpoint)
+    if response.status_code >= 400:
+        REQUEST_ERRORS.inc(endpoint, status)
     return response
 
 
@@ -128,140 +350,111 @@ def _log_request(response):
 # ---------------------------------------------------------------------------
 def _get_risk_level(dropout_prob: float) -> str:
     """Map dropout probability to a 4-tier risk level."""
-    if dropout_prob >= 0.70:
-        return "CRITICAL"
-    elif dropout_prob >= 0.50:
-        return "HIGH"
-    elif dropout_prob >= 0.30:
-        return "MEDIUM"
-    else:
-        return "LOW"
-
-
-def _safe_float(value, default: float = 0.0) -> float:
-    """Safely convert a value to float."""
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return default
-
-
-def _safe_int(value, default: int = 0) -> int:
-    """Safely convert a value to int."""
-    try:
-        return int(float(value))
-    except (TypeError, ValueError):
-        return default
+    return risk_level(dropout_prob)
 
 
-def _validate_student_data(data: dict) -> list[str]:
-    """Return a list of validation error messages (empty = valid)."""
-    errors = []
-    if not isinstance(data, dict):
-        return ["Request body must be a JSON object"]
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "1024"))
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "512"))
 
-    attendance = _safe_float(data.get("attendance"), -1)
-    if attendance < 0 or attendance > 100:
-        errors.append("attendance must be between 0 and 100")
+# Concurrent /predict calls arriving within this window share one model call
+# (0 disables micro-batching).
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "64"))
 
-    avg_grade = _safe_float(data.get("avgGrade"), -1)
-    if avg_grade < 0 or avg_grade > 100:
-        errors.append("avgGrade must be between 0 and 100")
 
-    courses_enrolled = _safe_int(data.get("coursesEnrolled"), -1)
-    if courses_enrolled < 0:
-        errors.append("coursesEnrolled must be a non-negative integer")
+def _behavior_index(grade: np.ndarray) -> np.ndarray:
+    """Map grades to an index into _BEHAVIOR_KEYS (low / mid / high)."""
+    return behavior_index(grade)
 
-    courses_passed = _safe_int(data.get("coursesPassed"), -1)
-    if courses_passed < 0:
-        errors.append("coursesPassed must be a non-negative integer")
 
-    if courses_enrolled >= 0 and courses_passed > courses_enrolled:
-        errors.append("coursesPassed cannot exceed coursesEnrolled")
+def _history_window(numeric: np.ndarray) -> np.ndarray:
+    """Repeat each (attendance, grade) row across the window -> (N, 15, 2)."""
+    return np.repeat(numeric[:, np.newaxis, :], MAX_LEN, axis=1)
 
-    return errors
 
-
-_BEHAVIOR_LOOKUP = {
-    "low": "Struggling with concepts",
-    "mid": "Regular attendance",
-    "high": "Active participation",
-}
+def _blend_risk(raw_prob: np.ndarray, features: np.ndarray) -> np.ndarray:
+    """
+    Blend raw model probabilities (N,) with heuristic penalties from a (N, 9)
+    feature matrix and return the calibrated dropout probabilities (N,).
+    """
+    return blend_risk(raw_prob, features)
 
 
-def _predict_single(student_data: dict) -> dict:
+def _score_features(features: np.ndarray, bundle: ArtifactBundle) -> np.ndarray:
     """
-    Run the DMSW model for one student and return prediction dict.
+    Score a (N, 9) feature matrix with one scaler and model call (no scaler
+    call when the model has the scaler folded in).
 
     History generation is **deterministic**: attendance and grade are held
     constant across all 15 weeks (no random noise) so the same input always
-    produces the same output.
+    produces the same output. Returns the blended dropout probabilities (N,).
     """
-    # --- Static features ---
-    age = _safe_int(student_data.get("age", 20), 20)
-    gender = 1 if str(student_data.get("gender", "Male")).lower() == "male" else 0
-
-    scholarship_val = student_data.get("scholarship", "0")
-    scholarship = 1 if str(scholarship_val) in ("1", "yes", "Yes", "true", "True") else 0
-
-    debt_val = student_data.get("debtor", "0")
-    debt = 1 if str(debt_val) in ("1", "yes", "Yes", "true", "True") else 0
-
-    tuition_val = student_data.get("tuitionUpToDate", "1")
-    tuition_up_to_date = 1 if str(tuition_val) in ("1", "yes", "Yes", "true", "True") else 0
-
-    courses_enrolled = _safe_int(student_data.get("coursesEnrolled", 5), 5)
-    courses_passed = _safe_int(student_data.get("coursesPassed", 5), 5)
-
-    X_static = np.array([[age, gender, scholarship, debt, tuition_up_to_date,
-                          courses_enrolled, courses_passed]])
-
-    # --- Deterministic 15-week history ---
-    attendance = _safe_float(student_data.get("attendance", 0))
-    grade = _safe_float(student_data.get("avgGrade", 0))
-
-    # Constant values across all 15 time steps → deterministic output
-    history_num = np.array([[attendance, grade]] * MAX_LEN)
-
-    # Behavioural text (deterministic mapping)
-    if grade < 50:
-        behavior = _BEHAVIOR_LOOKUP["low"]
-    elif grade > 80:
-        behavior = _BEHAVIOR_LOOKUP["high"]
-    else:
-        behavior = _BEHAVIOR_LOOKUP["mid"]
+    X_static = features[:, STATIC_COLS]
+    grade = features[:, GRADE_COL]
+    MODEL_BATCH_SIZE.observe(len(features))
 
     # --- Preprocessing: numerical ---
-    history_num_scaled = dmsw_scaler.transform(history_num)
-    X_num = np.expand_dims(history_num_scaled, axis=0)  # (1, 15, 2)
-
-    # --- Preprocessing: text ---
-    seq = dmsw_tokenizer.texts_to_sequences([behavior])[0]
-    token = seq[0] if seq else 0
-    X_text = np.array([[token] * MAX_LEN])  # (1, 15)
-
-    # --- Predict ---
-    raw_prob = float(dmsw_model.predict([X_num, X_text, X_static], verbose=0)[0][0])
-
-    # --- Post-prediction risk adjustment ---
-    # The raw model underestimates risk for low-attendance students.
-    # Blend model output with heuristic penalties to produce a calibrated score.
-    attendance_penalty = max(0.0, (60 - attendance) / 60) if attendance < 60 else 0.0
-    grade_penalty = max(0.0, (50 - grade) / 50) if grade < 50 else 0.0
-    pass_rate = courses_passed / max(courses_enrolled, 1)
-    pass_penalty = max(0.0, (0.5 - pass_rate) / 0.5) if pass_rate < 0.5 else 0.0
-    socio_penalty = (0.15 if debt else 0.0) + (0.15 if not tuition_up_to_date else 0.0)
-
-    heuristic_risk = (
-        attendance_penalty * 0.35
-        + grade_penalty * 0.30
-        + pass_penalty * 0.20
-        + socio_penalty
-    )
-    heuristic_risk = min(heuristic_risk, 1.0)
-
-    # Blend: model gets 30% weight, heuristic gets 70% (model is poorly calibrated)
-    prediction_prob = min(raw_prob * 0.3 + heuristic_risk * 0.7, 1.0)
+    # Every week holds the same (attendance, grade) pair, so scaling one row per
+    # student and broadcasting it is equivalent to scaling the full window.
+    t0 = time.perf_counter()
+    numeric = features[:, [ATTENDANCE_COL, GRADE_COL]]
+    if not bundle.model.fused:
+        numeric = bundle.scaler.transform(numeric)
+    X_num = _history_window(numeric)
+    t1 = time.perf_counter()
+
+    # --- Text branch: cached pooled vectors per behaviour phrase ---
+    text_features = bundle.behavior_text_features[_behavior_index(grade)]  # (N, 64)
+    t2 = time.perf_counter()
+
+    # --- Predict (numeric + static branches and fusion head only) ---
+    raw_prob = bundle.model.predict_with_text_features(
+        X_num, text_features, X_static, batch_size=BATCH_CHUNK_SIZE
+    ).reshape(-1).astype(np.float64)
+    t3 = time.perf_counter()
+
+    STAGE_SECONDS.observe(t1 - t0, "scaler")
+    STAGE_SECONDS.observe(t2 - t1, "tokenizer")
+    STAGE_SECONDS.observe(t3 - t2, "model")
+
+    return _blend_risk(raw_prob, features)
+
+
+def _score_history(features: tuple, numeric: np.ndarray, tokens: np.ndarray,
+                   bundle: ArtifactBundle) -> float:
+    """
+    Score one student from a stored window: raw (MAX_LEN, 2) attendance and
+    grade plus (MAX_LEN,) behaviour token IDs, oldest week first. ``features``
+    supplies the static columns and the values the heuristic blend uses.
+    """
+    t0 = time.perf_counter()
+    if not bundle.model.fused:
+        numeric = bundle.scaler.transform(numeric)
+    t1 = time.perf_counter()
+
+    # Real weeks carry arbitrary text, so the text branch runs on the window
+    text_features = bundle.model.text_features(tokens[np.newaxis, :])
+    t2 = time.perf_counter()
+
+    X_static = np.array([features[STATIC_COLS]], dtype=np.float64)
+    raw_prob = bundle.model.predict_with_text_features(
+        numeric[np.newaxis], text_features, X_static
+    ).reshape(-1).astype(np.float64)
+    t3 = time.perf_counter()
+
+    STAGE_SECONDS.observe(t1 - t0, "scaler")
+    STAGE_SECONDS.observe(t2 - t1, "tokenizer")
+    STAGE_SECONDS.observe(t3 - t2, "model")
+    MODEL_BATCH_SIZE.observe(1)
+
+    return float(_blend_risk(raw_prob, np.array([features], dtype=np.float64))[0])
+
+
+def _build_result(features: tuple, prediction_prob: float) -> dict:
+    """Assemble the API response for one student from its features and score."""
+    (_, _, _, _, tuition_up_to_date,
+     courses_enrolled, courses_passed, attendance, grade) = features
+    prediction_prob = float(prediction_prob)
     risk_level = _get_risk_level(prediction_prob)
 
     # --- Explanations ---
@@ -293,32 +486,409 @@ def _predict_single(student_data: dict) -> dict:
     }
 
 
+def _score_batch(features_list: list, bundle: ArtifactBundle) -> np.ndarray:
+    """Score a list of feature tuples -> probabilities."""
+    return _score_features(np.array(features_list, dtype=np.float64), bundle)
+
+
+def _score_cached(features_list: list, bundle: ArtifactBundle) -> np.ndarray:
+    """Score feature tuples, answering repeats from the prediction cache."""
+    if prediction_cache is None:
+        return _score_batch(features_list, bundle)
+
+    version = bundle.version
+    probs = np.empty(len(features_list), dtype=np.float64)
+    misses = []
+    for i, features in enumerate(features_list):
+        cached = prediction_cache.get((version,) + features)
+        if cached is None:
+            misses.append(i)
+        else:
+            probs[i] = cached
+
+    if misses:
+        scored = _score_batch([features_list[i] for i in misses], bundle)
+        for i, prob in zip(misses, scored):
+            probs[i] = prob
+            prediction_cache.put((version,) + features_list[i], float(prob))
+    return probs
+
+
+def _score_micro_batch(items: list) -> list:
+    """
+    Batch function for the micro-batcher: (bundle, features) items -> probabilities.
+
+    Items queued across an artifact swap are scored against the bundle their
+    request started with.
+    """
+    probs = [None] * len(items)
+    by_bundle = {}
+    for i, (bundle, features) in enumerate(items):
+        by_bundle.setdefault(id(bundle), (bundle, []))[1].append(i)
+    for bundle, indices in by_bundle.values():
+        scored = _score_batch([items[i][1] for i in indices], bundle)
+        if len(scored) != len(indices):
+            raise ValueError(f"Model returned {len(scored)} scores for {len(indices)} students")
+        for i, prob in zip(indices, scored):
+            probs[i] = float(prob)
+    return probs
+
+
+_micro_batcher = (
+    MicroBatcher(_score_micro_batch, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WINDOW_MS, name="predict-batcher")
+    if MICRO_BATCH_WINDOW_MS > 0 else None
+)
+
+
+def _parse_student(student_data) -> tuple[tuple, list[str]]:
+    """Parse one student; returns (feature tuple, validation errors)."""
+    started = time.perf_counter()
+    parsed = parse_student(student_data)
+    STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+    return parsed
+
+
+def _predict_single(features: tuple, bundle: ArtifactBundle = None) -> dict:
+    """Run the DMSW model for one student's parsed features and return prediction dict."""
+    bundle = bundle or current_bundle()
+    key = (bundle.version,) + features
+    prob = prediction_cache.get(key) if prediction_cache is not None else None
+    if prob is None:
+        if _micro_batcher is not None:
+            prob = _micro_batcher.submit((bundle, features))
+        else:
+            prob = float(_score_batch([features], bundle)[0])
+        if prediction_cache is not None:
+            prediction_cache.put(key, prob)
+    return _build_result(features, prob)
+
+
+def _student_id(student_data, idx: int):
+    """Best-effort identifier for a batch row."""
+    if isinstance(student_data, dict):
+        return student_data.get("id", student_data.get("student_id", f"student_{idx}"))
+    return f"student_{idx}"
+
+
+def _score_rows(indexed_rows, bundle: ArtifactBundle) -> tuple[dict, list]:
+    """
+    Score ``(index, student_data)`` pairs in chunks of BATCH_CHUNK_SIZE.
+
+    All rows are parsed and validated in one columnar pass. Rows already in
+    the prediction cache are answered from it; only the misses of each chunk
+    go through the model. Returns the prediction dicts keyed by index, plus an
+    error entry for every row that fails validation (with the same details as
+    /predict) or fails to score. When a chunk's model call raises, that chunk
+    is scored again row by row, so only the rows that fail get an error.
+
+    Error entries carry ``index``, ``student_id`` (as in the predictions),
+    ``error`` and, for validation failures, ``details``.
+    """
+    results = {}
+    errors = []
+
+    started = time.perf_counter()
+    indexed_rows = list(indexed_rows)
+    students = parse_students([student_data for _, student_data in indexed_rows])
+    feature_rows = students.features.tolist()
+    parsed = []  # (idx, student_data, features)
+    for row, (idx, student_data) in enumerate(indexed_rows):
+        if students.valid[row]:
+            parsed.append((idx, student_data, tuple(feature_rows[row])))
+        else:
+            errors.append({
+                "index": idx,
+                "student_id": _student_id(student_data, idx),
+                "error": "Validation failed",
+                "details": students.row_errors(row),
+            })
+    STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+
+    for start in range(0, len(parsed), BATCH_CHUNK_SIZE):
+        chunk = parsed[start:start + BATCH_CHUNK_SIZE]
+        try:
+            probs = _score_cached([features for _, _, features in chunk], bundle)
+        except Exception:
+            logger.warning("Chunk of %d rows failed to score; retrying row by row", len(chunk), exc_info=True)
+            probs = None
+
+        for row, (idx, student_data, features) in enumerate(chunk):
+            if probs is not None:
+                prob = probs[row]
+            else:
+                try:
+                    prob = _score_cached([features], bundle)[0]
+                except Exception as e:
+                    errors.append({"index": idx, "student_id": _student_id(student_data, idx), "error": str(e)})
+                    continue
+            result = _build_result(features, prob)
+            result["student_id"] = _student_id(student_data, idx)
+            results[idx] = result
+
+    return results, errors
+
+
+def _predict_many(students: list, bundle: ArtifactBundle = None,
+                  index_offset: int = 0) -> tuple[list, list]:
+    """
+    Score a list of students; returns (predictions in input order, errors by index).
+
+    ``index_offset`` shifts the reported indices when ``students`` is a slice
+    of a larger request.
+    """
+    bundle = bundle or current_bundle()
+    results, errors = _score_rows(enumerate(students, start=index_offset), bundle)
+    errors.sort(key=lambda e: e["index"])
+    predictions = [results[idx] for idx in sorted(results)]
+    return predictions, errors
+
+
+def _roster_id(student_data):
+    """The explicit ``id`` / ``student_id`` of a roster row, or None."""
+    if not isinstance(student_data, dict):
+        return None
+    student_id = student_data.get("id", student_data.get("student_id"))
+    return student_id if isinstance(student_id, (str, int)) else None
+
+
+def _score_roster(students: list, bundle: ArtifactBundle) -> tuple[list, list, int]:
+    """
+    Score a full roster incrementally; returns (predictions, errors, reused).
+
+    Every row is parsed once and fingerprinted by the bytes of its feature
+    row. Rows whose student ID was last scored with the same fingerprint and
+    model version reuse that result; the rest (changed, new, stale, invalid
+    or without an ID) go through _score_rows and are remembered for next time.
+    """
+    version = bundle.version
+
+    started = time.perf_counter()
+    parsed = parse_students(students)
+    features = np.ascontiguousarray(parsed.features)
+    width = features.shape[1] * features.itemsize
+    feature_bytes = features.tobytes()
+    STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+
+    reused = {}
+    changed = []
+    fingerprints = {}  # row -> (student ID, fingerprint) to remember after scoring
+    for row, student_data in enumerate(students):
+        student_id = _roster_id(student_data)
+        if student_id is not None and parsed.valid[row]:
+            fingerprint = feature_bytes[row * width:(row + 1) * width]
+            result = roster_state.lookup(student_id, fingerprint, version)
+            if result is not None:
+                reused[row] = result
+                continue
+            fingerprints[row] = (student_id, fingerprint)
+        changed.append((row, student_data))
+
+    results, errors = _score_rows(changed, bundle)
+    for row, result in results.items():
+        if row in fingerprints:
+            student_id, fingerprint = fingerprints[row]
+            roster_state.store(student_id, fingerprint, version, result)
+
+    results.update(reused)
+    errors.sort(key=lambda e: e["index"])
+    predictions = [results[row] for row in sorted(results)]
+    return predictions, errors, len(reused)
+
+
+def _stream_predictions(rows, bundle: ArtifactBundle):
+    """
+    Score an iterator of rows STREAM_CHUNK_SIZE at a time, yielding NDJSON lines.
+
+    Each input row produces exactly one line, in input order: the prediction
+    (with its ``index``) or an inline error. A final ``summary`` line carries
+    the counts. Only one chunk is held in memory at a time.
+    """
+    total = failed = 0
+    for chunk in iter_chunks(enumerate(rows), STREAM_CHUNK_SIZE):
+        lines = {}
+        valid = []
+        for idx, row in chunk:
+            if isinstance(row, Exception):
+                lines[idx] = {"index": idx, "student_id": f"student_{idx}", "error": str(row)}
+            else:
+                valid.append((idx, row))
+
+        results, errors = _score_rows(valid, bundle)
+        for error in errors:
+            lines[error["index"]] = error
+        for idx, result in results.items():
+            lines[idx] = {"index": idx, **result}
+
+        started = time.perf_counter()
+        out = []
+        chunk_failed = 0
+        for idx, _ in chunk:
+            line = lines[idx]
+            if "error" in line:
+                chunk_failed += 1
+                line = {"success": False, **line}
+            out.append(json.dumps(line) + "\n")
+        STAGE_SECONDS.observe(time.perf_counter() - started, "serialize")
+        ROWS.inc("/predict/stream", "scored", amount=len(chunk) - chunk_failed)
+        ROWS.inc("/predict/stream", "error", amount=chunk_failed)
+        total += len(chunk)
+        failed += chunk_failed
+        yield "".join(out)
+
+    yield json.dumps({"summary": {"total": total, "scored": total - failed, "errors": failed}}) + "\n"
+
+
+def _model_unavailable_error() -> str | None:
+    """
+    Return an error message if no complete artifact bundle is available.
+
+    Loading never happens on the request path: a missing bundle triggers a
+    background reload and the caller should answer 503.
+    """
+    if current_bundle().complete:
+        return None
+    if startup_status["state"] in ("loading", "warming") or artifact_store.loading:
+        return "DMSW model is still loading. Retry shortly."
+    artifact_store.reload_async()
+    return "DMSW model not loaded. Run train_dmsw.py first."
+
+
 def _ensure_model_loaded():
-    """Try to load model if not already loaded. Returns error response or None."""
-    if not dmsw_model or not dmsw_tokenizer or not dmsw_scaler:
-        load_artifacts()
-        if not dmsw_model:
-            return jsonify({
-                "success": False,
-                "error": "DMSW model not loaded. Run train_dmsw.py first.",
-            }), 503
+    """Return a 503 response if the model is unavailable, else None."""
+    error = _model_unavailable_error()
+    if error:
+        return jsonify({"success": False, "error": error}), 503
     return None
 
 
+def _batch_students(body) -> tuple[list | None, str | None]:
+    """Extract the 'students' array from a batch request body, or an error message."""
+    if not body or not isinstance(body, dict) or "students" not in body:
+        return None, "Request must contain a 'students' array."
+    students = body["students"]
+    if not isinstance(students, list) or len(students) == 0:
+        return None, "'students' must be a non-empty array."
+    return students, None
+
+
+def _timed_jsonify(payload: dict):
+    """jsonify, recording the time under the "serialize" stage."""
+    started = time.perf_counter()
+    response = jsonify(payload)
+    STAGE_SECONDS.observe(time.perf_counter() - started, "serialize")
+    return response
+
+
+def _health_payload() -> dict:
+    """Body of GET /health (liveness plus readiness details)."""
+    bundle = current_bundle()
+    return {
+        "status": "healthy",
+        "service": "Dropout Prediction API (DMSW)",
+        "live": True,
+        "ready": startup_status["state"] == "ready",
+        "startup": dict(startup_status),
+        "dmsw_model_loaded": bundle.model is not None,
+        "engine": bundle.engine_name,
+        "tokenizer_loaded": bundle.tokenizer is not None,
+        "scaler_loaded": bundle.scaler is not None,
+        "preprocessing_fused": bool(bundle.model is not None and bundle.model.fused),
+        "model_version": bundle.version,
+        "artifacts_loaded_at": bundle.loaded_at,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+FEATURE_IMPORTANCE = {
+    "success": True,
+    "academic_features": {
+        "Courses Approved (2nd Semester)": 0.1833,
+        "Semester Grades (2nd Semester)": 0.1380,
+        "Courses Approved (1st Semester)": 0.1248,
+        "Admission Grade": 0.1184,
+        "Semester Grades (1st Semester)": 0.1075,
+        "Previous Qualification Grade": 0.0892,
+        "Curricular Units Enrolled (2nd Sem)": 0.0654,
+        "Curricular Units Enrolled (1st Sem)": 0.0543,
+        "Age at Enrollment": 0.0421,
+        "Attendance Rate": 0.0770,
+    },
+    "socioeconomic_features": {
+        "Tuition Fees Up to Date": 0.3089,
+        "Course/Program": 0.1227,
+        "Scholarship Holder": 0.1218,
+        "Age at Enrollment": 0.1080,
+        "Mother's Occupation": 0.0570,
+        "Father's Occupation": 0.0498,
+        "Debtor Status": 0.0462,
+        "Mother's Qualification": 0.0415,
+        "Father's Qualification": 0.0380,
+        "Gender": 0.0310,
+        "Marital Status": 0.0271,
+    },
+    "insight": "Tuition fee status is the #1 socioeconomic predictor (30.89%). "
+               "Course completion rates are the strongest academic predictor (18.33%).",
+}
+
+
+def _model_info_payload() -> dict:
+    """Body of GET /model/info."""
+    bundle = current_bundle()
+    info = {
+        "success": True,
+        "model_name": "DMSW (Dual-Modal Multiscale Sliding Window)",
+        "architecture": {
+            "branches": [
+                "Numerical (Conv1D multiscale: kernel 3 + kernel 5)",
+                "Textual (Embedding → Conv1D multiscale: kernel 3 + kernel 5)",
+                "Static (Dense 16)",
+            ],
+            "fusion": "Concatenation → Dense 64 → Dropout 0.5 → Sigmoid",
+            "input_window": f"{MAX_LEN} weeks",
+        },
+        "model_loaded": bundle.model is not None,
+        "engine": bundle.engine_name,
+        "model_version": bundle.version,
+    }
+
+    if bundle.metadata:
+        info["training"] = bundle.metadata
+    else:
+        info["training"] = {
+            "note": "No metadata file found. Run train_dmsw.py to generate model_metadata.json."
+        }
+    return info
+
+
+def _is_admin() -> bool:
+    """True when ADMIN_TOKEN is unset or the request carries it in X-Admin-Token."""
+    return not ADMIN_TOKEN or request.headers.get("X-Admin-Token") == ADMIN_TOKEN
+
+
+def _require_admin(view):
+    """Reject admin calls without the X-Admin-Token header when ADMIN_TOKEN is set."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _is_admin():
+            return jsonify({"success": False, "error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 @app.route("/health", methods=["GET"])
 def health_check():
-    """Service health check."""
-    return jsonify({
-        "status": "healthy",
-        "service": "Dropout Prediction API (DMSW)",
-        "dmsw_model_loaded": dmsw_model is not None,
-        "tokenizer_loaded": dmsw_tokenizer is not None,
-        "scaler_loaded": dmsw_scaler is not None,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-    })
+    """Service health check (liveness plus readiness details)."""
+    return jsonify(_health_payload())
+
+
+@app.route("/health/ready", methods=["GET"])
+def readiness_check():
+    """Readiness probe: 200 once artifacts are loaded and warmed up, else 503."""
+    ready = startup_status["state"] == "ready"
+    return jsonify({"ready": ready, "state": startup_status["state"]}), (200 if ready else 503)
 
 
 @app.route("/predict/dmsw", methods=["POST"])
@@ -334,8 +904,7 @@ def predict_dmsw():
         if not student_data:
             return jsonify({"success": False, "error": "No student data provided"}), 400
 
-        # Validate
-        validation_errors = _validate_student_data(student_data)
+        features, validation_errors = _parse_student(student_data)
         if validation_errors:
             return jsonify({
                 "success": False,
@@ -343,8 +912,8 @@ def predict_dmsw():
                 "details": validation_errors,
             }), 400
 
-        result = _predict_single(student_data)
-        return jsonify(result)
+        result = _predict_single(features, current_bundle())
+        return _timed_jsonify(result)
 
     except Exception as e:
         logger.error("Prediction error: %s", e, exc_info=True)
@@ -359,35 +928,15 @@ def predict_batch():
         if err:
             return err
 
-        body = request.json
-        if not body or "students" not in body:
-            return jsonify({
-                "success": False,
-                "error": "Request must contain a 'students' array.",
-            }), 400
+        students, body_error = _batch_students(request.json)
+        if body_error:
+            return jsonify({"success": False, "error": body_error}), 400
 
-        students = body["students"]
-        if not isinstance(students, list) or len(students) == 0:
-            return jsonify({
-                "success": False,
-                "error": "'students' must be a non-empty array.",
-            }), 400
+        predictions, errors = _predict_many(students, current_bundle())
+        ROWS.inc("/predict/batch", "scored", amount=len(predictions))
+        ROWS.inc("/predict/batch", "error", amount=len(errors))
 
-        predictions = []
-        errors = []
-        for idx, student_data in enumerate(students):
-            try:
-                result = _predict_single(student_data)
-                result["student_id"] = student_data.get("id", student_data.get("student_id", f"student_{idx}"))
-                predictions.append(result)
-            except Exception as e:
-                errors.append({
-                    "index": idx,
-                    "student_id": student_data.get("id", f"student_{idx}"),
-                    "error": str(e),
-                })
-
-        return jsonify({
+        return _timed_jsonify({
             "success": True,
             "predictions": predictions,
             "total": len(predictions),
@@ -399,69 +948,334 @@ def predict_batch():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@app.route("/feature-importance", methods=["GET"])
-def feature_importance():
-    """Return feature importance rankings from model analysis."""
+@app.route("/predict/roster", methods=["POST"])
+def predict_roster():
+    """
+    Score a full roster, sending only changed students through the model.
+
+    Same body and response as /predict/batch, plus ``recomputed`` and
+    ``reused`` counts. Students are matched across calls by ``id`` (or
+    ``student_id``); rows without one are always scored.
+    """
+    try:
+        err = _ensure_model_loaded()
+        if err:
+            return err
+
+        students, body_error = _batch_students(request.json)
+        if body_error:
+            return jsonify({"success": False, "error": body_error}), 400
+
+        predictions, errors, reused = _score_roster(students, current_bundle())
+        recomputed = len(predictions) - reused
+        ROWS.inc("/predict/roster", "recomputed", amount=recomputed)
+        ROWS.inc("/predict/roster", "reused", amount=reused)
+        ROWS.inc("/predict/roster", "error", amount=len(errors))
+
+        return _timed_jsonify({
+            "success": True,
+            "predictions": predictions,
+            "total": len(predictions),
+            "errors": errors,
+            "recomputed": recomputed,
+            "reused": reused,
+        })
+
+    except Exception as e:
+        logger.error("Roster prediction error: %s", e, exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/predict/stream", methods=["POST"])
+def predict_stream():
+    """
+    Score an NDJSON or CSV body of any size and stream NDJSON results back.
+
+    Send ``Content-Type: text/csv`` for CSV (dashboard export headers or API
+    field names); anything else is read as one JSON object per line.
+    """
+    err = _ensure_model_loaded()
+    if err:
+        return err
+
+    if request.mimetype in ("text/csv", "application/csv"):
+        rows = iter_csv_rows(io.BufferedReader(request.stream))
+    else:
+        rows = iter_ndjson_rows(request.stream)
+
+    bundle = current_bundle()
+    return Response(
+        stream_with_context(_stream_predictions(rows, bundle)),
+        mimetype="application/x-ndjson",
+    )
+
+
+@app.route("/stats/batching", methods=["GET"])
+def batching_stats():
+    """Queue wait time and achieved batch size of the /predict micro-batcher."""
+    if _micro_batcher is None:
+        return jsonify({"success": True, "enabled": False})
+    return jsonify({"success": True, "enabled": True, **_micro_batcher.stats()})
+
+
+@app.route("/stats/cache", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters of the prediction result cache."""
+    if prediction_cache is None:
+        return jsonify({"success": True, "enabled": False})
     return jsonify({
         "success": True,
-        "academic_features": {
-            "Courses Approved (2nd Semester)": 0.1833,
-            "Semester Grades (2nd Semester)": 0.1380,
-            "Courses Approved (1st Semester)": 0.1248,
-            "Admission Grade": 0.1184,
-            "Semester Grades (1st Semester)": 0.1075,
-            "Previous Qualification Grade": 0.0892,
-            "Curricular Units Enrolled (2nd Sem)": 0.0654,
-            "Curricular Units Enrolled (1st Sem)": 0.0543,
-            "Age at Enrollment": 0.0421,
-            "Attendance Rate": 0.0770,
-        },
-        "socioeconomic_features": {
-            "Tuition Fees Up to Date": 0.3089,
-            "Course/Program": 0.1227,
-            "Scholarship Holder": 0.1218,
-            "Age at Enrollment": 0.1080,
-            "Mother's Occupation": 0.0570,
-            "Father's Occupation": 0.0498,
-            "Debtor Status": 0.0462,
-            "Mother's Qualification": 0.0415,
-            "Father's Qualification": 0.0380,
-            "Gender": 0.0310,
-            "Marital Status": 0.0271,
-        },
-        "insight": "Tuition fee status is the #1 socioeconomic predictor (30.89%). "
-                   "Course completion rates are the strongest academic predictor (18.33%).",
+        "enabled": True,
+        "model_version": current_bundle().version,
+        **prediction_cache.stats(),
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text-format metrics for this process."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@app.route("/admin/reload", methods=["POST"])
+@_require_admin
+def admin_reload():
+    """
+    Reload artifacts from disk and swap them in atomically.
+
+    Blocks until the new bundle is live unless called with ?async=1, in which
+    case the reload runs in the background and 202 is returned.
+    """
+    previous = current_bundle().version
+    if request.args.get("async") == "1":
+        started = artifact_store.reload_async()
+        return jsonify({"success": True, "started": started, "model_version": previous}), 202
+
+    bundle = artifact_store.reload()
+    return jsonify({
+        "success": artifact_store.last_error is None,
+        "reloaded": bundle.version != previous,
+        "previous_version": previous,
+        "model_version": bundle.version,
+        "error": artifact_store.last_error,
+    })
+
+
+@app.route("/admin/profile", methods=["GET", "DELETE"])
+@_require_admin
+def admin_profile():
+    """
+    Download the aggregated profile as collapsed stacks, or reset it (DELETE).
+
+    Feed the file to flamegraph.pl, speedscope or inferno. ?format=json
+    returns the sampler counters instead.
+    """
+    if profiler is None:
+        return jsonify({"success": False, "error": "Profiling is disabled. Set PROFILING=1."}), 404
+
+    if request.method == "DELETE":
+        profiler.reset()
+        return jsonify({"success": True, **profiler.stats()})
+
+    if request.args.get("format") == "json":
+        return jsonify({"success": True, **profiler.stats()})
+
+    return Response(
+        profiler.collapsed(),
+        mimetype="text/plain",
+        headers={"Content-Disposition": "attachment; filename=dmsw-profile.collapsed"},
+    )
+
+
+@app.route("/students/<student_id>/weeks", methods=["POST"])
+def append_week(student_id):
+    """
+    Append one week ({"attendance", "avgGrade", "behavior"}) to a student's history.
+
+    ``behavior`` defaults to the phrase /predict derives from the grade.
+    """
+    (attendance, grade, behavior), validation_errors = parse_week(request.get_json(silent=True))
+    if validation_errors:
+        return jsonify({"success": False, "error": "Validation failed", "details": validation_errors}), 400
+
+    if behavior is None:
+        behavior = _BEHAVIOR_LOOKUP[_BEHAVIOR_KEYS[int(_behavior_index(np.float64(grade)))]]
+    try:
+        weeks = history_store.append(student_id, attendance, grade, behavior)
+    except HistoryStoreFull as e:
+        return jsonify({"success": False, "error": str(e)}), 507
+    return jsonify({"success": True, "student_id": student_id, "weeks": weeks, "window": MAX_LEN})
+
+
+@app.route("/students/<student_id>/weeks", methods=["GET", "DELETE"])
+def student_weeks(student_id):
+    """The stored window of a student, oldest week first (DELETE forgets it)."""
+    if request.method == "DELETE":
+        if not history_store.remove(student_id):
+            return jsonify({"success": False, "error": "No history for this student"}), 404
+        return jsonify({"success": True, "student_id": student_id})
+
+    stored = history_store.window_of(student_id)
+    if stored is None:
+        return jsonify({"success": False, "error": "No history for this student"}), 404
+    numeric, _, weeks = stored
+    texts = history_store.texts_of(student_id)
+    return jsonify({
+        "success": True,
+        "student_id": student_id,
+        "weeks": weeks,
+        "window": [
+            {"attendance": float(a), "avgGrade": float(g), "behavior": text}
+            for (a, g), text in zip(numeric.tolist(), texts)
+        ],
     })
 
 
+@app.route("/students/<student_id>/predict", methods=["POST"])
+def predict_history(student_id):
+    """
+    Score a student from their stored weekly history.
+
+    The body carries the static fields of /predict; attendance and grade come
+    from the latest stored week.
+    """
+    try:
+        err = _ensure_model_loaded()
+        if err:
+            return err
+
+        stored = history_store.window_of(student_id)
+        if stored is None:
+            return jsonify({"success": False, "error": "No history for this student"}), 404
+        numeric, tokens, weeks = stored
+
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify({"success": False, "error": "Request body must be a JSON object"}), 400
+        attendance, grade = numeric[-1].tolist()
+        features, validation_errors = _parse_student({**body, "attendance": attendance, "avgGrade": grade})
+        if validation_errors:
+            return jsonify({
+                "success": False,
+                "error": "Validation failed",
+                "details": validation_errors,
+            }), 400
+
+        result = _build_result(features, _score_history(features, numeric, tokens, current_bundle()))
+        result["student_id"] = student_id
+        result["weeks_observed"] = weeks
+        return _timed_jsonify(result)
+
+    except Exception as e:
+        logger.error("History prediction error: %s", e, exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/feature-importance", methods=["GET"])
+def feature_importance():
+    """Return feature importance rankings from model analysis."""
+    return jsonify(FEATURE_IMPORTANCE)
+
+
 @app.route("/model/info", methods=["GET"])
 def model_info():
     """Return model metadata and version information."""
-    info = {
-        "success": True,
-        "model_name": "DMSW (Dual-Modal Multiscale Sliding Window)",
-        "architecture": {
-            "branches": [
-                "Numerical (Conv1D multiscale: kernel 3 + kernel 5)",
-                "Textual (Embedding → Conv1D multiscale: kernel 3 + kernel 5)",
-                "Static (Dense 16)",
-            ],
-            "fusion": "Concatenation → Dense 64 → Dropout 0.5 → Sigmoid",
-            "input_window": f"{MAX_LEN} weeks",
-        },
-        "model_loaded": dmsw_model is not None,
-    }
+    return jsonify(_model_info_payload())
+
+
+# ---------------------------------------------------------------------------
+# Profiling (hooks are only registered when PROFILING=1)
+# ---------------------------------------------------------------------------
+profiler = None
+
+if PROFILING:
+    # /predict runs the model on the micro-batcher thread; sample it too
+    profiler = SamplingProfiler(
+        PROFILE_INTERVAL_MS,
+        helper_threads=(_micro_batcher.name,) if _micro_batcher is not None else (),
+    )
+
+    @app.before_request
+    def _start_profile():
+        forced = request.headers.get(PROFILE_HEADER) == "1" and _is_admin()
+        if forced or random.random() < PROFILE_SAMPLE_RATE:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            profiler.start(f"{request.method} {endpoint}")
+            g.profiling = True
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        # Runs after streamed responses finish, so /predict/stream is covered
+        if g.get("profiling"):
+            profiler.stop()
 
-    if model_metadata:
-        info["training"] = model_metadata
-    else:
-        info["training"] = {
-            "note": "No metadata file found. Run train_dmsw.py to generate model_metadata.json."
-        }
 
-    return jsonify(info)
+# ---------------------------------------------------------------------------
+# Startup
+# ---------------------------------------------------------------------------
+FAST_START = os.environ.get("FAST_START", "0") == "1"
+
+
+def _warm_up(bundle: ArtifactBundle):
+    """Run one inference so the first real request doesn't pay one-time costs."""
+    features = parse_students([{"attendance": 75, "avgGrade": 70}]).features
+    _score_features(features, bundle)
+
+
+def load_and_warm_up():
+    """Load and warm up the initial bundle, recording both durations."""
+    startup_status["state"] = "loading"
+    bundle = load_artifacts()
+    startup_status["load_duration_ms"] = bundle.timings.get("load_duration_ms")
+    startup_status["warmup_duration_ms"] = bundle.timings.get("warmup_duration_ms")
+
+    if not bundle.complete or startup_status["warmup_duration_ms"] is None:
+        startup_status["state"] = "failed"
+        return
+
+    startup_status["state"] = "ready"
+    logger.info(
+        "Model ready (load %.1f ms, warm-up %.1f ms)",
+        startup_status["load_duration_ms"],
+        startup_status["warmup_duration_ms"],
+    )
+
+
+def start_background_load():
+    """Load and warm up on a daemon thread so the server can bind immediately."""
+    global _startup_thread
+    startup_status["state"] = "loading"
+    _startup_thread = threading.Thread(target=load_and_warm_up, name="artifact-loader", daemon=True)
+    _startup_thread.start()
+
+
+def configure_worker(intra_op_threads: int, inter_op_threads: int):
+    """Per-process setup for workers forked by a pre-fork server (see gunicorn.conf.py)."""
+    if "tensorflow" in sys.modules:
+        import tensorflow as tf
+
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        except RuntimeError:
+            # Runtime already initialized; TF_NUM_*_THREADS from the environment apply
+            pass
+
+    # Background threads do not survive fork()
+    artifact_store.start_watcher(ARTIFACT_WATCH_INTERVAL)
+
+
+# Load on startup
+if FAST_START:
+    start_background_load()
+else:
+    load_and_warm_up()
+artifact_store.start_watcher(ARTIFACT_WATCH_INTERVAL)
 
 
 if __name__ == "__main__":
+    # Development server; use `gunicorn -c gunicorn.conf.py api_server:app` in production
     logger.info("Starting ML API server on http://0.0.0.0:5001")
     app.run(host="0.0.0.0", port=5001, debug=True)
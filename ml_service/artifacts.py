@@ -0,0 +1,193 @@
+"""
+Versioned model-artifact bundles with atomic hot-reload.
+
+An ``ArtifactBundle`` groups everything one prediction needs (model,
+tokenizer, scaler, metadata and derived caches). ``ArtifactStore`` loads
+bundles off the request path with single-flight locking and swaps the current
+bundle with one reference assignment, so requests that already grabbed a
+bundle finish on the version they started with.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger("ml_api.artifacts")
+
+
+def fingerprint_files(paths: list[str]) -> str:
+    """Short digest of the size and mtime of each path (missing files included)."""
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            st = os.stat(path)
+            digest.update(f"{path}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:10]
+
+
+class ArtifactBundle:
+    """Immutable snapshot of the serving artifacts."""
+
+    __slots__ = (
+        "model", "engine_name", "tokenizer", "scaler", "metadata", "version",
+        "fingerprint", "loaded_at", "behavior_tokens", "behavior_text_features", "timings",
+    )
+
+    def __init__(self, model=None, engine_name=None, tokenizer=None, scaler=None,
+                 metadata=None, fingerprint="", behavior_tokens=None, behavior_text_features=None):
+        metadata = metadata or {}
+        self.model = model
+        self.engine_name = engine_name
+        self.tokenizer = tokenizer
+        self.scaler = scaler
+        self.metadata = metadata
+        self.fingerprint = fingerprint
+        self.version = f"{metadata.get('trained_at', 'unversioned')}+{fingerprint}"
+        self.loaded_at = datetime.utcnow().isoformat() + "Z"
+        self.behavior_tokens = behavior_tokens
+        self.behavior_text_features = behavior_text_features
+        self.timings = {}  # e.g. load_duration_ms / warmup_duration_ms
+
+    @property
+    def complete(self) -> bool:
+        """
+        True when every artifact needed for scoring is present.
+
+        Models with the preprocessing fused in need no tokenizer or scaler.
+        """
+        return (
+            self.model is not None
+            and self.behavior_text_features is not None
+            and (self.model.fused or self.scaler is not None)
+        )
+
+
+class ArtifactStore:
+    """Holds the current bundle and reloads it with single-flight semantics."""
+
+    def __init__(self, load_fn, watch_paths: list[str], on_swap=None):
+        """
+        ``load_fn()`` builds and returns a new ``ArtifactBundle``;
+        ``on_swap(bundle)`` runs after a new bundle becomes current.
+        """
+        self.load_fn = load_fn
+        self.watch_paths = list(watch_paths)
+        self.on_swap = on_swap
+
+        self.current = ArtifactBundle()
+        self.reload_count = 0
+        self.last_error = None
+        # Watched files as the latest load found them before reading; the
+        # watcher compares the disk against this, not against what it last saw
+        self.loaded_fingerprint = None
+
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._loading = False
+        self._watcher = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def reload(self) -> ArtifactBundle:
+        """
+        Load a fresh bundle and swap it in; blocks until done.
+
+        Concurrent callers share one in-flight load and receive its result,
+        unless the files changed after that load read them; then they load
+        again (still one load at a time).
+        """
+        while True:
+            with self._lock:
+                if not self._loading:
+                    self._loading = True
+                    break
+                generation = self.reload_count
+                while self._loading and self.reload_count == generation:
+                    self._done.wait()
+                if fingerprint_files(self.watch_paths) == self.loaded_fingerprint:
+                    return self.current
+
+        try:
+            self._load_and_swap()
+        finally:
+            with self._lock:
+                self._loading = False
+                self.reload_count += 1
+                self._done.notify_all()
+        return self.current
+
+    def reload_async(self) -> bool:
+        """Start a reload on a background thread unless one is already running."""
+        with self._lock:
+            if self._loading:
+                return False
+        threading.Thread(target=self.reload, name="artifact-reload", daemon=True).start()
+        return True
+
+    @property
+    def loading(self) -> bool:
+        return self._loading
+
+    def _load_and_swap(self):
+        started = time.perf_counter()
+        self.loaded_fingerprint = fingerprint_files(self.watch_paths)
+        try:
+            bundle = self.load_fn()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("Artifact reload failed: %s", e, exc_info=True)
+            return
+
+        # Never replace a working bundle with a broken one
+        if not bundle.complete and self.current.complete:
+            self.last_error = "Reloaded artifacts are incomplete; keeping version " + self.current.version
+            logger.error(self.last_error)
+            return
+
+        self.current = bundle
+        self.last_error = None
+        if self.on_swap is not None:
+            self.on_swap(bundle)
+        logger.info(
+            "Artifacts %s swapped in (%.1f ms)", bundle.version, (time.perf_counter() - started) * 1000
+        )
+
+    # ------------------------------------------------------------------
+    # File watcher
+    # ------------------------------------------------------------------
+    def start_watcher(self, interval_seconds: float):
+        """Poll the watched files and reload once a change has settled."""
+        # A watcher inherited through fork() is not running in this process
+        if interval_seconds <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name="artifact-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, interval: float):
+        if self.loaded_fingerprint is None and not self._loading:
+            self.loaded_fingerprint = fingerprint_files(self.watch_paths)
+        pending = None
+        while True:
+            time.sleep(interval)
+            # A running load (startup, POST /reload) is checked once it is done
+            if self._loading:
+                continue
+            current = fingerprint_files(self.watch_paths)
+            if current == self.loaded_fingerprint:
+                pending = None
+                continue
+            # Wait one more interval so half-written files are not loaded
+            if current != pending:
+                pending = current
+                continue
+            logger.info("Artifact files changed on disk; reloading")
+            self.reload()
+            pending = None
@@ -0,0 +1,217 @@
+"""
+ASGI (asyncio) variant of the Dropout Prediction API.
+
+Serves the same routes and response shapes as api_server.py on an event loop,
+so many dashboard connections can share one process without a thread per slow
+client. Model work runs on a bounded thread pool; large batches are scored in
+chunks and the loop serves other requests between chunks.
+
+Endpoints:
+  GET  /health             — Service health check
+  GET  /health/ready       — Readiness probe (503 until the model is warmed up)
+  POST /predict/dmsw       — Single student prediction
+  POST /predict            — Alias for /predict/dmsw
+  POST /predict/batch      — Batch prediction for multiple students
+  GET  /feature-importance — Feature importance rankings
+  GET  /model/info         — Model metadata and version info
+  GET  /metrics            — Prometheus metrics (shared with api_server)
+
+Run with:
+  uvicorn asgi_server:app --host 0.0.0.0 --port 5001
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import api_server as core
+from metrics import CONTENT_TYPE, REGISTRY
+
+logger = logging.getLogger("ml_api.asgi")
+
+# Threads that execute model work, and how many jobs may wait for them
+ASGI_MODEL_THREADS = int(os.environ.get("ASGI_MODEL_THREADS", "4"))
+ASGI_MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", "256"))
+# Rows per executor job for /predict/batch
+ASGI_BATCH_CHUNK = int(os.environ.get("ASGI_BATCH_CHUNK", "256"))
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_MODEL_THREADS, thread_name_prefix="asgi-model")
+_pending = asyncio.Semaphore(ASGI_MAX_PENDING)
+
+
+async def _run_model(fn, *args):
+    """Run blocking model work on the bounded executor."""
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, fn, *args)
+
+
+async def _json_body(request):
+    """Parsed JSON body, or None when the body is empty or not JSON."""
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _error(message: str, status: int, **extra) -> JSONResponse:
+    return JSONResponse({"success": False, "error": message, **extra}, status_code=status)
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+async def health_check(request):
+    return JSONResponse(core._health_payload())
+
+
+async def readiness_check(request):
+    ready = core.startup_status["state"] == "ready"
+    return JSONResponse(
+        {"ready": ready, "state": core.startup_status["state"]},
+        status_code=200 if ready else 503,
+    )
+
+
+async def predict_dmsw(request):
+    try:
+        unavailable = core._model_unavailable_error()
+        if unavailable:
+            return _error(unavailable, 503)
+
+        student_data = await _json_body(request)
+        if not student_data:
+            return _error("No student data provided", 400)
+
+        features, validation_errors = core._parse_student(student_data)
+        if validation_errors:
+            return _error("Validation failed", 400, details=validation_errors)
+
+        result = await _run_model(core._predict_single, features, core.current_bundle())
+        return JSONResponse(result)
+
+    except Exception as e:
+        logger.error("Prediction error: %s", e, exc_info=True)
+        return _error(str(e), 500)
+
+
+async def predict_batch(request):
+    try:
+        unavailable = core._model_unavailable_error()
+        if unavailable:
+            return _error(unavailable, 503)
+
+        students, body_error = core._batch_students(await _json_body(request))
+        if body_error:
+            return _error(body_error, 400)
+
+        # One bundle for the whole request, scored chunk by chunk so other
+        # requests get the loop (and the executor) in between.
+        bundle = core.current_bundle()
+        predictions, errors = [], []
+        for start in range(0, len(students), ASGI_BATCH_CHUNK):
+            chunk = students[start:start + ASGI_BATCH_CHUNK]
+            chunk_predictions, chunk_errors = await _run_model(core._predict_many, chunk, bundle, start)
+            predictions.extend(chunk_predictions)
+            errors.extend(chunk_errors)
+        core.ROWS.inc("/predict/batch", "scored", amount=len(predictions))
+        core.ROWS.inc("/predict/batch", "error", amount=len(errors))
+
+        return JSONResponse({
+            "success": True,
+            "predictions": predictions,
+            "total": len(predictions),
+            "errors": errors,
+        })
+
+    except Exception as e:
+        logger.error("Batch prediction error: %s", e, exc_info=True)
+        return _error(str(e), 500)
+
+
+async def feature_importance(request):
+    return JSONResponse(core.FEATURE_IMPORTANCE)
+
+
+async def model_info(request):
+    return JSONResponse(core._model_info_payload())
+
+
+async def metrics(request):
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# App setup
+# ---------------------------------------------------------------------------
+class _RequestLogMiddleware:
+    """Pure ASGI middleware mirroring api_server's after_request log line."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        duration = time.perf_counter() - started
+        logger.info(
+            "%s %s — %s (%.1f ms)",
+            scope["method"],
+            scope["path"],
+            status.get("code"),
+            duration * 1000,
+        )
+
+        # The router records the matched route in the scope
+        route = scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        code = status.get("code", 500)
+        core.REQUESTS.inc(endpoint, str(code))
+        core.REQUEST_SECONDS.observe(duration, endpoint)
+        if code >= 400:
+            core.REQUEST_ERRORS.inc(endpoint, str(code))
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health_check, methods=["GET"]),
+        Route("/health/ready", readiness_check, methods=["GET"]),
+        Route("/predict/dmsw", predict_dmsw, methods=["POST"]),
+        Route("/predict", predict_dmsw, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/feature-importance", feature_importance, methods=["GET"]),
+        Route("/model/info", model_info, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        Middleware(_RequestLogMiddleware),
+    ],
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logger.info("Starting async ML API server on http://0.0.0.0:5001")
+    uvicorn.run(app, host="0.0.0.0", port=5001)
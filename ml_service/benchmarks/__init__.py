@@ -0,0 +1 @@
+"""Performance benchmarks for the ML service (run from ml_service/ with ``python -m``)."""
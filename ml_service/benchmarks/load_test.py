@@ -0,0 +1,357 @@
+"""
+Load test for /predict and /predict/batch with regression baselines.
+
+Sweeps concurrency levels (and batch sizes for /predict/batch) and reports
+throughput plus p50/p95/p99 latency per scenario. Runs in-process through the
+Flask test client by default, or against a running server with --url.
+
+Usage (from ml_service/):
+  python -m benchmarks.load_test                         # in-process, print results
+  python -m benchmarks.load_test --save-baseline --repeats 3   # write benchmarks/baseline.json
+  python -m benchmarks.load_test --compare --repeats 3         # gate against the committed baseline
+  python -m benchmarks.load_test --url http://localhost:5001 --concurrency 1,8,32
+
+Exit status of --compare: 0 no regression, 1 regression, 2 the baseline is
+missing or unreadable. A missing baseline is a failure, never a pass, so CI
+can gate on a non-zero exit.
+
+With --repeats N the suite runs N times and every metric is the median of
+the runs (errors: the maximum), which keeps one noisy run from tripping or
+masking the gate. p99 is compared with the looser --tail-threshold.
+
+In-process runs disable the prediction cache (PREDICTION_CACHE_SIZE=0) unless
+it is set explicitly, so every request reaches the model. For a server, start
+it with PREDICTION_CACHE_SIZE=0 to measure the same thing.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Metric -> direction in which a change is a regression
+HIGHER_IS_BETTER = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+def make_students(n: int, seed: int = 7) -> list[dict]:
+    """Deterministic, valid student payloads with varied features."""
+    rng = random.Random(seed)
+    students = []
+    for i in range(n):
+        enrolled = rng.randint(3, 8)
+        students.append({
+            "id": f"BENCH{i:06d}",
+            "attendance": round(rng.uniform(20, 100), 2),
+            "avgGrade": round(rng.uniform(20, 100), 2),
+            "age": rng.randint(17, 30),
+            "gender": rng.choice(["Male", "Female"]),
+            "scholarship": rng.choice(["0", "1"]),
+            "debtor": rng.choice(["0", "0", "1"]),
+            "tuitionUpToDate": rng.choice(["1", "1", "0"]),
+            "coursesEnrolled": enrolled,
+            "coursesPassed": rng.randint(0, enrolled),
+        })
+    return students
+
+
+# ---------------------------------------------------------------------------
+# Clients (one per worker thread)
+# ---------------------------------------------------------------------------
+class InProcessClient:
+    """POST through a Flask test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path: str, body: bytes) -> int:
+        response = self.client.post(path, data=body, content_type="application/json")
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """POST over a persistent HTTP connection (reopened if the server closes it)."""
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+        self.prefix = parsed.path.rstrip("/")
+
+    def post(self, path: str, body: bytes) -> int:
+        try:
+            self.conn.request("POST", self.prefix + path, body, {"Content-Type": "application/json"})
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            raise
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(make_client, path: str, bodies: list[bytes], concurrency: int,
+                 requests: int, warmup: int) -> dict:
+    """Send ``requests`` POSTs from ``concurrency`` threads; return latency stats."""
+    latencies = []
+    errors = [0]
+    counter = [0]
+    lock = threading.Lock()
+
+    def worker():
+        client = make_client()
+        for i in range(warmup):
+            client.post(path, bodies[i % len(bodies)])
+        local = []
+        local_errors = 0
+        start_barrier.wait()
+        while True:
+            with lock:
+                i = counter[0]
+                if i >= requests:
+                    break
+                counter[0] += 1
+            started = time.perf_counter()
+            try:
+                ok = client.post(path, bodies[i % len(bodies)]) == 200
+            except (http.client.HTTPException, OSError):
+                ok = False
+            local.append(time.perf_counter() - started)
+            local_errors += not ok
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    start_barrier = threading.Barrier(concurrency + 1)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def median_results(runs: list[dict]) -> dict:
+    """Per-scenario median of every metric over ``runs`` (errors: the maximum)."""
+    merged = {"meta": dict(runs[0]["meta"], repeats=len(runs)), "scenarios": {}}
+    for name, first in runs[0]["scenarios"].items():
+        stats = dict(first)
+        for metric in ("elapsed_s", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "rows_per_s"):
+            if metric in first:
+                values = sorted(run["scenarios"][name][metric] for run in runs)
+                stats[metric] = values[len(values) // 2]
+        stats["errors"] = max(run["scenarios"][name]["errors"] for run in runs)
+        merged["scenarios"][name] = stats
+    return merged
+
+
+def run_suite(args) -> dict:
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+        engine = _server_engine(args.url)
+    else:
+        os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+        os.environ.setdefault("FAST_START", "0")
+        import api_server
+
+        # Keep per-request log lines out of the benchmark output
+        logging.getLogger("ml_api").setLevel(logging.WARNING)
+        make_client = lambda: InProcessClient(api_server.app)  # noqa: E731
+        engine = api_server.current_bundle().engine_name
+
+    students = make_students(max(args.requests, max(args.batch_sizes)))
+    single_bodies = [json.dumps(s).encode() for s in students]
+
+    scenarios = {}
+    for concurrency in args.concurrency:
+        name = f"predict/c={concurrency}"
+        stats = run_scenario(make_client, "/predict", single_bodies, concurrency,
+                             args.requests, args.warmup)
+        stats.update(endpoint="/predict", concurrency=concurrency, batch_size=1)
+        scenarios[name] = stats
+        _print_row(name, stats)
+
+    for batch_size in args.batch_sizes:
+        # Several distinct batches so a cache (if enabled) can't answer all of them
+        bodies = [
+            json.dumps({"students": (students[k:] + students[:k])[:batch_size]}).encode()
+            for k in range(0, 4 * batch_size, batch_size)
+        ]
+        requests = max(args.min_batch_requests, args.requests // batch_size)
+        for concurrency in args.batch_concurrency:
+            name = f"batch/size={batch_size}/c={concurrency}"
+            stats = run_scenario(make_client, "/predict/batch", bodies, concurrency,
+                                 requests, min(args.warmup, 2))
+            stats.update(endpoint="/predict/batch", concurrency=concurrency, batch_size=batch_size,
+                         rows_per_s=round(stats["throughput_rps"] * batch_size, 1))
+            scenarios[name] = stats
+            _print_row(name, stats)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "mode": "http" if args.url else "in-process",
+            "target": args.url or "flask test client",
+            "engine": engine,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def _server_engine(url: str):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=10)
+    try:
+        conn.request("GET", parsed.path.rstrip("/") + "/health")
+        return json.loads(conn.getresponse().read()).get("engine")
+    except (http.client.HTTPException, OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Reporting and comparison
+# ---------------------------------------------------------------------------
+def _print_row(name: str, stats: dict):
+    print(
+        f"{name:<26} {stats['throughput_rps']:>9.1f} req/s  "
+        f"p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+        f"p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}",
+        flush=True,
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float, tail_threshold: float = None) -> list[str]:
+    """
+    Return one message per metric that regressed by more than ``threshold``
+    (``tail_threshold`` for p99, which is noisier).
+    """
+    tail_threshold = threshold if tail_threshold is None else tail_threshold
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            print(f"  {name}: not run, skipped")
+            continue
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {base.get('errors', 0)})")
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            allowed = tail_threshold if metric == "p99_ms" else threshold
+            regressed = change < -allowed if higher_is_better else change > allowed
+            marker = "REGRESSION" if regressed else "ok"
+            print(f"  {name:<26} {metric:<15} {old:>10.2f} -> {new:>10.2f} ({change:+.1%}) {marker}")
+            if regressed:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test /predict and /predict/batch.")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32],
+                        help="Concurrent clients for /predict (default 1,8,32)")
+    parser.add_argument("--batch-sizes", type=_int_list, default=[10, 100, 1000],
+                        help="Students per /predict/batch request (default 10,100,1000)")
+    parser.add_argument("--batch-concurrency", type=_int_list, default=[1, 4],
+                        help="Concurrent clients for /predict/batch (default 1,4)")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Requests per /predict scenario; batch scenarios send the same number of rows")
+    parser.add_argument("--min-batch-requests", type=int, default=20,
+                        help="Lower bound on requests per batch scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per client")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_PATH}")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="BASELINE",
+                        help="Compare against a baseline JSON and exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative change before a metric counts as regressed (default 0.2)")
+    parser.add_argument("--tail-threshold", type=float, default=0.5,
+                        help="Allowed relative change of p99 latency (default 0.5)")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="Run the suite this many times and keep the median of each metric")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for repeat in range(max(1, args.repeats)):
+        if args.repeats > 1:
+            print(f"Run {repeat + 1}/{args.repeats}:")
+        runs.append(run_suite(args))
+    results = median_results(runs)
+
+    for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {path}")
+
+    if args.compare:
+        try:
+            with open(args.compare, "r") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"FAILED: no usable baseline at {args.compare} ({e}); "
+                  f"record one with --save-baseline", file=sys.stderr)
+            return 2
+        print(f"\nComparing with {args.compare} (threshold {args.threshold:.0%}, "
+              f"p99 {args.tail_threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold, args.tail_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
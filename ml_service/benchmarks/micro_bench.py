@@ -0,0 +1,201 @@
+"""
+Micro-benchmarks for the stages of _predict_single.
+
+Times each stage in isolation over many iterations and reports ns/op plus
+allocated bytes/op, for every available inference engine (NumPy and Keras).
+Stages:
+
+  parse        columnar parsing and validation (parse_students)
+  history      building the 15-week history array (_history_window)
+  scaler       dmsw_scaler.transform (skipped when the scaler is fused into the model)
+  tokenizer    cached text-branch lookup for the behaviour phrase
+  tokenize     vocabulary first_token_ids (the uncached lookup, for reference;
+               skipped when no vocabulary is loaded)
+  model        predict_with_text_features
+  blend        heuristic risk blend (_blend_risk)
+  explain      response and explanations list (_build_result)
+
+CPython has no per-call allocation counter, so alloc B/op is the tracemalloc
+peak above the starting level during one call, averaged over --alloc-samples
+calls. It includes NumPy buffers.
+
+Usage (from ml_service/):
+  python -m benchmarks.micro_bench
+  python -m benchmarks.micro_bench --engines numpy --batch-size 64 --output micro.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.load_test import make_students
+
+ENGINES = ("numpy", "keras")
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+def build_stages(api, bundle, batch_size: int) -> list[tuple]:
+    """Return (name, zero-arg callable) per stage, with inputs precomputed."""
+    students = make_students(batch_size)
+    features = api.parse_students(students).features
+    features_list = [tuple(row) for row in features.tolist()]
+    num_cols = features[:, [api.ATTENDANCE_COL, api.GRADE_COL]]
+    grade = features[:, api.GRADE_COL]
+    X_static = features[:, api.STATIC_COLS]
+
+    numeric = num_cols if bundle.model.fused else bundle.scaler.transform(num_cols)
+    X_num = api._history_window(numeric)
+    text_features = bundle.behavior_text_features[api._behavior_index(grade)]
+    raw_prob = bundle.model.predict_with_text_features(
+        X_num, text_features, X_static, batch_size=api.BATCH_CHUNK_SIZE
+    ).reshape(-1).astype(np.float64)
+    probs = api._blend_risk(raw_prob, features)
+    phrases = [api._BEHAVIOR_LOOKUP[api._BEHAVIOR_KEYS[i]] for i in api._behavior_index(grade)]
+
+    stages = [
+        ("parse", lambda: api.parse_students(students)),
+        ("history", lambda: api._history_window(numeric)),
+        ("scaler", None if bundle.scaler is None else lambda: bundle.scaler.transform(num_cols)),
+        ("tokenizer", lambda: bundle.behavior_text_features[api._behavior_index(grade)]),
+        ("tokenize", None if bundle.tokenizer is None else lambda: bundle.tokenizer.first_token_ids(phrases)),
+        ("model", lambda: bundle.model.predict_with_text_features(
+            X_num, text_features, X_static, batch_size=api.BATCH_CHUNK_SIZE)),
+        ("blend", lambda: api._blend_risk(raw_prob, features)),
+        ("explain", lambda: [api._build_result(f, p) for f, p in zip(features_list, probs)]),
+    ]
+    return [(name, fn) for name, fn in stages if fn is not None]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+def time_op(fn, iterations: int, max_seconds: float) -> tuple[float, int]:
+    """
+    Mean ns per call over up to ``iterations`` calls.
+
+    Slow stages (e.g. the Keras model call) are cut down so that one stage
+    takes about ``max_seconds``. Returns (ns/op, calls timed).
+    """
+    probe = 10
+    started = time.perf_counter_ns()
+    for _ in range(probe):
+        fn()
+    estimate = (time.perf_counter_ns() - started) / probe
+    n = max(probe, min(iterations, int(max_seconds * 1e9 / max(estimate, 1.0))))
+
+    started = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - started) / n, n
+
+
+def alloc_op(fn, samples: int) -> float:
+    """Mean tracemalloc peak (bytes) above the starting level for one call."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / samples
+
+
+def run_engine(api, bundle, args) -> dict:
+    stages = {}
+    for name, fn in build_stages(api, bundle, args.batch_size):
+        ns, calls = time_op(fn, args.iterations, args.max_seconds)
+        alloc = alloc_op(fn, min(args.alloc_samples, calls))
+        stages[name] = {
+            "ns_per_op": round(ns, 1),
+            "alloc_bytes_per_op": round(alloc, 1),
+            "iterations": calls,
+        }
+        print(f"  {name:<10} {ns:>14,.0f} ns/op  {alloc:>12,.0f} B/op  ({calls} calls)", flush=True)
+    return stages
+
+
+# ---------------------------------------------------------------------------
+# Bundles
+# ---------------------------------------------------------------------------
+def load_engine_bundle(api, engine: str):
+    """Load an artifact bundle for ``engine``; None when its artifacts are missing."""
+    if api.current_bundle().engine_name == engine:
+        return api.current_bundle()
+    previous = api.DMSW_ENGINE
+    api.DMSW_ENGINE = engine
+    try:
+        bundle = api._load_bundle()
+    except ImportError as e:
+        print(f"{engine}: unavailable ({e})")
+        return None
+    finally:
+        api.DMSW_ENGINE = previous
+    return bundle if bundle.complete and bundle.engine_name == engine else None
+
+
+def _str_list(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time each stage of _predict_single in isolation.")
+    parser.add_argument("--engines", type=_str_list, default=list(ENGINES),
+                        help="Engines to benchmark (default numpy,keras; missing ones are skipped)")
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls per stage (default 5000)")
+    parser.add_argument("--max-seconds", type=float, default=2.0,
+                        help="Cap on timed seconds per stage; slow stages run fewer calls")
+    parser.add_argument("--alloc-samples", type=int, default=200,
+                        help="Calls per stage traced for allocations")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Students per call (1 matches _predict_single)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("FAST_START", "0")
+    os.environ.setdefault("ARTIFACT_WATCH_INTERVAL", "0")
+    import api_server
+
+    logging.getLogger("ml_api").setLevel(logging.WARNING)
+
+    results = {}
+    for engine in args.engines:
+        bundle = load_engine_bundle(api_server, engine)
+        if bundle is None:
+            print(f"{engine}: artifacts not available, skipped")
+            continue
+        print(f"{engine} engine (batch size {args.batch_size}):")
+        results[engine] = run_engine(api_server, bundle, args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "batch_size": args.batch_size,
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "platform": platform.platform(),
+                },
+                "engines": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Single-pass columnar parsing and validation of student records.
+
+``parse_students`` reads a list of student dicts once into typed NumPy
+columns (numbers as float64, yes/no fields as 0/1 flags), validates every row
+with array comparisons and assembles the (N, 9) feature matrix the model
+scoring path consumes. ``parse_student`` applies the same rules to a single
+row without NumPy; /predict, /predict/batch and /predict/stream all parse
+through this module, so an invalid row fails with the same messages on every
+endpoint.
+"""
+
+import math
+from operator import itemgetter
+
+import numpy as np
+
+# Column layout of the feature matrix
+FEATURE_NAMES = (
+    "age", "gender", "scholarship", "debt", "tuition_up_to_date",
+    "courses_enrolled", "courses_passed", "attendance", "grade",
+)
+STATIC_COLS = slice(0, 7)  # age, gender, scholarship, debt, tuition, enrolled, passed
+ATTENDANCE_COL = 7
+GRADE_COL = 8
+
+TRUTHY_VALUES = frozenset(("1", "yes", "Yes", "true", "True"))
+
+NOT_AN_OBJECT = "Request body must be a JSON object"
+
+# Below this many rows the per-array NumPy overhead outweighs vectorizing,
+# so rows are parsed one at a time with the same rules
+COLUMNAR_MIN_ROWS = 16
+
+_NUMBER_TYPES = frozenset((int, float))
+
+# Request fields read by the parser, with the default used when one is missing
+_FIELDS = (
+    ("attendance", None),
+    ("avgGrade", None),
+    ("coursesEnrolled", None),
+    ("coursesPassed", None),
+    ("age", None),
+    ("gender", "Male"),
+    ("scholarship", "0"),
+    ("debtor", "0"),
+    ("tuitionUpToDate", "1"),
+)
+_get_fields = itemgetter(*(key for key, _ in _FIELDS))
+
+# Validation rules in the order their messages are reported
+_RULES = (
+    ("attendance", "attendance must be between 0 and 100"),
+    ("avgGrade", "avgGrade must be between 0 and 100"),
+    ("coursesEnrolled", "coursesEnrolled must be a non-negative integer"),
+    ("coursesPassed", "coursesPassed must be a non-negative integer"),
+    ("passedExceedsEnrolled", "coursesPassed cannot exceed coursesEnrolled"),
+)
+
+
+class ParsedStudents:
+    """Feature matrix plus per-row validation results for a list of students."""
+
+    __slots__ = ("features", "valid", "errors")
+
+    def __init__(self, features: np.ndarray, valid: np.ndarray, errors: dict):
+        self.features = features  # (N, 9) float64, layout FEATURE_NAMES
+        self.valid = valid        # (N,) bool
+        self.errors = errors      # row -> list of messages, invalid rows only
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def row_errors(self, i: int) -> list[str]:
+        """Validation messages for row ``i`` (empty = valid)."""
+        return self.errors.get(i, [])
+
+
+# ---------------------------------------------------------------------------
+# Row-wise parsing (small inputs)
+# ---------------------------------------------------------------------------
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _int_or_none(value):
+    number = _float_or_none(value)
+    if number is None or number != number or number in (float("inf"), float("-inf")):
+        return None
+    return float(int(number))
+
+
+def parse_student(row) -> tuple[tuple, list[str]]:
+    """Feature tuple and validation messages for one row (same rules as the columns)."""
+    if not isinstance(row, dict):
+        return (20.0, 1.0, 0.0, 0.0, 1.0, 5.0, 5.0, 0.0, 0.0), [NOT_AN_OBJECT]
+
+    attendance = _float_or_none(row.get("attendance"))
+    grade = _float_or_none(row.get("avgGrade"))
+    enrolled = _int_or_none(row.get("coursesEnrolled"))
+    passed = _int_or_none(row.get("coursesPassed"))
+    age = _int_or_none(row.get("age"))
+
+    enrolled_checked = -1 if enrolled is None else enrolled
+    passed_checked = -1 if passed is None else passed
+    failures = {
+        "attendance": attendance is None or not math.isfinite(attendance) or attendance < 0 or attendance > 100,
+        "avgGrade": grade is None or not math.isfinite(grade) or grade < 0 or grade > 100,
+        "coursesEnrolled": enrolled_checked < 0,
+        "coursesPassed": passed_checked < 0,
+        "passedExceedsEnrolled": enrolled_checked >= 0 and passed_checked > enrolled_checked,
+    }
+    errors = [message for key, message in _RULES if failures[key]]
+
+    features = (
+        20.0 if age is None else age,
+        float(str(row.get("gender", "Male")).lower() == "male"),
+        float(str(row.get("scholarship", "0")) in TRUTHY_VALUES),
+        float(str(row.get("debtor", "0")) in TRUTHY_VALUES),
+        float(str(row.get("tuitionUpToDate", "1")) in TRUTHY_VALUES),
+        5.0 if enrolled is None else enrolled,
+        5.0 if passed is None else passed,
+        0.0 if attendance is None else attendance,
+        0.0 if grade is None else grade,
+    )
+    return features, errors
+
+
+def _parse_rows(rows: list) -> "ParsedStudents":
+    parsed = [parse_student(row) for row in rows]
+    features = np.array([f for f, _ in parsed], dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES))
+    errors = {i: e for i, (_, e) in enumerate(parsed) if e}
+    valid = np.fromiter((not e for _, e in parsed), dtype=bool, count=len(rows))
+    return ParsedStudents(features, valid, errors)
+
+
+# ---------------------------------------------------------------------------
+# Columnar parsing
+# ---------------------------------------------------------------------------
+def _columns(rows: list, all_dicts: bool) -> list:
+    """One sequence of raw values per entry of _FIELDS."""
+    if all_dicts:
+        # Fast path: every row carries every field
+        try:
+            return list(zip(*map(_get_fields, rows)))
+        except KeyError:
+            pass
+    return [
+        [row.get(key, default) if isinstance(row, dict) else default for row in rows]
+        for key, default in _FIELDS
+    ]
+
+
+def _to_float(values) -> tuple[np.ndarray, np.ndarray]:
+    """Parse values with ``float()`` semantics; returns (values, parsed-ok mask)."""
+    n = len(values)
+    # Fast path: plain JSON numbers convert in one call
+    if set(map(type, values)) <= _NUMBER_TYPES:
+        try:
+            return np.array(values, dtype=np.float64), np.ones(n, dtype=bool)
+        except OverflowError:
+            pass
+
+    out = np.empty(n, dtype=np.float64)
+    ok = np.ones(n, dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError, OverflowError):
+            out[i] = np.nan
+            ok[i] = False
+    return out, ok
+
+
+def _to_int(values) -> tuple[np.ndarray, np.ndarray]:
+    """Parse values with ``int(float())`` semantics (truncation); NaN/inf fail."""
+    out, ok = _to_float(values)
+    ok &= np.isfinite(out)
+    return np.trunc(out), ok
+
+
+def _to_flag(values) -> np.ndarray:
+    return np.fromiter(map(TRUTHY_VALUES.__contains__, map(str, values)), dtype=np.float64, count=len(values))
+
+
+def _to_male(values) -> np.ndarray:
+    lowered = map(str.lower, map(str, values))
+    return np.fromiter(map("male".__eq__, lowered), dtype=np.float64, count=len(values))
+
+
+def parse_students(rows: list) -> ParsedStudents:
+    """
+    Parse and validate ``rows`` in one pass.
+
+    Unparseable or missing numbers fail validation; in the feature matrix
+    they fall back to the defaults (age 20, courses 5, attendance and grade 0).
+    Rows that are not dicts are invalid with a single message.
+    """
+    n = len(rows)
+    if n < COLUMNAR_MIN_ROWS:
+        return _parse_rows(rows)
+
+    all_dicts = set(map(type, rows)) == {dict}
+    if all_dicts:
+        is_dict = np.ones(n, dtype=bool)
+    else:
+        is_dict = np.fromiter((isinstance(row, dict) for row in rows), dtype=bool, count=n)
+
+    (attendance_raw, grade_raw, enrolled_raw, passed_raw, age_raw,
+     gender_raw, scholarship_raw, debtor_raw, tuition_raw) = _columns(rows, all_dicts)
+
+    attendance, attendance_ok = _to_float(attendance_raw)
+    grade, grade_ok = _to_float(grade_raw)
+    enrolled, enrolled_ok = _to_int(enrolled_raw)
+    passed, passed_ok = _to_int(passed_raw)
+    age, age_ok = _to_int(age_raw)
+
+    # Comparisons against NaN are False, so non-finite values are rejected
+    # explicitly rather than by the range checks
+    enrolled_checked = np.where(enrolled_ok, enrolled, -1)
+    passed_checked = np.where(passed_ok, passed, -1)
+    failures = {
+        "attendance": ~attendance_ok | ~np.isfinite(attendance) | (attendance < 0) | (attendance > 100),
+        "avgGrade": ~grade_ok | ~np.isfinite(grade) | (grade < 0) | (grade > 100),
+        "coursesEnrolled": enrolled_checked < 0,
+        "coursesPassed": passed_checked < 0,
+        "passedExceedsEnrolled": (enrolled_checked >= 0) & (passed_checked > enrolled_checked),
+    }
+
+    invalid = ~is_dict
+    for mask in failures.values():
+        invalid |= mask
+
+    errors = {}
+    for i in np.flatnonzero(invalid).tolist():
+        if not is_dict[i]:
+            errors[i] = [NOT_AN_OBJECT]
+        else:
+            errors[i] = [message for key, message in _RULES if failures[key][i]]
+
+    features = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+    features[:, 0] = np.where(age_ok, age, 20)
+    features[:, 1] = _to_male(gender_raw)
+    features[:, 2] = _to_flag(scholarship_raw)
+    features[:, 3] = _to_flag(debtor_raw)
+    features[:, 4] = _to_flag(tuition_raw)
+    features[:, 5] = np.where(enrolled_ok, enrolled, 5)
+    features[:, 6] = np.where(passed_ok, passed, 5)
+    features[:, ATTENDANCE_COL] = np.where(attendance_ok, attendance, 0.0)
+    features[:, GRADE_COL] = np.where(grade_ok, grade, 0.0)
+
+    return ParsedStudents(features, ~invalid, errors)
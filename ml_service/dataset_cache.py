@@ -0,0 +1,204 @@
+"""
+On-disk cache of preprocessed training tensors, loaded as memory maps.
+
+Each entry is a directory of ``.npy`` files (plus any side files the builder
+writes, e.g. the fitted vocabulary and scaler) named after a digest of the
+source file's contents and of the preprocessing parameters. A changed source
+or parameter gives a new key, so the entry is rebuilt automatically; older
+entries of the same source file (matched by the absolute path recorded in
+each manifest) are removed once the new one is complete.
+
+Arrays are opened with ``np.load(mmap_mode="r")``: nothing is read until it is
+used, and processes that open the same entry share its pages.
+
+Usage:
+  python dataset_cache.py info [source.csv]   — show the cache key and entry state
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("DMSW_CACHE_DIR", os.path.join(BASE_DIR, ".dmsw_cache"))
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+_DIGESTS = "source_digests.json"  # source path -> (size, mtime, sha256), to skip re-hashing
+_CHUNK = 1 << 20
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(path: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    SHA-256 of ``path``'s contents. The digest is remembered together with the
+    file's size and mtime, so an unchanged multi-GB source is not re-read.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+
+    index_path = os.path.join(cache_dir, _DIGESTS)
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    entry = index.get(path)
+    if entry is not None and entry[:2] == stamp:
+        return entry[2]
+
+    digest = _hash_file(path)
+    index[path] = stamp + [digest]
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_json_atomic(index_path, index)
+    return digest
+
+
+def cache_key(source_path: str, params: dict, cache_dir: str = CACHE_DIR) -> str:
+    """Entry name for ``source_path`` preprocessed with ``params``."""
+    digest = hashlib.sha256()
+    digest.update(source_digest(source_path, cache_dir).encode())
+    digest.update(json.dumps({"format_version": CACHE_FORMAT_VERSION, **params}, sort_keys=True).encode())
+    return f"{_source_stem(source_path)}-{digest.hexdigest()[:16]}"
+
+
+def entry_dir(source_path: str, params: dict, cache_dir: str = CACHE_DIR) -> str:
+    """Directory of the entry for ``source_path`` and ``params`` (built or not)."""
+    return os.path.join(cache_dir, cache_key(source_path, params, cache_dir))
+
+
+def _source_stem(source_path: str) -> str:
+    return os.path.splitext(os.path.basename(source_path))[0]
+
+
+def _write_json_atomic(path: str, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# Entries
+# ---------------------------------------------------------------------------
+def open_entry(entry_dir: str) -> dict | None:
+    """Memory-map every array of a complete entry, or None when there is none."""
+    try:
+        with open(os.path.join(entry_dir, MANIFEST), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {
+        name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r")
+        for name in manifest["arrays"]
+    }
+
+
+def _write_entry(entry_dir: str, key: str, source_path: str, params: dict, build_fn):
+    """Build into a temporary directory and rename it into place when complete."""
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=parent)
+    os.chmod(tmp_dir, 0o755)  # mkdtemp creates it private
+    try:
+        arrays = build_fn(tmp_dir)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+        _write_json_atomic(os.path.join(tmp_dir, MANIFEST), {
+            "format_version": CACHE_FORMAT_VERSION,
+            "key": key,
+            "source": os.path.abspath(source_path),
+            "params": params,
+            "arrays": {name: {"shape": list(a.shape), "dtype": str(a.dtype)} for name, a in arrays.items()},
+        })
+        if os.path.isdir(entry_dir):
+            # Another process finished the same entry first
+            shutil.rmtree(tmp_dir)
+        else:
+            os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _prune(cache_dir: str, source_path: str, keep: str):
+    """
+    Remove the other entries built from the same source file. Entries of other
+    sources, and any entry whose manifest does not name its source, are kept.
+    """
+    source = os.path.abspath(source_path)
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name == keep or name.startswith(".") or not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, MANIFEST), "r") as f:
+                if json.load(f).get("source") != source:
+                    continue
+        except (OSError, ValueError):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_or_build(source_path: str, params: dict, build_fn, cache_dir: str = CACHE_DIR):
+    """
+    Return (arrays, entry_dir, hit) for ``source_path`` and ``params``.
+
+    On a miss ``build_fn(out_dir)`` is called; it may write side files into
+    ``out_dir`` and returns a dict of name -> array, which is saved and then
+    reopened memory-mapped like a hit.
+    """
+    key = cache_key(source_path, params, cache_dir)
+    entry_dir = os.path.join(cache_dir, key)
+
+    arrays = open_entry(entry_dir)
+    if arrays is not None:
+        return arrays, entry_dir, True
+
+    _write_entry(entry_dir, key, source_path, params, build_fn)
+    _prune(cache_dir, source_path, keep=key)
+    return open_entry(entry_dir), entry_dir, False
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "info":
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 1
+
+    from train_dmsw import DATA_FILE, dataset_params
+
+    source_path = argv[1] if len(argv) > 1 else DATA_FILE
+    key = cache_key(source_path, dataset_params())
+    entry_dir = os.path.join(CACHE_DIR, key)
+    arrays = open_entry(entry_dir)
+    print(f"Source : {source_path}")
+    print(f"Key    : {key}")
+    if arrays is None:
+        print("Entry  : not built (the next training run builds it)")
+        return 0
+    print(f"Entry  : {entry_dir}")
+    for name, array in arrays.items():
+        print(f"  {name:<10} {str(array.shape):<16} {array.dtype}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
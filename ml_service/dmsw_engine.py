@@ -0,0 +1,459 @@
+"""
+Pure-NumPy inference engine for the DMSW model.
+
+The network built by ``train_dmsw.build_dmsw_model`` is small enough that a
+hand-written forward pass is both faster than ``model.predict`` for a handful
+of rows and avoids importing TensorFlow in the serving process.
+
+The exported weights can carry the serving preprocessing folded in
+(format version 2): the StandardScaler is folded into the numeric Conv1D
+kernels, so the engine takes raw attendance and grade values, and the
+behaviour phrases are stored as token IDs, so neither the pickled scaler nor
+the vocabulary is needed at load time.
+
+``TFLiteDMSW`` serves the quantized TFLite export written by
+``quantize_dmsw.py``, which has the scaler folded into its graph.
+
+Usage:
+  python dmsw_engine.py export [model.h5] [weights.npz]   — dump Keras weights
+                                                           (fused when dmsw_scaler.pkl and
+                                                           dmsw_vocab.json exist)
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+from columnar import ATTENDANCE_COL, GRADE_COL, STATIC_COLS
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DMSW_MODEL_PATH = os.path.join(BASE_DIR, "dmsw_model.h5")
+DMSW_WEIGHTS_PATH = os.path.join(BASE_DIR, "dmsw_model.npz")
+DMSW_SCALER_PATH = os.path.join(BASE_DIR, "dmsw_scaler.pkl")
+DMSW_VOCAB_PATH = os.path.join(BASE_DIR, "dmsw_vocab.json")
+DMSW_TFLITE_PATH = os.path.join(BASE_DIR, "dmsw_model.tflite")
+
+WEIGHTS_FORMAT_VERSION = 1         # plain weights; inputs are scaled and tokenized by the caller
+FUSED_WEIGHTS_FORMAT_VERSION = 2   # scaler folded in, behaviour token IDs included
+
+# Behaviour phrases the API feeds to the text branch, indexed by behaviour ID
+# (0 = low, 1 = mid, 2 = high grades)
+BEHAVIOR_PHRASES = ("Struggling with concepts", "Regular attendance", "Active participation")
+
+# Four-tier risk levels served by the API, as (lower bound, level)
+RISK_TIERS = ((0.70, "CRITICAL"), (0.50, "HIGH"), (0.30, "MEDIUM"), (0.0, "LOW"))
+
+# Signatures of the TFLite export (see quantize_dmsw.py)
+TFLITE_TEXT_SIGNATURE = "text_features"
+TFLITE_HEAD_SIGNATURE = "head"
+
+# Order in which build_dmsw_model concatenates the branch outputs
+_CONV_KEYS = ("num_conv3", "num_conv5", "text_conv3", "text_conv5")
+
+
+def risk_level(dropout_prob: float) -> str:
+    """Map a dropout probability to its RISK_TIERS level."""
+    for lower_bound, level in RISK_TIERS:
+        if dropout_prob >= lower_bound:
+            return level
+    return RISK_TIERS[-1][1]
+
+
+def behavior_index(grade: np.ndarray) -> np.ndarray:
+    """Index into BEHAVIOR_PHRASES of the phrase the API assumes for each grade."""
+    return np.where(grade < 50, 0, np.where(grade > 80, 2, 1))
+
+
+def blend_risk(raw_prob: np.ndarray, features: np.ndarray) -> np.ndarray:
+    """
+    Blend raw model probabilities (N,) with heuristic penalties from a (N, 9)
+    feature matrix (columnar.FEATURE_NAMES layout) and return the calibrated
+    dropout probabilities (N,) the API serves and assigns RISK_TIERS to.
+
+    The raw model underestimates risk for low-attendance students.
+    Blending in heuristic penalties produces a calibrated score.
+    """
+    X_static = features[:, STATIC_COLS]
+    attendance = features[:, ATTENDANCE_COL]
+    grade = features[:, GRADE_COL]
+    debt = X_static[:, 3]
+    tuition_up_to_date = X_static[:, 4]
+    courses_enrolled = X_static[:, 5]
+    courses_passed = X_static[:, 6]
+
+    attendance_penalty = np.where(attendance < 60, (60 - attendance) / 60, 0.0)
+    grade_penalty = np.where(grade < 50, (50 - grade) / 50, 0.0)
+    pass_rate = courses_passed / np.maximum(courses_enrolled, 1)
+    pass_penalty = np.where(pass_rate < 0.5, (0.5 - pass_rate) / 0.5, 0.0)
+    socio_penalty = 0.15 * (debt != 0) + 0.15 * (tuition_up_to_date == 0)
+
+    heuristic_risk = np.minimum(
+        attendance_penalty * 0.35
+        + grade_penalty * 0.30
+        + pass_penalty * 0.20
+        + socio_penalty,
+        1.0,
+    )
+
+    # Blend: model gets 30% weight, heuristic gets 70% (model is poorly calibrated)
+    return np.minimum(raw_prob * 0.3 + heuristic_risk * 0.7, 1.0)
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+def dmsw_layers(model) -> dict:
+    """
+    Map the layers of a Keras DMSW model to their roles.
+
+    Roles: ``embedding``, ``num_conv3``, ``num_conv5``, ``text_conv3``,
+    ``text_conv5``, ``static``, ``fusion`` and ``output``. Layers are
+    identified by type and weight shapes rather than their auto-generated
+    names, so models saved by different Keras versions map the same way.
+    ``conv3`` and ``conv5`` are the narrower and the wider kernel of each
+    branch (sizes 3 and 5 unless the model was trained with others).
+    """
+    roles = {}
+    hidden_dense = []
+    convs = {"num": [], "text": []}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == "Embedding":
+            roles["embedding"] = layer
+        elif kind == "Conv1D":
+            kernel_size, in_channels, _ = layer.get_weights()[0].shape
+            branch = "num" if in_channels == 2 else "text"
+            convs[branch].append((kernel_size, layer))
+        elif kind == "Dense":
+            kernel = layer.get_weights()[0]
+            if kernel.shape[1] == 1:
+                roles["output"] = layer
+            else:
+                hidden_dense.append((kernel.shape[0], layer))
+
+    for branch, layers in convs.items():
+        if len(layers) == 2:
+            layers.sort(key=lambda item: item[0])
+            roles[f"{branch}_conv3"], roles[f"{branch}_conv5"] = layers[0][1], layers[1][1]
+
+    # The static Dense sees the raw static features; the fusion Dense sees the
+    # (much wider) concatenation of every branch.
+    if len(hidden_dense) == 2:
+        hidden_dense.sort(key=lambda item: item[0])
+        roles["static"], roles["fusion"] = hidden_dense[0][1], hidden_dense[1][1]
+
+    missing = [r for r in ("embedding",) + _CONV_KEYS + ("static", "fusion", "output") if r not in roles]
+    if missing:
+        raise ValueError(f"Model is not a DMSW network (missing {', '.join(missing)})")
+    return roles
+
+
+def extract_weights(model) -> dict:
+    """Collect the DMSW weights from a Keras model into a flat dict of arrays."""
+    weights = {}
+    for role, layer in dmsw_layers(model).items():
+        params = layer.get_weights()
+        if role == "embedding":
+            weights["embedding"] = params[0]
+        else:
+            weights[f"{role}_w"], weights[f"{role}_b"] = params
+    return {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+
+
+def behavior_tokens(vocab) -> np.ndarray:
+    """Token ID of each of BEHAVIOR_PHRASES (first token of the phrase, 0 if none)."""
+    return vocab.first_token_ids(BEHAVIOR_PHRASES)
+
+
+def fuse_preprocessing(weights: dict, scaler, tokens) -> dict:
+    """
+    Fold a fitted StandardScaler into the numeric Conv1D layers.
+
+    The convolutions see ``(x - mean_) / scale_``, so dividing each kernel's
+    input channels by ``scale_`` and moving the mean into the bias gives the
+    same output on raw values. "same" padding adds zeros in the scaled space,
+    which is ``mean_`` in raw space; the fused engine pads with it so edge
+    weeks stay exact.
+    """
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+    fused = dict(weights)
+    for key in ("num_conv3", "num_conv5"):
+        kernel = weights[f"{key}_w"].astype(np.float64) / scale[np.newaxis, :, np.newaxis]
+        bias = weights[f"{key}_b"].astype(np.float64) - np.einsum("kcf,c->f", kernel, mean)
+        fused[f"{key}_w"] = kernel.astype(np.float32)
+        fused[f"{key}_b"] = bias.astype(np.float32)
+    fused["num_fill"] = mean.astype(np.float32)
+    fused["behavior_tokens"] = np.asarray(tokens, dtype=np.int64)
+    return fused
+
+
+def export_npz(model, path: str = DMSW_WEIGHTS_PATH, scaler=None, vocab=None) -> str:
+    """
+    Write the weights of a Keras DMSW model to a flat ``.npz`` file.
+
+    With both ``scaler`` and ``vocab`` (a ``vocab.Vocabulary``) the
+    preprocessing is folded in (format version 2); otherwise the plain
+    weights are written.
+    """
+    weights = extract_weights(model)
+    version = WEIGHTS_FORMAT_VERSION
+    if scaler is not None and vocab is not None:
+        weights = fuse_preprocessing(weights, scaler, behavior_tokens(vocab))
+        version = FUSED_WEIGHTS_FORMAT_VERSION
+    np.savez(path, format_version=np.array(version), **weights)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Forward pass
+# ---------------------------------------------------------------------------
+def _conv1d_same_relu(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray,
+                      fill: np.ndarray = None) -> np.ndarray:
+    """
+    Conv1D(padding="same", activation="relu") over a (N, T, C) batch.
+
+    ``fill`` (C,) is the per-channel padding value (zeros when omitted).
+    """
+    kernel_size, in_channels, filters = kernel.shape
+    n, steps = x.shape[:2]
+    left = (kernel_size - 1) // 2
+    right = kernel_size - 1 - left
+    if fill is None:
+        padded = np.pad(x, ((0, 0), (left, right), (0, 0)))
+    else:
+        padded = np.empty((n, steps + left + right, in_channels), dtype=np.result_type(x, fill))
+        padded[:, :left] = fill
+        padded[:, left:left + steps] = x
+        padded[:, left + steps:] = fill
+    # im2col: (N, T, k*C) so the whole convolution is one matmul
+    cols = np.concatenate([padded[:, i:i + steps, :] for i in range(kernel_size)], axis=2)
+    out = cols @ kernel.reshape(kernel_size * in_channels, filters) + bias
+    return np.maximum(out, 0.0)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyDMSW:
+    """
+    DMSW forward pass evaluated with NumPy; a drop-in for ``model.predict``.
+
+    When ``fused`` is true the numeric input is raw (unscaled) attendance and
+    grade, and ``behavior_tokens`` holds the token ID of each behaviour phrase.
+    """
+
+    def __init__(self, weights: dict):
+        weights = dict(weights)
+        tokens = weights.pop("behavior_tokens", None)
+        self.weights = {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+        self.behavior_tokens = None if tokens is None else np.asarray(tokens, dtype=np.int64)
+        self.fused = "num_fill" in self.weights
+
+    @classmethod
+    def load(cls, path: str = DMSW_WEIGHTS_PATH) -> "NumpyDMSW":
+        with np.load(path) as data:
+            version = int(data["format_version"]) if "format_version" in data else 0
+            if version not in (WEIGHTS_FORMAT_VERSION, FUSED_WEIGHTS_FORMAT_VERSION):
+                raise ValueError(f"Unsupported DMSW weights format version {version}")
+            return cls({k: data[k] for k in data.files if k != "format_version"})
+
+    @classmethod
+    def from_keras(cls, model, scaler=None, vocab=None) -> "NumpyDMSW":
+        weights = extract_weights(model)
+        if scaler is not None and vocab is not None:
+            weights = fuse_preprocessing(weights, scaler, behavior_tokens(vocab))
+        return cls(weights)
+
+    def _pooled_conv(self, x: np.ndarray, key: str, fill: np.ndarray = None) -> np.ndarray:
+        w = self.weights
+        return _conv1d_same_relu(x, w[f"{key}_w"], w[f"{key}_b"], fill).max(axis=1)
+
+    def text_features(self, X_text) -> np.ndarray:
+        """Pooled output of the text branch (Embedding -> Conv1D k=3,5 -> max), (N, 64)."""
+        embedded = self.weights["embedding"][np.asarray(X_text, dtype=np.int64)]
+        return np.concatenate([
+            self._pooled_conv(embedded, "text_conv3"),
+            self._pooled_conv(embedded, "text_conv5"),
+        ], axis=1)
+
+    def predict_with_text_features(self, X_num, text_features, X_static, batch_size=None) -> np.ndarray:
+        """Evaluate the numeric and static branches plus the fusion head, (N, 1)."""
+        w = self.weights
+        X_num = np.asarray(X_num, dtype=np.float32)
+        X_static = np.asarray(X_static, dtype=np.float32)
+        static = np.maximum(X_static @ w["static_w"] + w["static_b"], 0.0)
+
+        fill = w.get("num_fill")
+        merged = np.concatenate([
+            self._pooled_conv(X_num, "num_conv3", fill),
+            self._pooled_conv(X_num, "num_conv5", fill),
+            np.asarray(text_features, dtype=np.float32),
+            static,
+        ], axis=1)
+
+        # Dropout is inactive at inference time
+        hidden = np.maximum(merged @ w["fusion_w"] + w["fusion_b"], 0.0)
+        return _sigmoid(hidden @ w["output_w"] + w["output_b"])
+
+    def predict(self, inputs, batch_size=None, verbose=0) -> np.ndarray:
+        """
+        Evaluate the network on ``[X_num, X_text, X_static]``.
+
+        Accepts the same inputs as the Keras model (with raw ``X_num`` when
+        fused) and returns a (N, 1) array of dropout probabilities. ``batch_size`` and ``verbose`` are accepted
+        for call compatibility and ignored.
+        """
+        X_num, X_text, X_static = inputs
+        return self.predict_with_text_features(X_num, self.text_features(X_text), X_static)
+
+
+class KerasDMSW:
+    """
+    Keras model wrapper exposing the same interface as ``NumpyDMSW``.
+
+    The text branch and the remaining network are rebuilt as two sub-models
+    that share the original layers, so pooled text features can be computed
+    once and fed back into the head. Inputs are always scaled and tokenized
+    by the caller.
+    """
+
+    fused = False
+    behavior_tokens = None
+
+    def __init__(self, model):
+        from tensorflow.keras.layers import Concatenate, GlobalMaxPooling1D, Input
+        from tensorflow.keras.models import Model
+
+        self.model = model
+        roles = dmsw_layers(model)
+        max_len, num_features = model.inputs[0].shape[1], model.inputs[0].shape[2]
+        num_static = roles["static"].get_weights()[0].shape[0]
+        text_width = sum(roles[k].get_weights()[1].shape[0] for k in ("text_conv3", "text_conv5"))
+
+        text_in = Input(shape=(max_len,))
+        embedded = roles["embedding"](text_in)
+        text_out = Concatenate()([
+            GlobalMaxPooling1D()(roles["text_conv3"](embedded)),
+            GlobalMaxPooling1D()(roles["text_conv5"](embedded)),
+        ])
+        self.text_model = Model(text_in, text_out)
+
+        num_in = Input(shape=(max_len, num_features))
+        text_feat_in = Input(shape=(text_width,))
+        static_in = Input(shape=(num_static,))
+        merged = Concatenate()([
+            GlobalMaxPooling1D()(roles["num_conv3"](num_in)),
+            GlobalMaxPooling1D()(roles["num_conv5"](num_in)),
+            text_feat_in,
+            roles["static"](static_in),
+        ])
+        head_out = roles["output"](roles["fusion"](merged))
+        self.head_model = Model([num_in, text_feat_in, static_in], head_out)
+
+    def text_features(self, X_text, batch_size=None) -> np.ndarray:
+        return self.text_model.predict(np.asarray(X_text), batch_size=batch_size, verbose=0)
+
+    def predict_with_text_features(self, X_num, text_features, X_static, batch_size=None) -> np.ndarray:
+        return self.head_model.predict(
+            [np.asarray(X_num), np.asarray(text_features), np.asarray(X_static)],
+            batch_size=batch_size,
+            verbose=0,
+        )
+
+    def predict(self, inputs, batch_size=None, verbose=0) -> np.ndarray:
+        return self.model.predict(inputs, batch_size=batch_size, verbose=verbose)
+
+
+def _tflite_interpreter_class():
+    """The TFLite Interpreter class from the lightest runtime that is installed."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteDMSW:
+    """
+    Quantized TFLite export exposing the same interface as ``NumpyDMSW``.
+
+    The flatbuffer has two signatures: the text branch and the rest of the
+    network (with the scaler folded in, so ``X_num`` is raw attendance and
+    grade). One interpreter is not thread-safe, so calls are serialized.
+    """
+
+    fused = True
+    behavior_tokens = None
+
+    def __init__(self, model_content: bytes, num_threads: int = None):
+        Interpreter = _tflite_interpreter_class()
+        self.interpreter = Interpreter(model_content=model_content, num_threads=num_threads)
+        self._text = self.interpreter.get_signature_runner(TFLITE_TEXT_SIGNATURE)
+        self._head = self.interpreter.get_signature_runner(TFLITE_HEAD_SIGNATURE)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = DMSW_TFLITE_PATH, num_threads: int = None) -> "TFLiteDMSW":
+        with open(path, "rb") as f:
+            return cls(f.read(), num_threads=num_threads)
+
+    def text_features(self, X_text) -> np.ndarray:
+        with self._lock:
+            out = self._text(X_text=np.asarray(X_text, dtype=np.float32))
+        return next(iter(out.values()))
+
+    def predict_with_text_features(self, X_num, text_features, X_static, batch_size=None) -> np.ndarray:
+        with self._lock:
+            out = self._head(
+                X_num=np.asarray(X_num, dtype=np.float32),
+                text_features=np.asarray(text_features, dtype=np.float32),
+                X_static=np.asarray(X_static, dtype=np.float32),
+            )
+        return next(iter(out.values()))
+
+    def predict(self, inputs, batch_size=None, verbose=0) -> np.ndarray:
+        X_num, X_text, X_static = inputs
+        return self.predict_with_text_features(X_num, self.text_features(X_text), X_static)
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "export":
+        print(__doc__[__doc__.index("Usage:"):].rstrip())
+        return 1
+
+    model_path = argv[1] if len(argv) > 1 else DMSW_MODEL_PATH
+    weights_path = argv[2] if len(argv) > 2 else DMSW_WEIGHTS_PATH
+
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+    import pickle
+
+    from tensorflow.keras.models import load_model
+
+    from vocab import Vocabulary
+
+    scaler = vocab = None
+    if os.path.exists(DMSW_SCALER_PATH) and os.path.exists(DMSW_VOCAB_PATH):
+        with open(DMSW_SCALER_PATH, "rb") as f:
+            scaler = pickle.load(f)
+        vocab = Vocabulary.load(DMSW_VOCAB_PATH)
+
+    export_npz(load_model(model_path), weights_path, scaler=scaler, vocab=vocab)
+    kind = "fused scaler + vocabulary" if scaler is not None else "plain weights"
+    print(f"Exported {model_path} -> {weights_path} ({kind})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
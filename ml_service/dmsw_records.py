@@ -0,0 +1,166 @@
+"""
+Sharded TFRecord files of the DMSW training tensors and the tf.data input
+pipeline that streams them.
+
+``write_shards`` copies the train and test splits of the (memory-mapped)
+dataset into fixed-size TFRecord shards, one split at a time and one shard
+at a time, so host memory use does not depend on the dataset size. The
+shards are written next to the tensor cache entry they come from and are
+rebuilt only when the entry, the split or the shard size changes.
+
+``make_dataset`` reads them back as an input pipeline: shards are read in
+parallel and interleaved, examples are shuffled in a bounded buffer, then
+batched, decoded with one vectorized ``parse_example`` per batch on parallel
+map calls, and prefetched while the model trains on the previous batch.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+RECORDS_DIR = "records"
+MANIFEST = "manifest.json"
+RECORDS_FORMAT_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+def _example(num: np.ndarray, text: np.ndarray, static: np.ndarray, label) -> bytes:
+    return tf.train.Example(features=tf.train.Features(feature={
+        "X_num": tf.train.Feature(float_list=tf.train.FloatList(value=num.reshape(-1))),
+        "X_text": tf.train.Feature(int64_list=tf.train.Int64List(value=text)),
+        "X_static": tf.train.Feature(float_list=tf.train.FloatList(value=static)),
+        "y": tf.train.Feature(int64_list=tf.train.Int64List(value=[int(label)])),
+    })).SerializeToString()
+
+
+def _split_digest(splits: dict) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(splits):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(splits[name], dtype=np.int64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _load_manifest(records_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(records_dir, MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_shards(X: list, y, splits: dict, entry_dir: str, records_per_shard: int = 4096) -> dict:
+    """
+    TFRecord shards of ``X``/``y`` for each split (name -> sample indices),
+    in index order, under ``<entry_dir>/records``. Returns the manifest.
+
+    Shards that already match the splits and shard size are reused.
+    """
+    records_dir = os.path.join(entry_dir, RECORDS_DIR)
+    digest = _split_digest(splits)
+    manifest = _load_manifest(records_dir)
+    if (manifest is not None and manifest["format_version"] == RECORDS_FORMAT_VERSION
+            and manifest["split_digest"] == digest and manifest["records_per_shard"] == records_per_shard):
+        return manifest
+
+    X_num, X_text, X_static = X
+    manifest = {
+        "format_version": RECORDS_FORMAT_VERSION,
+        "split_digest": digest,
+        "records_per_shard": records_per_shard,
+        "num_shape": list(X_num.shape[1:]),
+        "text_len": int(X_text.shape[1]),
+        "num_static": int(X_static.shape[1]),
+        "splits": {},
+    }
+
+    tmp_dir = tempfile.mkdtemp(prefix=f".{RECORDS_DIR}-", dir=entry_dir)
+    os.chmod(tmp_dir, 0o755)  # mkdtemp creates it private
+    try:
+        for name, idx in splits.items():
+            num_shards = max(1, -(-len(idx) // records_per_shard))
+            shards = []
+            for shard in range(num_shards):
+                rows = idx[shard * records_per_shard:(shard + 1) * records_per_shard]
+                # Fancy indexing a memmap reads only these rows
+                num = X_num[rows].astype(np.float32)
+                text = X_text[rows].astype(np.int64)
+                static = X_static[rows].astype(np.float32)
+                labels = y[rows]
+                filename = f"{name}-{shard:05d}-of-{num_shards:05d}.tfrecord"
+                with tf.io.TFRecordWriter(os.path.join(tmp_dir, filename)) as writer:
+                    for i in range(len(rows)):
+                        writer.write(_example(num[i], text[i], static[i], labels[i]))
+                shards.append(filename)
+            manifest["splits"][name] = {"samples": int(len(idx)), "shards": shards}
+
+        with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        shutil.rmtree(records_dir, ignore_errors=True)
+        os.replace(tmp_dir, records_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def _parser(manifest: dict):
+    features = {
+        "X_num": tf.io.FixedLenFeature(manifest["num_shape"], tf.float32),
+        "X_text": tf.io.FixedLenFeature([manifest["text_len"]], tf.int64),
+        "X_static": tf.io.FixedLenFeature([manifest["num_static"]], tf.float32),
+        "y": tf.io.FixedLenFeature([], tf.int64),
+    }
+
+    def parse(serialized):
+        batch = tf.io.parse_example(serialized, features)
+        return (batch["X_num"], batch["X_text"], batch["X_static"]), batch["y"]
+
+    return parse
+
+
+def make_dataset(entry_dir: str, manifest: dict, split: str, batch_size: int,
+                 shuffle_buffer: int = 0, seed: int = None) -> tf.data.Dataset:
+    """
+    Batched ((X_num, X_text, X_static), y) pipeline over one split's shards.
+
+    With ``shuffle_buffer`` > 0 the shard order is reshuffled every epoch,
+    shards are interleaved non-deterministically (whichever read finishes
+    first) and examples go through a bounded shuffle buffer. Without it
+    the examples come back in the order they were written.
+    """
+    records_dir = os.path.join(entry_dir, RECORDS_DIR)
+    files = [os.path.join(records_dir, name) for name in manifest["splits"][split]["shards"]]
+    shuffle = shuffle_buffer > 0
+
+    dataset = tf.data.Dataset.from_tensor_slices(files)
+    if shuffle:
+        dataset = dataset.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+    # Whole-shard blocks keep the deterministic order equal to the written order
+    dataset = dataset.interleave(
+        tf.data.TFRecordDataset,
+        cycle_length=min(len(files), os.cpu_count() or 1),
+        block_length=1 if shuffle else manifest["records_per_shard"],
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    )
+    # Known length, so Keras shows progress and does not warn at epoch end
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(manifest["splits"][split]["samples"]))
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return (
+        dataset.batch(batch_size)
+        .map(_parser(manifest), num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+        .prefetch(tf.data.AUTOTUNE)
+    )
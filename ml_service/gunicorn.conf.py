@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration for production serving of the DMSW API.
+
+    gunicorn -c gunicorn.conf.py api_server:app
+
+The app is imported once in the master (``preload_app``), so the model
+weights, vocabulary and scaler are loaded before forking and shared
+copy-on-write by every worker. Each worker gets a slice of the machine's
+cores for its math libraries so workers don't oversubscribe the CPU.
+
+Environment:
+  ML_BIND              — bind address (default 0.0.0.0:5001)
+  ML_WORKERS           — worker processes (default: number of cores)
+  ML_THREADS           — request threads per worker (default 4)
+  ML_INTRA_OP_THREADS  — math threads per worker (default: cores // workers)
+  ML_INTER_OP_THREADS  — TensorFlow inter-op threads per worker (default 1)
+  ML_TIMEOUT           — worker timeout in seconds (default 60)
+"""
+
+import gc
+import multiprocessing
+import os
+
+_cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get("ML_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("ML_WORKERS", str(_cpu_count)))
+threads = int(os.environ.get("ML_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.environ.get("ML_TIMEOUT", "60"))
+accesslog = "-"
+
+intra_op_threads = int(os.environ.get("ML_INTRA_OP_THREADS", str(max(1, _cpu_count // workers))))
+inter_op_threads = int(os.environ.get("ML_INTER_OP_THREADS", "1"))
+
+# Thread caps must be in the environment before NumPy/BLAS or TensorFlow are
+# imported, which happens when the app is preloaded right after this file.
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+    os.environ.setdefault(_var, str(intra_op_threads))
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", str(inter_op_threads))
+
+# Load synchronously in the master so workers inherit ready artifacts.
+os.environ["FAST_START"] = "0"
+
+# TensorFlow's runtime is not fork-safe, so the Keras and TFLite engines load
+# their own copy in each worker; the NumPy engine is shared copy-on-write.
+preload_app = os.environ.get("DMSW_ENGINE", "auto").lower() not in ("keras", "tflite")
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (the loaded artifacts) out of the
+    # collector's generations so GC passes in workers don't touch those pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import api_server
+
+    api_server.configure_worker(intra_op_threads, inter_op_threads)
+    server.log.info(
+        "Worker %s ready (intra-op threads %d, inter-op threads %d)",
+        worker.pid, intra_op_threads, inter_op_threads,
+    )
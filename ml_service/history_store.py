@@ -0,0 +1,204 @@
+"""
+Per-student ring buffers of weekly observations for the DMSW model.
+
+``HistoryStore`` keeps the last ``window`` weeks (attendance, grade and the
+behaviour text's token ID) of every student it has seen, in preallocated
+NumPy arrays with one row per student. Each row is a mirrored ring: week
+``i`` is written at positions ``i % window`` and ``i % window + window``, so
+the most recent ``window`` weeks are always the contiguous slice
+``[head, head + window)``, oldest first. Appending costs two writes per
+array and reading a window is one slice copy; the history is never rebuilt
+from a list of weeks.
+
+A student's first week is written to every slot of the row, so until
+``window`` weeks have been appended the window starts with copies of the
+first observation (the same constant history /predict assumes).
+"""
+
+import threading
+
+import numpy as np
+
+from columnar import NOT_AN_OBJECT
+
+NUM_FEATURES = 2  # attendance, grade
+
+
+class HistoryStoreFull(Exception):
+    """Raised when a new student would exceed ``max_students``."""
+
+
+def parse_week(row) -> tuple[tuple, list[str]]:
+    """
+    (attendance, grade, behavior text or None) and validation messages for
+    one week, using the same range rules as student records.
+    """
+    if not isinstance(row, dict):
+        return (0.0, 0.0, None), [NOT_AN_OBJECT]
+
+    values = []
+    errors = []
+    for key in ("attendance", "avgGrade"):
+        try:
+            value = float(row.get(key))
+        except (TypeError, ValueError, OverflowError):
+            value = None
+        if value is None or not 0 <= value <= 100:
+            errors.append(f"{key} must be between 0 and 100")
+            value = 0.0
+        values.append(value)
+
+    behavior = row.get("behavior")
+    if behavior is not None and not isinstance(behavior, str):
+        errors.append("behavior must be a string")
+        behavior = None
+    return (values[0], values[1], behavior), errors
+
+
+class HistoryStore:
+    """Thread-safe, array-backed ring buffer of the last ``window`` weeks per student."""
+
+    def __init__(self, window: int, capacity: int = 1024, max_students: int = 100000):
+        self.window = int(window)
+        self.max_students = max(1, int(max_students))
+        capacity = max(1, min(int(capacity), self.max_students))
+
+        self._numeric = np.zeros((capacity, 2 * self.window, NUM_FEATURES), dtype=np.float64)
+        self._tokens = np.zeros((capacity, 2 * self.window), dtype=np.int64)
+        self._texts = np.empty((capacity, self.window), dtype=object)  # for re-tokenizing
+        self._head = np.zeros(capacity, dtype=np.int64)   # slot the next week is written to
+        self._weeks = np.zeros(capacity, dtype=np.int64)  # weeks appended so far
+
+        self._slots = {}  # student_id -> row
+        self._free = []   # rows of removed students
+        self._vocab = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # ------------------------------------------------------------------
+    # Vocabulary
+    # ------------------------------------------------------------------
+    def _token_id(self, text: str) -> int:
+        return 0 if self._vocab is None else self._vocab.first_token_id(text)
+
+    def set_vocabulary(self, vocab):
+        """
+        Tokenize behaviour text with ``vocab`` from now on and re-tokenize
+        every stored week (one vectorized lookup). With no vocabulary every
+        token is 0 (padding).
+        """
+        with self._lock:
+            self._vocab = vocab
+            rows = list(self._slots.values())
+            if not rows:
+                return
+            texts = self._texts[rows]
+            if vocab is None:
+                tokens = np.zeros(texts.shape, dtype=np.int64)
+            else:
+                tokens = vocab.first_token_ids(texts)
+            # Stored texts are in ring-slot order, so both halves get the same IDs
+            self._tokens[rows, :self.window] = tokens
+            self._tokens[rows, self.window:] = tokens
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _grow(self):
+        capacity = min(2 * len(self._head), self.max_students)
+        for name in ("_numeric", "_tokens", "_texts", "_head", "_weeks"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            if old.dtype == object:
+                new.fill(None)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _slot_for(self, student_id) -> int:
+        row = self._slots.get(student_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self._slots)
+            if row >= self.max_students:
+                raise HistoryStoreFull(f"History store is full ({self.max_students} students)")
+            if row >= len(self._head):
+                self._grow()
+        self._slots[student_id] = row
+        self._head[row] = 0
+        self._weeks[row] = 0
+        return row
+
+    def append(self, student_id, attendance: float, grade: float, text: str) -> int:
+        """Append one week for ``student_id``; returns the number of weeks stored."""
+        with self._lock:
+            row = self._slot_for(student_id)
+            token = self._token_id(text)
+
+            if self._weeks[row] == 0:
+                # Backfill the whole ring with the first observation
+                self._numeric[row] = (attendance, grade)
+                self._tokens[row] = token
+                self._texts[row] = text
+                self._head[row] = 0
+            else:
+                slot = self._head[row]
+                self._numeric[row, slot] = self._numeric[row, slot + self.window] = (attendance, grade)
+                self._tokens[row, slot] = self._tokens[row, slot + self.window] = token
+                self._texts[row, slot] = text
+                self._head[row] = (slot + 1) % self.window
+
+            self._weeks[row] += 1
+            return min(int(self._weeks[row]), self.window)
+
+    def remove(self, student_id) -> bool:
+        """Forget a student's history; returns False when there was none."""
+        with self._lock:
+            row = self._slots.pop(student_id, None)
+            if row is None:
+                return False
+            self._texts[row] = None
+            self._weeks[row] = 0
+            self._free.append(row)
+            return True
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def window_of(self, student_id):
+        """
+        (numeric (window, 2), tokens (window,), weeks stored) for a student,
+        oldest week first, or None when the student has no history.
+
+        The arrays are copies, so later appends do not change them.
+        """
+        with self._lock:
+            row = self._slots.get(student_id)
+            if row is None:
+                return None
+            head = self._head[row]
+            numeric = self._numeric[row, head:head + self.window].copy()
+            tokens = self._tokens[row, head:head + self.window].copy()
+            return numeric, tokens, min(int(self._weeks[row]), self.window)
+
+    def texts_of(self, student_id) -> list | None:
+        """Behaviour texts of the stored window, oldest first (None when unknown)."""
+        with self._lock:
+            row = self._slots.get(student_id)
+            if row is None:
+                return None
+            head = self._head[row]
+            return [self._texts[row, (head + i) % self.window] for i in range(self.window)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "students": len(self._slots),
+                "capacity": len(self._head),
+                "max_students": self.max_students,
+                "window": self.window,
+            }
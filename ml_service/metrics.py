@@ -0,0 +1,234 @@
+"""
+Minimal Prometheus metrics with per-thread shards.
+
+Counters and histograms keep one shard of values per thread. A thread only
+ever writes its own shard, so the hot path takes no lock; ``render`` sums the
+shards at scrape time. Shards of threads that have exited are folded into a
+retired shard, so per-request threads (the dev server) don't pile up.
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) from 50 µs to 10 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+# Dead-thread shards are folded after this many new shards
+_SWEEP_EVERY = 64
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _ShardedMetric:
+    """Base for metrics whose values live in per-thread ``{labels: cell}`` dicts."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []  # (weakref to owning thread, values)
+        self._retired = {}
+        self._new_since_sweep = 0
+        if registry is not None:
+            registry.register(self)
+
+    # Subclasses define the cell layout
+    def _new_cell(self):
+        raise NotImplementedError
+
+    def _merge(self, into, cell):
+        raise NotImplementedError
+
+    def _values(self) -> dict:
+        """This thread's shard (created on first use)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            pass
+        values = self._local.values = {}
+        with self._lock:
+            self._shards.append((weakref.ref(threading.current_thread()), values))
+            self._new_since_sweep += 1
+            if self._new_since_sweep >= _SWEEP_EVERY:
+                self._sweep()
+        return values
+
+    def _sweep(self):
+        """Fold shards of exited threads into the retired shard (lock held)."""
+        live = []
+        for thread_ref, values in self._shards:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                self._merge_into(self._retired, values)
+            else:
+                live.append((thread_ref, values))
+        self._shards = live
+        self._new_since_sweep = 0
+
+    def _merge_into(self, totals: dict, values: dict):
+        for labels, cell in values.copy().items():
+            if labels not in totals:
+                totals[labels] = self._new_cell()
+            self._merge(totals[labels], cell)
+
+    def snapshot(self) -> dict:
+        """Sum of all shards, ``{label values: cell}``."""
+        with self._lock:
+            self._sweep()
+            totals = {}
+            self._merge_into(totals, self._retired)
+            for _, values in self._shards:
+                self._merge_into(totals, values)
+        return totals
+
+
+class Counter(_ShardedMetric):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def _new_cell(self):
+        return [0]
+
+    def _merge(self, into, cell):
+        into[0] += cell[0]
+
+    def inc(self, *labels, amount=1):
+        values = self._values()
+        cell = values.get(labels)
+        if cell is None:
+            cell = values[labels] = [0]
+        cell[0] += amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(cell[0])}"
+            for labels, cell in sorted(self.snapshot().items())
+        ]
+
+
+class Histogram(_ShardedMetric):
+    """Cumulative-bucket histogram; cells are per-bucket counts plus the sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS,
+                 registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_cell(self):
+        # One slot per bucket, one for +Inf, then the running sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _merge(self, into, cell):
+        for i, value in enumerate(list(cell)):
+            into[i] += value
+
+    def observe(self, value, *labels):
+        values = self._values()
+        cell = values.get(labels)
+        if cell is None:
+            cell = values[labels] = self._new_cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, cell in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _format_number(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_number(cell[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge for rarely-changing values (set under a lock, not sharded)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def replace(self, value, *labels):
+        """Drop every other label set and set this one (e.g. an info gauge)."""
+        with self._lock:
+            self._values = {labels: value}
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+            for labels, value in items
+        ]
@@ -0,0 +1,155 @@
+"""
+Dynamic micro-batching for concurrent single-item requests.
+
+Callers block in ``submit``; a single worker thread gathers everything that
+arrives within ``max_wait_ms`` of the first queued item (or until
+``max_batch_size`` items are waiting), scores the whole group with one call to
+``batch_fn`` and hands each caller its own result.
+
+If the batched call raises, the items are retried one at a time, so an
+exception only reaches the caller whose item caused it. A result list of the
+wrong length is an error for every caller in the batch; results are never
+paired up positionally past a mismatch.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``submit`` calls into batched ``batch_fn`` calls."""
+
+    def __init__(self, batch_fn, max_batch_size: int = 64, max_wait_ms: float = 3.0,
+                 name: str = "micro-batcher"):
+        """
+        ``batch_fn`` receives a list of submitted items and must return a
+        sequence of results of the same length and order.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        # Metrics (only the worker thread writes these)
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._size_histogram = {}
+        self._failures = 0  # batched calls that raised and were retried per item
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, item, timeout: float = None):
+        """Queue ``item`` and block until its result is ready."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def stats(self) -> dict:
+        """Snapshot of queue-wait and batch-size metrics."""
+        batches = self._batches
+        items = self._items
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "largest_batch": self._max_batch,
+            "avg_queue_wait_ms": round(self._wait_total / items * 1000, 3) if items else 0.0,
+            "max_queue_wait_ms": round(self._wait_max * 1000, 3),
+            "queue_depth": self._queue.qsize(),
+            "batch_size_histogram": {str(k): v for k, v in sorted(self._size_histogram.items())},
+            "batch_failures": self._failures,
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        """Block for the first item, then gather until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self._record(batch, started)
+
+            if len(batch) > 1:
+                try:
+                    results = self.batch_fn([item for item, _, _ in batch])
+                except Exception:
+                    self._failures += 1
+                    for entry in batch:
+                        self._complete([entry])
+                    continue
+                self._resolve(batch, results)
+            else:
+                self._complete(batch)
+
+    def _complete(self, batch: list):
+        """Score ``batch`` with one call and resolve its futures, or fail them all."""
+        try:
+            results = self.batch_fn([item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        self._resolve(batch, results)
+
+    def _resolve(self, batch: list, results):
+        try:
+            count = len(results)
+        except TypeError:
+            count = None
+        if count != len(batch):
+            error = RuntimeError(
+                f"{self.name}: batch_fn returned {count} results for {len(batch)} items"
+            )
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _record(self, batch: list, started: float):
+        size = len(batch)
+        self._batches += 1
+        self._items += size
+        self._max_batch = max(self._max_batch, size)
+        self._size_histogram[size] = self._size_histogram.get(size, 0) + 1
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self._wait_total += wait
+            if wait > self._wait_max:
+                self._wait_max = wait
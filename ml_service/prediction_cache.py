@@ -0,0 +1,76 @@
+"""
+In-process LRU cache for deterministic prediction results.
+
+Keys are the normalized feature tuple extracted by the API plus the model
+version, so a retrained model never serves stale scores even before the cache
+is explicitly cleared.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry."""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 0.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl_seconds) if ttl_seconds and ttl_seconds > 0 else None
+
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None (counts a hit or miss)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after model artifacts are reloaded."""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,136 @@
+"""
+Sampling CPU profiler for live requests.
+
+Request threads register themselves with ``start`` / ``stop``. While at least
+one request is registered, a sampler thread wakes every ``interval_ms``,
+reads the current frame of each registered thread (plus any helper threads
+named in ``helper_threads``, e.g. the micro-batcher that runs the model for
+/predict) and counts the stack. Stacks are aggregated across requests and
+exported in the collapsed format read by flamegraph.pl, speedscope and
+inferno: ``root;outer;...;inner <count>`` per line.
+
+Nothing here runs unless the service registers the profiler's hooks.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Outermost-first, semicolon-separated labels of a frame's stack."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Aggregate stack samples of registered threads into collapsed stacks."""
+
+    def __init__(self, interval_ms: float = 5.0, helper_threads=(), name: str = "profiler"):
+        self.interval = max(0.1, float(interval_ms)) / 1000.0
+        self.helper_threads = frozenset(helper_threads)
+        self.name = name
+
+        self._active = {}  # thread ident -> root label
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.requests = 0
+        self.samples = 0
+        self.since = time.time()
+
+    # ------------------------------------------------------------------
+    # Request registration
+    # ------------------------------------------------------------------
+    def start(self, label: str):
+        """Sample the calling thread under ``label`` until ``stop``."""
+        self._ensure_thread()
+        with self._lock:
+            self._active[threading.get_ident()] = label
+            self.requests += 1
+            self._wake.set()
+
+    def stop(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not self._active:
+                self._wake.clear()
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def collapsed(self) -> str:
+        """Aggregated stacks, one ``stack count`` line each, heaviest first."""
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "interval_ms": round(self.interval * 1000, 3),
+                "profiled_requests": self.requests,
+                "samples": self.samples,
+                "unique_stacks": len(self._stacks),
+                "active_requests": len(self._active),
+                "since": self.since,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.requests = 0
+            self.samples = 0
+            self.since = time.time()
+
+    # ------------------------------------------------------------------
+    # Sampler
+    # ------------------------------------------------------------------
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self._sample()
+
+    def _sample(self):
+        with self._lock:
+            targets = dict(self._active)
+        if not targets:
+            return
+        if self.helper_threads:
+            for thread in threading.enumerate():
+                if thread.name in self.helper_threads and thread.ident is not None:
+                    targets.setdefault(thread.ident, thread.name)
+
+        frames = sys._current_frames()
+        stacks = []
+        for ident, label in targets.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                stacks.append(f"{label};{_collapse(frame)}")
+        del frames
+
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += 1
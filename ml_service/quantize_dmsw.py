@@ -0,0 +1,360 @@
+"""
+Quantized TFLite export of the DMSW model with an accuracy parity gate.
+
+Rebuilds the forward pass of dmsw_model.h5 from its weights as TF ops and
+converts it into one TFLite flatbuffer with two signatures, the text branch
+and the rest of the network, so the API can keep caching the pooled text
+features per behaviour phrase. The StandardScaler is applied inside the
+graph, so the export takes raw attendance and grade like the fused NumPy
+weights.
+
+Modes:
+  dynamic   int8 weights, float activations (dynamic-range quantization)
+  int8      int8 weights and activations, calibrated on API inputs from the
+            training split of dmsw_student_data.csv (float inputs and outputs)
+  float16   float16 weights
+
+The quantized model is compared with the float Keras model on the inputs the
+API actually builds: a constant 15-week history of one (attendance, grade)
+pair, the behaviour phrase of the grade bucket and the static features, with
+the served score being the heuristic blend (dmsw_engine.blend_risk) of the
+model output. The inputs are every week of every student in the 20% holdout
+split train_dmsw.py evaluates on (read from its tensor cache), plus an
+attendance x grade grid over a sample of holdout static profiles so that
+every risk tier, MEDIUM and HIGH included, is populated. The report gives
+blended and raw probability differences and risk-tier agreement overall and
+per tier. The artifact is only written when the overall agreement and that
+of every populated tier reach --min-tier-agreement; the parity report is
+written either way.
+
+Usage:
+  python quantize_dmsw.py                         — dynamic, written to dmsw_model.tflite
+  python quantize_dmsw.py --mode int8 --calibration-samples 2000
+
+Serve it with DMSW_ENGINE=tflite.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import tensorflow as tf  # noqa: E402
+
+from dmsw_engine import (  # noqa: E402
+    DMSW_MODEL_PATH,
+    DMSW_SCALER_PATH,
+    DMSW_TFLITE_PATH,
+    DMSW_VOCAB_PATH,
+    RISK_TIERS,
+    TFLITE_HEAD_SIGNATURE,
+    TFLITE_TEXT_SIGNATURE,
+    KerasDMSW,
+    NumpyDMSW,
+    TFLiteDMSW,
+    behavior_index,
+    behavior_tokens,
+    blend_risk,
+    extract_weights,
+    risk_level,
+)
+from columnar import ATTENDANCE_COL, GRADE_COL, STATIC_COLS  # noqa: E402
+from train_dmsw import MAX_LEN, load_dataset, split_train_test  # noqa: E402
+from vocab import Vocabulary  # noqa: E402
+
+MODES = ("dynamic", "int8", "float16")
+LATENCY_CALLS = 200
+LATENCY_MAX_SECONDS = 2.0
+GRID_STEP = 5        # attendance / grade step of the API-input grid
+GRID_PROFILES = 20   # holdout static profiles crossed with the grid
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+class _ServingModule(tf.Module):
+    """
+    The DMSW forward pass in TF ops over constant weights, as two functions
+    whose names are the TFLite signature keys. The scaler is applied inside
+    ``head``, so its ``X_num`` is raw attendance and grade.
+    """
+
+    def __init__(self, weights: dict, scaler):
+        super().__init__()
+        w = {k: tf.constant(v) for k, v in weights.items()}
+        mean = tf.constant(scaler.mean_, dtype=tf.float32)
+        scale = tf.constant(scaler.scale_, dtype=tf.float32)
+
+        max_len = MAX_LEN
+        num_features = weights["num_conv3_w"].shape[1]
+        text_width = sum(weights[f"{k}_b"].shape[0] for k in ("text_conv3", "text_conv5"))
+        num_static = weights["static_w"].shape[0]
+
+        def pooled_conv(x, key):
+            conv = tf.nn.conv1d(x, w[f"{key}_w"], stride=1, padding="SAME") + w[f"{key}_b"]
+            return tf.reduce_max(tf.nn.relu(conv), axis=1)
+
+        def dense(x, key):
+            return tf.matmul(x, w[f"{key}_w"]) + w[f"{key}_b"]
+
+        def text_features(X_text):
+            embedded = tf.gather(w["embedding"], tf.cast(X_text, tf.int32))
+            pooled = tf.concat([pooled_conv(embedded, "text_conv3"), pooled_conv(embedded, "text_conv5")], axis=1)
+            return {"text_features": pooled}
+
+        def head(X_num, text_features, X_static):
+            scaled = (X_num - mean) / scale
+            merged = tf.concat([
+                pooled_conv(scaled, "num_conv3"),
+                pooled_conv(scaled, "num_conv5"),
+                text_features,
+                tf.nn.relu(dense(X_static, "static")),
+            ], axis=1)
+            hidden = tf.nn.relu(dense(merged, "fusion"))
+            return {"dropout_probability": tf.sigmoid(dense(hidden, "output"))}
+
+        self.text_features = tf.function(
+            text_features,
+            input_signature=[tf.TensorSpec([None, max_len], tf.float32, name="X_text")],
+        )
+        self.head = tf.function(
+            head,
+            input_signature=[
+                tf.TensorSpec([None, max_len, num_features], tf.float32, name="X_num"),
+                tf.TensorSpec([None, text_width], tf.float32, name="text_features"),
+                tf.TensorSpec([None, num_static], tf.float32, name="X_static"),
+            ],
+        )
+
+
+def convert(weights: dict, scaler, mode: str, calibration: list = None) -> bytes:
+    """TFLite flatbuffer of the DMSW ``weights`` quantized with ``mode``."""
+    module = _ServingModule(weights, scaler)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [module.text_features.get_concrete_function(), module.head.get_concrete_function()], module
+    )
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        converter.representative_dataset = _representative_dataset(module, calibration)
+    return converter.convert()
+
+
+def _representative_dataset(module: _ServingModule, calibration: list):
+    """Calibration samples for both signatures, one student at a time."""
+    X_num, X_text, X_static = (np.asarray(x, dtype=np.float32) for x in calibration)
+    text_features = module.text_features(X_text)["text_features"].numpy()
+
+    def generate():
+        for i in range(len(X_text)):
+            yield TFLITE_TEXT_SIGNATURE, {"X_text": X_text[i:i + 1]}
+        for i in range(len(X_num)):
+            yield TFLITE_HEAD_SIGNATURE, {
+                "X_num": X_num[i:i + 1],
+                "text_features": text_features[i:i + 1],
+                "X_static": X_static[i:i + 1],
+            }
+
+    return generate
+
+
+# ---------------------------------------------------------------------------
+# Parity
+# ---------------------------------------------------------------------------
+def _tiers(probs: np.ndarray) -> list[str]:
+    return [risk_level(float(p)) for p in probs]
+
+
+def _single_row_latency_ms(predict, inputs: list) -> float:
+    """Mean ms per one-student call (up to LATENCY_CALLS calls or LATENCY_MAX_SECONDS)."""
+    row = [x[:1] for x in inputs]
+    predict(row)
+    calls = 0
+    started = time.perf_counter()
+    while calls < LATENCY_CALLS and time.perf_counter() - started < LATENCY_MAX_SECONDS:
+        predict(row)
+        calls += 1
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def parity_report(float_probs: np.ndarray, quant_probs: np.ndarray) -> dict:
+    """Probability differences and risk-tier agreement (overall and per tier) of two score vectors."""
+    diff = np.abs(float_probs - quant_probs)
+    float_tiers = _tiers(float_probs)
+    quant_tiers = _tiers(quant_probs)
+    levels = [level for _, level in RISK_TIERS]
+    confusion = {
+        f: {q: sum(1 for a, b in zip(float_tiers, quant_tiers) if a == f and b == q) for q in levels}
+        for f in levels
+    }
+    per_tier = {}
+    for level in levels:
+        samples = sum(confusion[level].values())
+        per_tier[level] = {
+            "samples": samples,
+            "agreement": round(confusion[level][level] / samples, 4) if samples else None,
+        }
+    return {
+        "samples": len(float_probs),
+        "max_abs_diff": round(float(diff.max()), 6),
+        "mean_abs_diff": round(float(diff.mean()), 6),
+        "tier_agreement": round(float(np.mean([a == b for a, b in zip(float_tiers, quant_tiers)])), 4),
+        "tier_agreement_by_tier": per_tier,  # keyed by the float model's tier
+        "tier_confusion": confusion,  # float tier -> quantized tier -> count
+        "label_agreement": round(float(np.mean((float_probs >= 0.5) == (quant_probs >= 0.5))), 4),
+    }
+
+
+def api_feature_rows(X_num: np.ndarray, X_static: np.ndarray, rng) -> np.ndarray:
+    """
+    (N, 9) feature rows as the API receives them: one per week of every
+    student (raw ``X_num`` windows), then an attendance x grade grid over
+    GRID_PROFILES of the students' static profiles.
+    """
+    students, weeks, _ = X_num.shape
+    weekly = np.hstack([np.repeat(X_static, weeks, axis=0), X_num.reshape(students * weeks, -1)])
+
+    profiles = X_static[rng.permutation(students)[:GRID_PROFILES]]
+    levels = np.arange(0, 100 + GRID_STEP, GRID_STEP, dtype=np.float64)
+    attendance, grade = (a.reshape(-1) for a in np.meshgrid(levels, levels))
+    grid = np.hstack([
+        np.repeat(profiles, len(attendance), axis=0),
+        np.tile(np.column_stack([attendance, grade]), (len(profiles), 1)),
+    ])
+    return np.vstack([weekly, grid]).astype(np.float64)
+
+
+def api_inputs(features: np.ndarray, tokens: np.ndarray) -> list:
+    """
+    Raw model inputs the API builds for ``features``: the (attendance, grade)
+    pair held for all MAX_LEN weeks and the grade bucket's behaviour token.
+    """
+    numeric = features[:, [ATTENDANCE_COL, GRADE_COL]]
+    X_num = np.repeat(numeric[:, np.newaxis, :], MAX_LEN, axis=1)
+    X_text = np.repeat(tokens[behavior_index(features[:, GRADE_COL])][:, np.newaxis], MAX_LEN, axis=1)
+    return [X_num, X_text.astype(np.float64), features[:, STATIC_COLS]]
+
+
+def _load_pickle(path: str):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export a quantized TFLite DMSW model behind a parity gate.")
+    parser.add_argument("--mode", choices=MODES, default="dynamic", help="Quantization mode (default dynamic)")
+    parser.add_argument("--model", default=DMSW_MODEL_PATH, help="Float Keras model to quantize")
+    parser.add_argument("--output", default=DMSW_TFLITE_PATH, help="Where to publish the TFLite model")
+    parser.add_argument("--report", help="Parity report path (default <output>.parity.json)")
+    parser.add_argument("--min-tier-agreement", type=float, default=0.99,
+                        help="Risk-tier agreement (overall and per tier) required to publish (default 0.99)")
+    parser.add_argument("--calibration-samples", type=int, default=500,
+                        help="Training-split API inputs used to calibrate int8 (default 500)")
+    args = parser.parse_args(argv)
+    report_path = args.report or args.output + ".parity.json"
+
+    tf.get_logger().setLevel("ERROR")
+    from tensorflow.keras.models import load_model
+
+    print(f"Loading {args.model} ...")
+    engine = KerasDMSW(load_model(args.model))
+    scaler = _load_pickle(DMSW_SCALER_PATH)
+    vocab = Vocabulary.load(DMSW_VOCAB_PATH)
+
+    # Same holdout split as train_dmsw.py (from its tensor cache), turned
+    # into the constant-history inputs the API scores
+    X, y, _, data_scaler, _ = load_dataset()
+    train_idx, test_idx = split_train_test(y)
+    rng = np.random.default_rng(42)
+    tokens = behavior_tokens(vocab)
+
+    def raw_features(idx):
+        X_num = X[0][idx]
+        X_num = data_scaler.inverse_transform(X_num.reshape(-1, X_num.shape[-1])).reshape(X_num.shape)
+        return api_feature_rows(X_num, np.asarray(X[2][idx], dtype=np.float64), rng)
+
+    train_features = raw_features(train_idx)
+    calibration_rows = rng.permutation(len(train_features))[:args.calibration_samples]
+    calibration = api_inputs(train_features[calibration_rows], tokens)
+    holdout_features = raw_features(test_idx)
+    holdout = api_inputs(holdout_features, tokens)
+
+    print(f"Converting ({args.mode}, {len(calibration_rows)} calibration inputs) ...")
+    content = convert(extract_weights(engine.model), scaler, args.mode, calibration)
+    quantized = TFLiteDMSW(content)
+    numpy_engine = NumpyDMSW.from_keras(engine.model, scaler, vocab)
+
+    def float_predict(inputs):
+        X_num, X_text, X_static = inputs
+        scaled = scaler.transform(X_num.reshape(-1, X_num.shape[-1])).reshape(X_num.shape)
+        return engine.predict([scaled, X_text, X_static], batch_size=1024).reshape(-1)
+
+    def numpy_predict(inputs):
+        return numpy_engine.predict(inputs).reshape(-1)
+
+    def quant_predict(inputs):
+        return quantized.predict(inputs).reshape(-1)
+
+    float_raw = float_predict(holdout)
+    quant_raw = quant_predict(holdout)
+    report = parity_report(blend_risk(float_raw, holdout_features), blend_risk(quant_raw, holdout_features))
+    report.update({
+        "score": "blended (dmsw_engine.blend_risk), constant-history API inputs",
+        "holdout_students": len(test_idx),
+        "raw_max_abs_diff": round(float(np.abs(float_raw - quant_raw).max()), 6),
+        "raw_mean_abs_diff": round(float(np.abs(float_raw - quant_raw).mean()), 6),
+        "mode": args.mode,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "source_model": os.path.basename(args.model),
+        "calibration_samples": len(calibration_rows) if args.mode == "int8" else 0,
+        "min_tier_agreement": args.min_tier_agreement,
+        "size_bytes": {"float_h5": os.path.getsize(args.model), "tflite": len(content)},
+        "single_row_latency_ms": {
+            "float_keras": round(_single_row_latency_ms(float_predict, holdout), 4),
+            "float_numpy": round(_single_row_latency_ms(numpy_predict, holdout), 4),
+            "tflite": round(_single_row_latency_ms(quant_predict, holdout), 4),
+        },
+    })
+    tier_agreements = [t["agreement"] for t in report["tier_agreement_by_tier"].values() if t["samples"]]
+    report["published"] = (
+        report["tier_agreement"] >= args.min_tier_agreement
+        and min(tier_agreements) >= args.min_tier_agreement
+    )
+
+    if report["published"]:
+        tmp_path = args.output + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, args.output)  # atomic, so the artifact watcher never sees half a file
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    print(f"\nAPI inputs            : {report['samples']} ({report['holdout_students']} holdout students)")
+    print(f"Max |p_float - p_q|   : {report['max_abs_diff']:.6f} blended, {report['raw_max_abs_diff']:.6f} raw")
+    print(f"Mean |p_float - p_q|  : {report['mean_abs_diff']:.6f} blended, {report['raw_mean_abs_diff']:.6f} raw")
+    print(f"Risk-tier agreement   : {report['tier_agreement'] * 100:.2f}% "
+          f"(required {args.min_tier_agreement * 100:.2f}%, overall and per tier)")
+    for level, tier in report["tier_agreement_by_tier"].items():
+        agreement = "-" if tier["agreement"] is None else f"{tier['agreement'] * 100:.2f}%"
+        print(f"  {level:<9} {tier['samples']:>7} inputs  {agreement}")
+    print(f"Size                  : {report['size_bytes']['float_h5']:,} B -> {len(content):,} B")
+    print(f"Report written to {report_path}")
+    if not report["published"]:
+        print("Tier agreement below threshold; quantized model NOT published.")
+        return 1
+    print(f"Quantized model published to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
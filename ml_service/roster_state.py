@@ -0,0 +1,54 @@
+"""
+Per-student memory of the last scored inputs for incremental roster scoring.
+
+``RosterState`` remembers, for every student ID, the fingerprint of the
+features it was last scored with, the model version that scored it and the
+result. A roster re-submitted unchanged can then be answered without the
+model: only students whose fingerprint changed, or whose result came from an
+older model version, are scored again.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class RosterState:
+    """Thread-safe map of student ID -> (fingerprint, model version, result)."""
+
+    def __init__(self, max_students: int = 100000):
+        self.max_students = max(1, int(max_students))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def lookup(self, student_id, fingerprint: bytes, version: str):
+        """The remembered result, or None when the inputs or model version changed."""
+        with self._lock:
+            entry = self._data.get(student_id)
+        if entry is None or entry[0] != fingerprint or entry[1] != version:
+            return None
+        return entry[2]
+
+    def store(self, student_id, fingerprint: bytes, version: str, result: dict):
+        with self._lock:
+            self._data[student_id] = (fingerprint, version, result)
+            self._data.move_to_end(student_id)
+            # Students missing from recent rosters are dropped first
+            while len(self._data) > self.max_students:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "students": len(self._data),
+                "max_students": self.max_students,
+                "evictions": self.evictions,
+            }
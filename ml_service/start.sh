@@ -54,6 +54,15 @@ if [ -n "$EXISTING_PID" ]; then
     sleep 1
 fi
 
+# Production mode: pre-fork gunicorn server (see gunicorn.conf.py)
+if [ "$1" = "--prod" ]; then
+    echo ""
+    echo "=========================================="
+    echo "  Starting ML API Server (gunicorn)..."
+    echo "=========================================="
+    exec ./venv/bin/gunicorn -c gunicorn.conf.py api_server:app
+fi
+
 # Start API server
 echo ""
 echo "=========================================="
@@ -64,4 +73,5 @@ echo "  Health:  http://localhost:5001/health"
 echo "  Press Ctrl+C to stop"
 echo ""
 
-./venv/bin/python api_server.py
+# Bind the port right away; the model loads and warms up in the background
+FAST_START=${FAST_START:-1} ./venv/bin/python api_server.py
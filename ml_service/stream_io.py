@@ -0,0 +1,70 @@
+"""
+Incremental readers for streamed batch-scoring request bodies.
+
+Both readers pull one line at a time from a binary stream and yield either a
+student dict or the exception that made the row unreadable, so a malformed
+row is reported inline without aborting the stream.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+# Headers of the dashboard export (see legacy/dashboard_students.csv) mapped
+# to the field names the API expects. Unknown headers pass through unchanged,
+# so CSVs that already use API field names work too.
+DASHBOARD_CSV_COLUMNS = {
+    "Student ID": "id",
+    "Student Name": "name",
+    "Attendance": "attendance",
+    "Average Grade": "avgGrade",
+    "Age": "age",
+    "Gender": "gender",
+    "Scholarship": "scholarship",
+    "Debt": "debtor",
+    "Tuition Up To Date": "tuitionUpToDate",
+    "Courses Enrolled": "coursesEnrolled",
+    "Courses Passed": "coursesPassed",
+}
+
+
+def iter_ndjson_rows(stream):
+    """Yield one dict (or ValueError) per non-blank line of an NDJSON stream."""
+    for raw in stream:
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON line: {e}")
+            continue
+        yield row if isinstance(row, dict) else ValueError("Each line must be a JSON object")
+
+
+def iter_csv_rows(stream):
+    """Yield one dict per data row of a CSV stream, with dashboard headers renamed."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = [DASHBOARD_CSV_COLUMNS.get(h.strip(), h.strip()) for h in header]
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        if len(values) != len(fields):
+            yield ValueError(f"Expected {len(fields)} columns, got {len(values)}")
+            continue
+        yield dict(zip(fields, values))
+
+
+def iter_chunks(rows, size: int):
+    """Group an iterator into lists of at most ``size`` items."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
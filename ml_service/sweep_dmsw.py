@@ -0,0 +1,268 @@
+"""
+Parallel hyperparameter sweep over build_dmsw_model and its training settings.
+
+The search space is a JSON object mapping each hyperparameter to the values
+to try; every combination is one run (or a random subset of --max-runs of
+them). Unlisted hyperparameters keep the train_dmsw.py defaults.
+
+  epochs         maximum epochs (early stopping on the holdout loss still applies)
+  batch_size     training batch size
+  embedding_dim  width of the behaviour-text embedding
+  filters        Conv1D filters per kernel size, in both branches
+  kernel_sizes   the [narrow, wide] Conv1D kernel sizes, e.g. [3, 5]
+
+Runs are trained in a pool of worker processes. Each worker is pinned to
+its own --threads-per-worker cores and caps TensorFlow to that many
+threads, so workers do not compete for cores and a sweep takes about
+runs / workers times the length of one run. Every worker memory-maps the
+same cached tensors (see dataset_cache.py) and uses train_dmsw.py's
+stratified split and class weights.
+
+Each run records holdout accuracy, precision, recall, F1, loss, training
+time and the single-student latency of the NumPy serving engine. The output
+directory gets the ranked table (results.csv, best F1 first, then accuracy
+and latency), every run's details (results.json) and the best run's model
+(dmsw_model.h5) and model_metadata.json.
+
+Usage:
+  python sweep_dmsw.py                                  — default space, all cores
+  python sweep_dmsw.py --space space.json --max-runs 16 --threads-per-worker 2
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from concurrent.futures import as_completed
+from datetime import datetime
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import train_dmsw  # noqa: E402
+from worker_pool import core_groups, pinned_pool, worker_cores  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SWEEPS_DIR = os.path.join(BASE_DIR, "sweeps")
+
+DEFAULT_SPACE = {
+    "batch_size": [32, 64],
+    "embedding_dim": [32, 50],
+    "filters": [16, 32],
+    "kernel_sizes": [[3, 5], [2, 7]],
+}
+HYPERPARAMETERS = ("epochs", "batch_size", "embedding_dim", "filters", "kernel_sizes")
+LATENCY_CALLS = 500
+LATENCY_MAX_SECONDS = 1.0
+TABLE_COLUMNS = (
+    "rank", "run", "f1_score", "accuracy", "precision", "recall", "loss",
+    "train_seconds", "latency_ms", "epochs_completed",
+) + HYPERPARAMETERS
+
+
+# ---------------------------------------------------------------------------
+# Search space
+# ---------------------------------------------------------------------------
+def default_hyperparameters() -> dict:
+    return {
+        "epochs": train_dmsw.EPOCHS,
+        "batch_size": train_dmsw.BATCH_SIZE,
+        "embedding_dim": train_dmsw.EMBEDDING_DIM,
+        "filters": train_dmsw.FILTERS,
+        "kernel_sizes": list(train_dmsw.KERNEL_SIZES),
+    }
+
+
+def expand_space(space: dict, max_runs: int = None, seed: int = 42) -> list[dict]:
+    """Every combination of ``space`` over the defaults, or a random subset of ``max_runs``."""
+    unknown = sorted(set(space) - set(HYPERPARAMETERS))
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters: {', '.join(unknown)}")
+    for name, values in space.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"{name} must be a non-empty list of values")
+    for sizes in space.get("kernel_sizes", []):
+        if not (isinstance(sizes, list) and len(sizes) == 2 and sizes[0] != sizes[1]):
+            raise ValueError(f"kernel_sizes values must be two different sizes, got {sizes!r}")
+
+    names = sorted(space)
+    configs = []
+    for values in itertools.product(*(space[name] for name in names)):
+        config = default_hyperparameters()
+        config.update(zip(names, values))
+        config["kernel_sizes"] = sorted(config["kernel_sizes"])
+        configs.append(config)
+
+    if max_runs is not None and max_runs < len(configs):
+        configs = random.Random(seed).sample(configs, max_runs)
+    return configs
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+def _single_row_latency_ms(engine, inputs: list) -> float:
+    """Mean ms per one-student predict (up to LATENCY_CALLS calls or LATENCY_MAX_SECONDS)."""
+    engine.predict(inputs)
+    calls = 0
+    started = time.perf_counter()
+    while calls < LATENCY_CALLS and time.perf_counter() - started < LATENCY_MAX_SECONDS:
+        engine.predict(inputs)
+        calls += 1
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def run_config(run: int, config: dict, model_dir: str) -> dict:
+    """Train and evaluate one configuration; returns its results."""
+    from dmsw_engine import NumpyDMSW
+
+    X, y, num_static, _, _ = train_dmsw.load_dataset()
+    train_idx, test_idx = train_dmsw.split_train_test(y)
+    model, results = train_dmsw.fit_and_evaluate(X, y, num_static, train_idx, test_idx, config)
+    latency = _single_row_latency_ms(NumpyDMSW.from_keras(model), [x[test_idx[:1]] for x in X])
+
+    model_path = os.path.join(model_dir, f"run-{run:03d}.h5")
+    model.save(model_path)
+    results.update({
+        "run": run,
+        "latency_ms": round(latency, 4),
+        "total_students": len(y),
+        "dropout_ratio": f"{y.mean()*100:.1f}%",
+        "model_file": os.path.basename(model_path),
+        "worker_cores": worker_cores(),
+    })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+def rank(results: list[dict]) -> list[dict]:
+    """Best F1 first, then accuracy, then the lower latency."""
+    ranked = sorted(results, key=lambda r: (-r["f1_score"], -r["accuracy"], r["latency_ms"]))
+    for position, result in enumerate(ranked, start=1):
+        result["rank"] = position
+    return ranked
+
+
+def _table_row(result: dict) -> dict:
+    row = {k: result[k] for k in TABLE_COLUMNS if k in result}
+    row.update(result["hyperparameters"])
+    row["kernel_sizes"] = "/".join(str(k) for k in result["hyperparameters"]["kernel_sizes"])
+    return row
+
+
+def write_results(ranked: list[dict], output_dir: str, meta: dict):
+    with open(os.path.join(output_dir, "results.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS)
+        writer.writeheader()
+        for result in ranked:
+            writer.writerow(_table_row(result))
+
+    with open(os.path.join(output_dir, "results.json"), "w") as f:
+        json.dump({"meta": meta, "runs": ranked}, f, indent=2)
+        f.write("\n")
+
+    best = ranked[0]
+    shutil.copyfile(os.path.join(output_dir, "runs", best["model_file"]), os.path.join(output_dir, "dmsw_model.h5"))
+    hp = best["hyperparameters"]
+    metadata = {
+        "trained_at": meta["finished_at"],
+        "dataset_file": os.path.basename(train_dmsw.DATA_FILE),
+        "total_students": best["total_students"],
+        "train_samples": best["train_samples"],
+        "test_samples": best["test_samples"],
+        "dropout_ratio": best["dropout_ratio"],
+        "epochs_completed": best["epochs_completed"],
+        "max_epochs": hp["epochs"],
+        "early_stopping_patience": train_dmsw.PATIENCE,
+        "accuracy": best["accuracy"],
+        "loss": best["loss"],
+        "precision": best["precision"],
+        "recall": best["recall"],
+        "f1_score": best["f1_score"],
+        "confusion_matrix": best["confusion_matrix"],
+        "class_weights": best["class_weights"],
+        "hyperparameters": hp,
+        "sweep": {"runs": len(ranked), "train_seconds": best["train_seconds"], "latency_ms": best["latency_ms"]},
+    }
+    with open(os.path.join(output_dir, "model_metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+        f.write("\n")
+
+
+def print_table(ranked: list[dict]):
+    print(f"\n{'#':>3} {'run':>4} {'F1':>7} {'acc':>7} {'train s':>8} {'lat ms':>8}  hyperparameters")
+    for result in ranked:
+        hp = result["hyperparameters"]
+        print(f"{result['rank']:>3} {result['run']:>4} {result['f1_score']:>7.4f} {result['accuracy']:>7.4f} "
+              f"{result['train_seconds']:>8.1f} {result['latency_ms']:>8.4f}  "
+              f"epochs={hp['epochs']} batch={hp['batch_size']} emb={hp['embedding_dim']} "
+              f"filters={hp['filters']} kernels={hp['kernel_sizes']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Train DMSW hyperparameter configurations in parallel.")
+    parser.add_argument("--space", help="Search space JSON (default: the built-in DEFAULT_SPACE)")
+    parser.add_argument("--max-runs", type=int, help="Train a random subset of this many combinations")
+    parser.add_argument("--threads-per-worker", type=int, default=1,
+                        help="Cores (and TensorFlow threads) per worker (default 1)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: usable cores / threads per worker)")
+    parser.add_argument("--output-dir", help="Where to write the results (default sweeps/<timestamp>)")
+    args = parser.parse_args(argv)
+
+    if args.space:
+        with open(args.space, "r") as f:
+            space = json.load(f)
+    else:
+        space = DEFAULT_SPACE
+    try:
+        configs = expand_space(space, args.max_runs)
+    except ValueError as e:
+        print(f"Invalid search space: {e}")
+        return 1
+
+    output_dir = args.output_dir or os.path.join(SWEEPS_DIR, datetime.utcnow().strftime("%Y%m%dT%H%M%SZ"))
+    model_dir = os.path.join(output_dir, "runs")
+    os.makedirs(model_dir, exist_ok=True)
+
+    # Build the tensor cache once, before the workers memory-map it
+    train_dmsw.load_dataset()
+
+    threads = max(1, args.threads_per_worker)
+    groups = core_groups(threads, min(args.workers or len(configs), len(configs)))
+    print(f"Sweeping {len(configs)} configurations on {len(groups)} workers x {threads} cores")
+
+    started = time.perf_counter()
+    results = []
+    with pinned_pool(groups, threads) as pool:
+        futures = {pool.submit(run_config, run, config, model_dir): run for run, config in enumerate(configs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  run {result['run']:>3} done: F1={result['f1_score']:.4f} "
+                  f"acc={result['accuracy']:.4f} {result['train_seconds']:.1f}s "
+                  f"({len(results)}/{len(configs)})", flush=True)
+    wall_seconds = time.perf_counter() - started
+
+    ranked = rank(results)
+    write_results(ranked, output_dir, {
+        "finished_at": datetime.utcnow().isoformat() + "Z",
+        "space": space,
+        "workers": len(groups),
+        "threads_per_worker": threads,
+        "wall_seconds": round(wall_seconds, 2),
+        "serial_train_seconds": round(sum(r["train_seconds"] for r in results), 2),
+    })
+    print_table(ranked)
+    print(f"\nWall time {wall_seconds:.1f}s for {sum(r['train_seconds'] for r in results):.1f}s of training")
+    print(f"Results written to {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import time
+
+from artifacts import ArtifactBundle, ArtifactStore
+
+WATCH_INTERVAL = 0.02
+
+
+class _Model:
+    fused = True
+
+
+class _SlowLoader:
+    """load_fn that reads the model file, then blocks until released."""
+
+    def __init__(self, path):
+        self.path = path
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.loads = []
+
+    def __call__(self):
+        with open(self.path) as f:
+            content = f.read()
+        self.loads.append(content)
+        self.started.set()
+        self.release.wait(5)
+        return ArtifactBundle(model=_Model(), metadata={"trained_at": content}, behavior_text_features=[])
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    # A distinct mtime even on filesystems with coarse timestamps
+    stamp = time.time() + len(content)
+    os.utime(path, (stamp, stamp))
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _store_with_slow_load(tmp):
+    path = os.path.join(tmp, "model.bin")
+    _write(path, "v1")
+    loader = _SlowLoader(path)
+    store = ArtifactStore(loader, [path])
+    first = threading.Thread(target=store.reload)
+    first.start()
+    assert loader.started.wait(5)
+    _write(path, "v2-retrained")  # new files land while v1 is being loaded
+    return store, loader, first
+
+
+def test_waiting_reload_loads_files_changed_mid_load():
+    with tempfile.TemporaryDirectory() as tmp:
+        store, loader, first = _store_with_slow_load(tmp)
+
+        result = {}
+        second = threading.Thread(target=lambda: result.setdefault("bundle", store.reload()))
+        second.start()
+        time.sleep(0.05)
+        assert len(loader.loads) == 1  # still single-flight while the first load runs
+        loader.release.set()
+        first.join(5)
+        second.join(5)
+
+        assert loader.loads == ["v1", "v2-retrained"], loader.loads
+        assert result["bundle"].metadata["trained_at"] == "v2-retrained"
+        assert store.current.metadata["trained_at"] == "v2-retrained"
+    print("A reload that waited on a stale load loads the new files")
+
+
+def test_watcher_picks_up_files_changed_mid_load():
+    with tempfile.TemporaryDirectory() as tmp:
+        store, loader, first = _store_with_slow_load(tmp)
+        store.start_watcher(WATCH_INTERVAL)
+        time.sleep(5 * WATCH_INTERVAL)  # the watcher ticks while the load is running
+        loader.release.set()
+        first.join(5)
+
+        assert _wait_for(lambda: store.current.metadata.get("trained_at") == "v2-retrained"), loader.loads
+        time.sleep(5 * WATCH_INTERVAL)
+        assert loader.loads == ["v1", "v2-retrained"], loader.loads  # and no reload loop after that
+    print("The watcher reloads files that changed while another load was running")
+
+
+def test_watcher_ignores_unchanged_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.bin")
+        _write(path, "v1")
+        loader = _SlowLoader(path)
+        loader.release.set()
+        store = ArtifactStore(loader, [path])
+        store.reload()
+        store.start_watcher(WATCH_INTERVAL)
+        time.sleep(5 * WATCH_INTERVAL)
+        assert loader.loads == ["v1"]
+
+        _write(path, "v2")
+        assert _wait_for(lambda: store.current.metadata.get("trained_at") == "v2")
+        assert loader.loads == ["v1", "v2"]
+    print("The watcher reloads once per change")
+
+
+if __name__ == "__main__":
+    test_waiting_reload_loads_files_changed_mid_load()
+    test_watcher_picks_up_files_changed_mid_load()
+    test_watcher_ignores_unchanged_files()
@@ -0,0 +1,57 @@
+import os
+
+os.environ.setdefault("FAST_START", "0")
+os.environ.setdefault("ARTIFACT_WATCH_INTERVAL", "0")
+
+import api_server  # noqa: E402
+
+POISON_AGE = 99  # rows with this age make the patched model call raise
+
+
+def _student(i, age=21):
+    return {
+        "id": f"s{i}", "attendance": 60 + i % 40, "avgGrade": 55 + i % 45,
+        "coursesEnrolled": 6, "coursesPassed": 4, "age": age,
+    }
+
+
+def _failing_score_batch(original):
+    def score(features_list, bundle):
+        if any(features[0] == POISON_AGE for features in features_list):
+            raise ValueError("model failure")
+        return original(features_list, bundle)
+    return score
+
+
+def test_chunk_failure_only_fails_the_offending_row():
+    original = api_server._score_batch
+    cache = api_server.prediction_cache
+    api_server._score_batch = _failing_score_batch(original)
+    api_server.prediction_cache = None
+    try:
+        students = [_student(i) for i in range(40)]
+        students[7] = _student(7, age=POISON_AGE)
+        predictions, errors = api_server._predict_many(students)
+    finally:
+        api_server._score_batch = original
+        api_server.prediction_cache = cache
+
+    assert len(predictions) == 39, len(predictions)
+    assert errors == [{"index": 7, "student_id": "s7", "error": "model failure"}], errors
+    assert [p["student_id"] for p in predictions] == [f"s{i}" for i in range(40) if i != 7]
+    print("A failing row is reported alone; the rest of its chunk is scored")
+
+
+def test_validation_error_shape():
+    students = [_student(0), {"student_id": "legacy-1", "attendance": 150}]
+    _, errors = api_server._predict_many(students)
+    assert len(errors) == 1
+    error = errors[0]
+    assert error["index"] == 1 and error["student_id"] == "legacy-1", error
+    assert error["error"] == "Validation failed" and error["details"], error
+    print("Error entries carry index, student_id, error and details")
+
+
+if __name__ == "__main__":
+    test_chunk_failure_only_fails_the_offending_row()
+    test_validation_error_shape()
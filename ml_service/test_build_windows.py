@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from train_dmsw import MAX_LEN, NUM_COLS, STATIC_COLS, build_windows
+from vocab import Vocabulary
+
+PHRASES = ["Active in class", "Missed deadline", "Late submission again", "Engaged and curious", ""]
+
+
+def _fixture(seed=7):
+    """Shuffled rows of students with ragged week counts, some too short."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for student, weeks in enumerate([MAX_LEN, MAX_LEN + 3, MAX_LEN - 1, MAX_LEN + 1, 4, MAX_LEN]):
+        static = rng.integers(0, 30, len(STATIC_COLS))
+        for week in rng.permutation(weeks) + 1:
+            rows.append({
+                "student_id": f"S{student:03d}", "week": week,
+                "attendance": round(rng.uniform(0, 100), 2), "grade": round(rng.uniform(0, 100), 2),
+                # Static columns vary by week, so "from the earliest week" is checked
+                **{col: int(v) + week for col, v in zip(STATIC_COLS, static)},
+                "behavior_text": PHRASES[rng.integers(len(PHRASES))],
+                "dropout_label": int(rng.integers(2)),
+            })
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _build_windows_loop(df, vocab):
+    """The per-student loop build_windows replaced (reference implementation)."""
+    df = df.assign(behavior_token=vocab.first_token_ids(df["behavior_text"].astype(str).to_numpy()))
+    X_num, X_text, X_static, y = [], [], [], []
+    for student in df["student_id"].unique():
+        student_df = df[df["student_id"] == student].sort_values("week")
+        if len(student_df) < MAX_LEN:
+            continue
+        X_num.append(student_df[NUM_COLS].values[:MAX_LEN])
+        X_text.append(student_df["behavior_token"].to_numpy()[:MAX_LEN])
+        first_row = student_df.iloc[0]
+        X_static.append([first_row[col] for col in STATIC_COLS])
+        y.append(first_row["dropout_label"])
+    return [np.array(X_num), np.array(X_text), np.array(X_static)], np.array(y)
+
+
+def test_matches_loop_implementation():
+    df = _fixture()
+    vocab = Vocabulary.fit(df["behavior_text"].astype(str).to_numpy(), num_words=1000, oov_token="<OOV>")
+
+    X, y = build_windows(df, vocab)
+    X_ref, y_ref = _build_windows_loop(df, vocab)
+
+    assert len(y) == 4  # the 14- and 4-week students are dropped
+    for got, expected in zip(X + [y], X_ref + [y_ref]):
+        np.testing.assert_array_equal(got, expected)
+        assert got.shape == expected.shape and got.dtype == expected.dtype, (got.dtype, expected.dtype)
+    print(f"Vectorized windows match the loop for {len(y)} students")
+
+
+def test_first_token_ids_match_per_text():
+    texts = np.array(PHRASES * 3 + ["Unseen words here", "nan", "MISSED the bus"])
+    vocab = Vocabulary.fit(PHRASES, num_words=1000, oov_token="<OOV>")
+    expected = [vocab.first_token_id(t) for t in texts]
+    np.testing.assert_array_equal(vocab.first_token_ids(texts), expected)
+    np.testing.assert_array_equal(vocab.first_token_ids(texts.reshape(3, -1)), np.reshape(expected, (3, -1)))
+    print("Batched tokenization matches one text at a time")
+
+
+if __name__ == "__main__":
+    test_matches_loop_implementation()
+    test_first_token_ids_match_per_text()
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+from columnar import COLUMNAR_MIN_ROWS, NOT_AN_OBJECT, parse_student, parse_students
+
+os.environ.setdefault("FAST_START", "0")
+os.environ.setdefault("ARTIFACT_WATCH_INTERVAL", "0")
+
+
+def _student(**overrides):
+    row = {
+        "attendance": 85, "avgGrade": 72, "coursesEnrolled": 6, "coursesPassed": 5,
+        "age": 21, "gender": "Female", "scholarship": "1", "debtor": "0", "tuitionUpToDate": "1",
+    }
+    row.update(overrides)
+    return row
+
+
+# Valid rows, out-of-range and unparseable values, NaN and infinities
+CASES = [
+    _student(),
+    _student(attendance=0, avgGrade=100),
+    _student(attendance="93.5", avgGrade="88", coursesEnrolled="7", coursesPassed="7.9"),
+    _student(attendance=-1),
+    _student(avgGrade=100.5),
+    _student(attendance="nan"),
+    _student(avgGrade=float("nan")),
+    _student(attendance="inf", avgGrade="-inf"),
+    _student(attendance=None),
+    _student(avgGrade="eighty"),
+    _student(coursesEnrolled=-2),
+    _student(coursesEnrolled="nan", coursesPassed="inf"),
+    _student(coursesEnrolled=3, coursesPassed=4),
+    _student(age="twenty", gender="MALE", scholarship="yes", debtor=True),
+    {"attendance": 50},
+    "not a dict",
+    None,
+]
+
+
+def test_columnar_matches_row_parsing():
+    rows = CASES * (COLUMNAR_MIN_ROWS // len(CASES) + 1)
+    parsed = parse_students(rows)
+    assert len(rows) >= COLUMNAR_MIN_ROWS  # columnar path
+
+    for i, row in enumerate(rows):
+        features, errors = parse_student(row)
+        assert parsed.row_errors(i) == errors, (row, parsed.row_errors(i), errors)
+        assert bool(parsed.valid[i]) == (not errors)
+        np.testing.assert_array_equal(parsed.features[i], np.array(features))
+    print(f"Columnar and row parsing agree on {len(rows)} rows")
+
+
+def test_non_finite_rejected():
+    for value in ("nan", float("nan"), "inf", float("-inf")):
+        _, errors = parse_student(_student(attendance=value, avgGrade=value))
+        assert errors == ["attendance must be between 0 and 100", "avgGrade must be between 0 and 100"], errors
+
+    parsed = parse_students([_student(attendance="nan")] * COLUMNAR_MIN_ROWS)
+    assert not parsed.valid.any()
+    assert parsed.row_errors(0) == ["attendance must be between 0 and 100"]
+    assert parse_student("x")[1] == [NOT_AN_OBJECT]
+    print("Non-finite attendance and grades are rejected")
+
+
+def test_api_rejects_nan():
+    import api_server
+
+    client = api_server.app.test_client()
+    response = client.post("/predict", json=_student(attendance="nan"))
+    assert response.status_code == 400, response.data
+    assert response.get_json()["details"] == ["attendance must be between 0 and 100"]
+
+    for size in (2, COLUMNAR_MIN_ROWS + 4):  # row-wise and columnar parsing
+        students = [_student(id=f"s{i}") for i in range(size)]
+        students[1]["avgGrade"] = "nan"
+        response = client.post("/predict/batch", json={"students": students})
+        body = response.get_json()
+        assert response.status_code == 200, response.data
+        assert body["total"] == size - 1
+        assert len(body["errors"]) == 1 and body["errors"][0]["index"] == 1, body["errors"]
+        assert all(np.isfinite(p["dropout_probability"]) for p in body["predictions"])
+    print("NaN input: 400 on /predict, an error entry on /predict/batch")
+
+
+if __name__ == "__main__":
+    test_columnar_matches_row_parsing()
+    test_non_finite_rejected()
+    test_api_rejects_nan()
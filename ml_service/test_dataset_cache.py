@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+import numpy as np
+
+from dataset_cache import MANIFEST, load_or_build, open_entry
+
+
+def _builder(value):
+    def build(out_dir):
+        return {"x": np.full(3, value, dtype=np.float64)}
+    return build
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_prune_only_removes_entries_of_the_same_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        data = os.path.join(tmp, "data.csv")
+        data_v2 = os.path.join(tmp, "data-v2.csv")  # shares the "data-" entry prefix
+        other_data = os.path.join(tmp, "export", "data.csv")  # same basename, other directory
+        for path in (data, data_v2, other_data):
+            _write(path, f"{path}\n1\n")
+
+        _, v2_entry, _ = load_or_build(data_v2, {}, _builder(2), cache_dir)
+        _, other_entry, _ = load_or_build(other_data, {}, _builder(3), cache_dir)
+        _, old_entry, _ = load_or_build(data, {"max_len": 15}, _builder(1), cache_dir)
+        # A new key for data.csv replaces its old entry and nothing else
+        _, new_entry, hit = load_or_build(data, {"max_len": 20}, _builder(4), cache_dir)
+
+        assert not hit and not os.path.exists(old_entry)
+        assert open_entry(new_entry)["x"][0] == 4
+        assert open_entry(v2_entry)["x"][0] == 2
+        assert open_entry(other_entry)["x"][0] == 3
+
+        # Entries whose manifest names no source are never pruned
+        legacy = os.path.join(cache_dir, "data-0123456789abcdef")
+        os.makedirs(legacy)
+        _write(os.path.join(legacy, MANIFEST), '{"arrays": {}}')
+        load_or_build(data, {"max_len": 25}, _builder(5), cache_dir)
+        assert os.path.isdir(legacy) and not os.path.exists(new_entry)
+    print("Pruning removes old entries of the same file only")
+
+
+def test_hit_reuses_the_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "data.csv")
+        _write(source, "a\n1\n")
+        arrays, entry, hit = load_or_build(source, {}, _builder(1), tmp)
+        assert not hit and isinstance(arrays["x"], np.memmap)
+        _, again, hit = load_or_build(source, {}, _builder(9), tmp)
+        assert hit and again == entry and open_entry(entry)["x"][0] == 1
+    print("An unchanged source and parameters reuse the entry")
+
+
+if __name__ == "__main__":
+    test_prune_only_removes_entries_of_the_same_file()
+    test_hit_reuses_the_entry()
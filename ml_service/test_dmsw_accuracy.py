@@ -4,12 +4,14 @@ import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import load_model
 
+from vocab import Vocabulary
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DMSW_MODEL_PATH = os.path.join(BASE_DIR, "dmsw_model.h5")
-DMSW_TOKENIZER_PATH = os.path.join(BASE_DIR, "dmsw_tokenizer.pkl")
+DMSW_VOCAB_PATH = os.path.join(BASE_DIR, "dmsw_vocab.json")
 DMSW_SCALER_PATH = os.path.join(BASE_DIR, "dmsw_scaler.pkl")
 
 MAX_LEN = 15
@@ -22,8 +24,7 @@ tf.get_logger().setLevel("ERROR")
 def test_model():
     print("Loading model and artifacts...")
     model = load_model(DMSW_MODEL_PATH)
-    with open(DMSW_TOKENIZER_PATH, "rb") as f:
-        tokenizer = pickle.load(f)
+    vocab = Vocabulary.load(DMSW_VOCAB_PATH)
     with open(DMSW_SCALER_PATH, "rb") as f:
         scaler = pickle.load(f)
 
@@ -80,8 +81,7 @@ def test_model():
         X_num = np.expand_dims(history_num_scaled, axis=0)
 
         # --- Text input ---
-        seq = tokenizer.texts_to_sequences([case["text"]])[0]
-        token = seq[0] if seq else 0
+        token = vocab.first_token_id(case["text"])
         X_text = np.array([[token] * MAX_LEN])
 
         # --- Static input (was missing before!) ---
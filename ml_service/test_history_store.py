@@ -0,0 +1,86 @@
+import numpy as np
+
+from history_store import HistoryStore, HistoryStoreFull
+from vocab import Vocabulary
+
+WINDOW = 4
+WORDS = [f"w{i}" for i in range(3 * WINDOW + 1)]
+
+
+def _expected_window(weeks: list) -> list:
+    """The last WINDOW weeks, oldest first, backfilled with the first week."""
+    return [weeks[0]] * (WINDOW - len(weeks)) + weeks[-WINDOW:]
+
+
+def test_wraparound_keeps_oldest_first():
+    store = HistoryStore(WINDOW, capacity=1)
+    vocab = Vocabulary.fit(WORDS)
+    store.set_vocabulary(vocab)
+
+    weeks = []
+    for week in range(3 * WINDOW + 1):  # wraps the ring three times
+        weeks.append((float(week), 100.0 - week, WORDS[week]))
+        stored = store.append("s1", *weeks[-1])
+        assert stored == min(len(weeks), WINDOW)
+
+        numeric, tokens, count = store.window_of("s1")
+        expected = _expected_window(weeks)
+        assert count == stored
+        np.testing.assert_array_equal(numeric, [(a, g) for a, g, _ in expected])
+        np.testing.assert_array_equal(tokens, vocab.first_token_ids([t for _, _, t in expected]))
+        assert store.texts_of("s1") == [t for _, _, t in expected]
+    print(f"Window stays oldest-first across {len(weeks)} appends")
+
+
+def test_window_is_a_copy():
+    store = HistoryStore(WINDOW)
+    store.append("s1", 50, 60, "late")
+    numeric, tokens, _ = store.window_of("s1")
+    store.append("s1", 90, 95, "engaged")
+    assert (numeric == (50, 60)).all() and (tokens == 0).all()
+    assert store.window_of("s1")[0][-1].tolist() == [90, 95]
+    print("Returned windows do not change on later appends")
+
+
+def test_students_are_independent_and_rows_reused():
+    store = HistoryStore(WINDOW, capacity=1, max_students=3)
+    for i, student in enumerate(("a", "b", "c")):  # grows past the initial capacity
+        for week in range(i + 2):
+            store.append(student, 10 * i + week, 50, None)
+    assert store.stats()["capacity"] == 3
+    assert store.window_of("b")[0][:, 0].tolist() == [10, 10, 11, 12]
+
+    try:
+        store.append("d", 1, 1, None)
+    except HistoryStoreFull:
+        pass
+    else:
+        raise AssertionError("expected HistoryStoreFull")
+
+    assert store.remove("a") and not store.remove("a")
+    assert store.window_of("a") is None
+    store.append("d", 70, 80, None)  # takes a's row, starting from an empty ring
+    numeric, _, count = store.window_of("d")
+    assert count == 1 and (numeric == (70, 80)).all()
+    assert store.window_of("c")[0][:, 0].tolist() == [20, 21, 22, 23]
+    print("Rows grow, fill up, and are reused after a removal")
+
+
+def test_retokenize_preserves_order():
+    store = HistoryStore(WINDOW)
+    texts = WORDS[:WINDOW + 2]
+    for week, text in enumerate(texts):
+        store.append("s1", week, week, text)
+    assert (store.window_of("s1")[1] == 0).all()  # no vocabulary yet
+
+    vocab = Vocabulary.fit(WORDS)
+    store.set_vocabulary(vocab)
+    np.testing.assert_array_equal(store.window_of("s1")[1], vocab.first_token_ids(texts[-WINDOW:]))
+    print("Re-tokenizing keeps the stored weeks in order")
+
+
+if __name__ == "__main__":
+    test_wraparound_keeps_oldest_first()
+    test_window_is_a_copy()
+    test_students_are_independent_and_rows_reused()
+    test_retokenize_preserves_order()
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from micro_batcher import MicroBatcher
+
+WINDOW_MS = 50  # long enough for every concurrent submit to land in one batch
+
+
+def _submit_all(batcher, items, timeout=5.0):
+    """Submit ``items`` concurrently; returns (result or exception) per item."""
+    barrier = threading.Barrier(len(items))
+
+    def call(item):
+        barrier.wait()
+        try:
+            return batcher.submit(item, timeout=timeout)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(items)) as pool:
+        return list(pool.map(call, items))
+
+
+def test_batches_concurrent_items():
+    calls = []
+
+    def double(items):
+        calls.append(len(items))
+        return [2 * x for x in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=WINDOW_MS)
+    assert _submit_all(batcher, list(range(8))) == [0, 2, 4, 6, 8, 10, 12, 14]
+    assert calls == [8], calls
+    print(f"8 concurrent submits scored in {len(calls)} batch")
+
+
+def test_failing_item_is_isolated():
+    def score(items):
+        if "bad" in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=WINDOW_MS)
+    results = _submit_all(batcher, ["a", "b", "bad", "c"])
+    assert results[:2] == ["A", "B"] and results[3] == "C", results
+    assert isinstance(results[2], ValueError), results
+    assert batcher.stats()["batch_failures"] == 1
+    print("A failing item only fails its own caller")
+
+
+def test_result_length_mismatch_fails_every_caller():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=8, max_wait_ms=WINDOW_MS)
+    results = _submit_all(batcher, [1, 2, 3], timeout=2.0)
+    assert all(isinstance(r, RuntimeError) for r in results), results
+
+    # A single item with no result is an error too, not a hang
+    batcher = MicroBatcher(lambda items: [], max_batch_size=8, max_wait_ms=0)
+    try:
+        batcher.submit(1, timeout=2.0)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected RuntimeError")
+    print("A short result list fails every caller instead of hanging")
+
+
+if __name__ == "__main__":
+    test_batches_concurrent_items()
+    test_failing_item_is_isolated()
+    test_result_length_mismatch_fails_every_caller()
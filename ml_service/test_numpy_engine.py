@@ -0,0 +1,106 @@
+import os
+import pickle
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from dmsw_engine import DMSW_SCALER_PATH, DMSW_VOCAB_PATH, DMSW_WEIGHTS_PATH, NumpyDMSW, behavior_tokens
+from vocab import Vocabulary
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DMSW_MODEL_PATH = os.path.join(BASE_DIR, "dmsw_model.h5")
+
+MAX_LEN = 15
+NUM_SAMPLES = 512
+TOLERANCE = 1e-5  # Max absolute difference in dropout probability
+
+# Suppress TF noise
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+tf.get_logger().setLevel("ERROR")
+
+
+def _random_inputs(rng, n):
+    """Scaled numeric history, token ids and raw static features."""
+    X_num = rng.normal(0.0, 1.5, size=(n, MAX_LEN, 2))
+    X_text = rng.integers(0, 120, size=(n, MAX_LEN))
+    X_static = np.column_stack([
+        rng.integers(17, 31, n),   # age
+        rng.integers(0, 2, n),     # gender
+        rng.integers(0, 2, n),     # scholarship
+        rng.integers(0, 2, n),     # debt
+        rng.integers(0, 2, n),     # tuition_up_to_date
+        rng.integers(1, 9, n),     # courses_enrolled
+        rng.integers(0, 9, n),     # courses_passed
+    ])
+    return [X_num, X_text, X_static]
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _engine_inputs(engine, inputs, scaler):
+    """Fused engines take raw numeric values, so undo the scaling for them."""
+    if not engine.fused:
+        return inputs
+    return [inputs[0] * scaler.scale_ + scaler.mean_] + inputs[1:]
+
+
+def test_numpy_engine_parity():
+    print("Loading Keras model and exported NumPy weights...")
+    keras_model = load_model(DMSW_MODEL_PATH)
+    engine = NumpyDMSW.load(DMSW_WEIGHTS_PATH)
+    scaler = _load_pickle(DMSW_SCALER_PATH)
+
+    rng = np.random.default_rng(42)
+    inputs = _random_inputs(rng, NUM_SAMPLES)
+
+    keras_probs = keras_model.predict(inputs, verbose=0).reshape(-1)
+    numpy_probs = engine.predict(_engine_inputs(engine, inputs, scaler)).reshape(-1)
+    max_diff = float(np.max(np.abs(keras_probs - numpy_probs)))
+
+    # Constant histories, exactly as the API builds them
+    constant = [
+        np.repeat(inputs[0][:, :1, :], MAX_LEN, axis=1),
+        np.repeat(inputs[1][:, :1], MAX_LEN, axis=1),
+        inputs[2],
+    ]
+    const_diff = float(np.max(np.abs(
+        keras_model.predict(constant, verbose=0).reshape(-1)
+        - engine.predict(_engine_inputs(engine, constant, scaler)).reshape(-1)
+    )))
+
+    print(f"\n{'='*60}")
+    print("  NumPy Engine Parity vs dmsw_model.h5")
+    print(f"{'='*60}")
+    print(f"Fused preprocessing : {engine.fused}")
+    print(f"Samples             : {NUM_SAMPLES}")
+    print(f"Max |diff| random   : {max_diff:.2e}")
+    print(f"Max |diff| constant : {const_diff:.2e}")
+    print(f"Tolerance           : {TOLERANCE:.0e}")
+    print(f"{'='*60}\n")
+
+    assert max_diff <= TOLERANCE, f"random-input parity {max_diff:.2e} exceeds {TOLERANCE:.0e}"
+    assert const_diff <= TOLERANCE, f"constant-history parity {const_diff:.2e} exceeds {TOLERANCE:.0e}"
+
+
+def test_fused_behavior_tokens():
+    engine = NumpyDMSW.load(DMSW_WEIGHTS_PATH)
+    if not engine.fused:
+        print("Exported weights are not fused; skipping behaviour token check")
+        return
+    expected = behavior_tokens(Vocabulary.load(DMSW_VOCAB_PATH))
+    assert np.array_equal(engine.behavior_tokens, expected), (
+        f"behaviour tokens {engine.behavior_tokens.tolist()} != vocabulary {expected.tolist()}"
+    )
+    print(f"Behaviour token IDs match the vocabulary: {expected.tolist()}")
+
+
+if __name__ == "__main__":
+    test_numpy_engine_parity()
+    test_fused_behavior_tokens()
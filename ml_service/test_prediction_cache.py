@@ -0,0 +1,101 @@
+import os
+
+import prediction_cache
+from prediction_cache import PredictionCache
+
+os.environ.setdefault("FAST_START", "0")
+os.environ.setdefault("ARTIFACT_WATCH_INTERVAL", "0")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _with_clock(test):
+    def run():
+        clock = _Clock()
+        original = prediction_cache.time.monotonic
+        prediction_cache.time.monotonic = clock
+        try:
+            test(clock)
+        finally:
+            prediction_cache.time.monotonic = original
+    run.__name__ = test.__name__
+    return run
+
+
+@_with_clock
+def test_ttl_expiry(clock):
+    cache = PredictionCache(maxsize=10, ttl_seconds=30)
+    cache.put("a", 0.1)
+    clock.now += 30
+    assert cache.get("a") == 0.1  # still fresh at exactly the TTL
+
+    clock.now += 0.5
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["size"] == 0 and stats["expirations"] == 1, stats
+    assert stats["hits"] == 1 and stats["misses"] == 1, stats
+
+    # A re-put restarts the clock; a TTL of 0 never expires
+    cache.put("a", 0.2)
+    clock.now += 20
+    assert cache.get("a") == 0.2
+    forever = PredictionCache(maxsize=10, ttl_seconds=0)
+    forever.put("b", 0.3)
+    clock.now += 10 ** 6
+    assert forever.get("b") == 0.3
+    print("Entries expire after the TTL, and never with a TTL of 0")
+
+
+def test_lru_eviction():
+    cache = PredictionCache(maxsize=3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"  # a is now the most recently used
+    cache.put("d", "D")  # evicts b, the least recently used
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    cache.put("c", "C2")  # an update refreshes recency without evicting
+    cache.put("e", "E")  # evicts a
+    assert cache.get("a") is None and cache.get("c") == "C2"
+    stats = cache.stats()
+    assert stats["size"] == 3 and stats["evictions"] == 2, stats
+    print("The least recently used entry is evicted first")
+
+
+def test_bundle_swap_invalidates():
+    import api_server
+
+    cache = api_server.prediction_cache
+    if cache is None:
+        print("Prediction cache disabled (PREDICTION_CACHE_SIZE=0); skipped")
+        return
+    client = api_server.app.test_client()
+    student = {"attendance": 61, "avgGrade": 58, "coursesEnrolled": 6, "coursesPassed": 3, "age": 23}
+    first = client.post("/predict", json=student).get_json()["dropout_probability"]
+    version = api_server.current_bundle().version
+    features, _ = api_server.parse_student(student)
+    assert cache.get((version,) + features) is not None
+
+    # Keys carry the bundle version, so another version never sees the entry
+    assert cache.get(("other-version",) + features) is None
+
+    invalidations = cache.stats()["invalidations"]
+    api_server.load_artifacts()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == invalidations + 1
+    again = client.post("/predict", json=student).get_json()["dropout_probability"]
+    assert again == first
+    print("Swapping in a bundle clears the cache; rescoring gives the same result")
+
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_bundle_swap_invalidates()
@@ -0,0 +1,79 @@
+import os
+
+from roster_state import RosterState
+
+os.environ.setdefault("FAST_START", "0")
+os.environ.setdefault("ARTIFACT_WATCH_INTERVAL", "0")
+
+ROSTER_SIZE = 30  # above COLUMNAR_MIN_ROWS, so rows are parsed column-wise
+
+
+def _student(i, attendance=None):
+    return {
+        "id": f"s{i}", "attendance": attendance if attendance is not None else 50 + i % 40,
+        "avgGrade": 40 + i % 50, "coursesEnrolled": 6, "coursesPassed": 4, "age": 20 + i % 5,
+    }
+
+
+def _post(client, students):
+    response = client.post("/predict/roster", json={"students": students})
+    assert response.status_code == 200, response.data
+    return response.get_json()
+
+
+def test_partial_update_counts():
+    import api_server
+
+    api_server.roster_state.clear()
+    client = api_server.app.test_client()
+    roster = [_student(i) for i in range(ROSTER_SIZE)]
+
+    first = _post(client, roster)
+    assert (first["recomputed"], first["reused"]) == (ROSTER_SIZE, 0)
+    second = _post(client, roster)
+    assert (second["recomputed"], second["reused"]) == (0, ROSTER_SIZE)
+    assert second["predictions"] == first["predictions"]
+
+    # 3 changed, 2 new, 1 without an ID, 1 invalid; the rest unchanged
+    update = [dict(s) for s in roster]
+    for i in (2, 11, 25):
+        update[i]["attendance"] = 5
+    update += [_student(100), _student(101)]
+    update.append({k: v for k, v in _student(200).items() if k != "id"})
+    update[7]["avgGrade"] = 120
+
+    third = _post(client, update)
+    assert third["reused"] == ROSTER_SIZE - 4, third["reused"]
+    assert third["recomputed"] == 3 + 2 + 1, third["recomputed"]
+    assert [e["index"] for e in third["errors"]] == [7], third["errors"]
+    assert third["total"] == len(update) - 1
+
+    # Recomputed rows score the same as a fresh batch call
+    batch = client.post("/predict/batch", json={"students": update}).get_json()
+    assert third["predictions"] == batch["predictions"]
+
+    # s7 back to its first inputs reuses its first result; only the ID-less row is scored
+    update[7]["avgGrade"] = roster[7]["avgGrade"]
+    fourth = _post(client, update)
+    assert (fourth["recomputed"], fourth["reused"]) == (1, len(update) - 1), fourth
+    print("Partial roster updates only rescore changed, new and ID-less students")
+
+
+def test_stale_version_and_eviction():
+    state = RosterState(max_students=2)
+    state.store("a", b"f1", "v1", {"p": 1})
+    assert state.lookup("a", b"f1", "v1") == {"p": 1}
+    assert state.lookup("a", b"f2", "v1") is None  # inputs changed
+    assert state.lookup("a", b"f1", "v2") is None  # scored by an older model
+
+    state.store("b", b"f1", "v1", {"p": 2})
+    state.store("a", b"f1", "v1", {"p": 1})  # a is now the most recent
+    state.store("c", b"f1", "v1", {"p": 3})  # evicts b
+    assert state.lookup("b", b"f1", "v1") is None and state.lookup("a", b"f1", "v1") is not None
+    assert state.stats() == {"students": 2, "max_students": 2, "evictions": 1}
+    print("Results from another model version are not reused; the oldest student is evicted")
+
+
+if __name__ == "__main__":
+    test_partial_update_counts()
+    test_stale_version_and_eviction()
@@ -1,12 +1,15 @@
+import argparse
 import json
 import os
 import pickle
+import time
+from concurrent.futures import as_completed
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 import tensorflow as tf
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.utils.class_weight import compute_class_weight
 from tensorflow.keras.layers import (
@@ -19,7 +22,12 @@ from tensorflow.keras.layers import (
     Input,
 )
 from tensorflow.keras.models import Model
-from tensorflow.keras.preprocessing.text import Tokenizer
+
+from dataset_cache import entry_dir, load_or_build
+from dmsw_engine import export_npz
+from dmsw_records import make_dataset, write_shards
+from vocab import Vocabulary
+from worker_pool import core_groups, pinned_pool
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -27,9 +35,11 @@ from tensorflow.keras.preprocessing.text import Tokenizer
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "dmsw_student_data.csv")
 MODEL_FILE = os.path.join(BASE_DIR, "dmsw_model.h5")
-TOKENIZER_FILE = os.path.join(BASE_DIR, "dmsw_tokenizer.pkl")
+WEIGHTS_FILE = os.path.join(BASE_DIR, "dmsw_model.npz")
+VOCAB_FILE = os.path.join(BASE_DIR, "dmsw_vocab.json")
 SCALER_FILE = os.path.join(BASE_DIR, "dmsw_scaler.pkl")
 METADATA_FILE = os.path.join(BASE_DIR, "model_metadata.json")
+CV_REPORT_FILE = os.path.join(BASE_DIR, "cv_report.json")  # not a serving artifact
 
 MAX_LEN = 15
 EMBEDDING_DIM = 50
@@ -37,84 +47,89 @@ VOCAB_SIZE = 1000
 EPOCHS = 30        # Increased from 10; early stopping will prevent overfitting
 BATCH_SIZE = 32
 PATIENCE = 5       # Early stopping patience
+FILTERS = 32       # Conv1D filters per kernel size, in both branches
+KERNEL_SIZES = (3, 5)
+CV_FOLDS = 5       # Default folds for --folds without a value
+
+# Preprocessed tensors are cached as memory-mapped .npy files (see dataset_cache.py)
+DATASET_CACHE = os.environ.get("DMSW_DATASET_CACHE", "1") == "1"
+
+# Streaming mode: train from TFRecord shards through tf.data instead of
+# in-memory arrays (see dmsw_records.py); requires the tensor cache
+STREAMING = os.environ.get("DMSW_STREAMING", "0") == "1"
+SHUFFLE_BUFFER = int(os.environ.get("DMSW_SHUFFLE_BUFFER", "10000"))
+RECORDS_PER_SHARD = int(os.environ.get("DMSW_RECORDS_PER_SHARD", "4096"))
 
+NUM_COLS = ["attendance", "grade"]
+STATIC_COLS = [
+    "age", "gender", "scholarship", "debt",
+    "tuition_up_to_date", "courses_enrolled", "courses_passed",
+]
 
-def load_data():
+
+def load_data(data_file=DATA_FILE):
     print("Loading data...")
-    df = pd.read_csv(DATA_FILE)
-    print(f"  Loaded {len(df)} rows from {DATA_FILE}")
+    df = pd.read_csv(data_file)
+    print(f"  Loaded {len(df)} rows from {data_file}")
     return df
 
 
-def preprocess_data(df):
-    print("Preprocessing data...")
+def build_windows(df, vocab):
+    """
+    Raw (unscaled) [X_num, X_text, X_static] windows and labels for every
+    student with at least MAX_LEN weeks, tokenized with ``vocab``.
+
+    Vectorized: rows are sorted once by (student, week) and scattered into
+    (students, MAX_LEN) arrays by their position within the student, so the
+    cost is linear in the number of rows. Students keep their order of first
+    appearance; static features and the label come from each student's
+    earliest week.
+    """
+    codes, students = pd.factorize(df["student_id"])  # rows without an ID get -1
+    order = np.lexsort((df["week"].to_numpy(), codes))
+    order = order[codes[order] >= 0]
+    codes = codes[order]
+
+    # Position of every sorted row within its student's weeks
+    counts = np.bincount(codes, minlength=len(students))
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(order)) - starts[codes]
+    in_window = position < MAX_LEN
+    complete = counts >= MAX_LEN
 
-    students = df["student_id"].unique()
-    X_num = []
-    X_text = []
-    X_static = []
-    y = []
+    print(f"  Processing {len(students)} students...")
 
-    # Tokenizer for text
-    tokenizer = Tokenizer(num_words=VOCAB_SIZE, oov_token="<OOV>")
-    tokenizer.fit_on_texts(df["behavior_text"].astype(str))
+    rows, cols = codes[in_window], position[in_window]
+    window_rows = order[in_window]
 
-    with open(TOKENIZER_FILE, "wb") as f:
-        pickle.dump(tokenizer, f)
+    numeric = df[NUM_COLS].to_numpy()
+    X_num = np.zeros((len(students), MAX_LEN, len(NUM_COLS)), dtype=numeric.dtype)
+    X_num[rows, cols] = numeric[window_rows]
 
-    print(f"  Processing {len(students)} students...")
-    skipped = 0
-
-    for student in students:
-        student_df = df[df["student_id"] == student].sort_values("week")
-
-        if len(student_df) < MAX_LEN:
-            skipped += 1
-            continue
-
-        # Numerical: [attendance, grade]
-        num_data = student_df[["attendance", "grade"]].values[:MAX_LEN]
-        X_num.append(num_data)
-
-        # Textual: first token per week
-        text_data = student_df["behavior_text"].astype(str).tolist()[:MAX_LEN]
-        seqs = tokenizer.texts_to_sequences(text_data)
-
-        student_text_seq = []
-        for s in seqs:
-            student_text_seq.append(s[0] if s else 0)
-
-        # Pad/Truncate to MAX_LEN
-        if len(student_text_seq) > MAX_LEN:
-            student_text_seq = student_text_seq[:MAX_LEN]
-        else:
-            student_text_seq = student_text_seq + [0] * (MAX_LEN - len(student_text_seq))
-
-        X_text.append(student_text_seq)
-
-        # Static features (from first row)
-        first_row = student_df.iloc[0]
-        static_feats = [
-            first_row["age"],
-            first_row["gender"],
-            first_row["scholarship"],
-            first_row["debt"],
-            first_row["tuition_up_to_date"],
-            first_row["courses_enrolled"],
-            first_row["courses_passed"],
-        ]
-        X_static.append(static_feats)
-
-        # Label
-        y.append(first_row["dropout_label"])
+    # First token per week; the whole column is tokenized in one call
+    tokens = vocab.first_token_ids(df["behavior_text"].astype(str).to_numpy())
+    X_text = np.zeros((len(students), MAX_LEN), dtype=tokens.dtype)
+    X_text[rows, cols] = tokens[window_rows]
+
+    first_rows = order[starts]
+    X_static = df[STATIC_COLS].to_numpy()[first_rows]
+    y = df["dropout_label"].to_numpy()[first_rows]
 
+    skipped = int((~complete).sum())
     if skipped:
         print(f"  Skipped {skipped} students with < {MAX_LEN} weeks of data")
 
-    X_num = np.array(X_num)
-    X_text = np.array(X_text)
-    X_static = np.array(X_static)
-    y = np.array(y)
+    return [X_num[complete], X_text[complete], X_static[complete]], y[complete]
+
+
+def preprocess_data(df):
+    print("Preprocessing data...")
+
+    # Vocabulary for text
+    behavior_text = df["behavior_text"].astype(str).to_numpy()
+    vocab = Vocabulary.fit(behavior_text, num_words=VOCAB_SIZE, oov_token="<OOV>")
+
+    (X_num, X_text, X_static), y = build_windows(df, vocab)
 
     # Scale numerical data
     num_samples, num_timesteps, num_features = X_num.shape
@@ -124,27 +139,89 @@ def preprocess_data(df):
     X_num_scaled = scaler.fit_transform(X_num_reshaped)
     X_num = X_num_scaled.reshape(num_samples, num_timesteps, num_features)
 
-    with open(SCALER_FILE, "wb") as f:
-        pickle.dump(scaler, f)
-
     print(f"  Final dataset: {len(y)} students | {int(y.sum())} dropout | {int(len(y) - y.sum())} non-dropout")
-    return [X_num, X_text, X_static], y, len(static_feats)
+    return [X_num, X_text, X_static], y, X_static.shape[1], scaler, vocab
+
+
+def dataset_params() -> dict:
+    """Preprocessing parameters that key the tensor cache."""
+    return {"max_len": MAX_LEN, "vocab_size": VOCAB_SIZE}
+
 
+def load_dataset(data_file=DATA_FILE):
+    """
+    Same result as ``preprocess_data(load_data(data_file))``, served from the
+    tensor cache: the arrays are read-only memory maps, rebuilt when the CSV
+    or dataset_params() change. Set DMSW_DATASET_CACHE=0 to bypass it.
+    """
+    if not DATASET_CACHE:
+        return preprocess_data(load_data(data_file))
+
+    def build(out_dir):
+        (X_num, X_text, X_static), y, _, scaler, vocab = preprocess_data(load_data(data_file))
+        vocab.save(os.path.join(out_dir, "vocab.json"))
+        with open(os.path.join(out_dir, "scaler.pkl"), "wb") as f:
+            pickle.dump(scaler, f)
+        return {"X_num": X_num, "X_text": X_text, "X_static": X_static, "y": y}
+
+    arrays, entry_dir, hit = load_or_build(data_file, dataset_params(), build)
+    print(f"Dataset tensors {'loaded from' if hit else 'cached in'} {entry_dir}")
+
+    vocab = Vocabulary.load(os.path.join(entry_dir, "vocab.json"))
+    with open(os.path.join(entry_dir, "scaler.pkl"), "rb") as f:
+        scaler = pickle.load(f)
+    X = [arrays["X_num"], arrays["X_text"], arrays["X_static"]]
+    return X, arrays["y"], X[2].shape[1], scaler, vocab
+
+
+def dataset_entry_dir(data_file=DATA_FILE) -> str:
+    """Tensor cache entry directory of ``data_file`` with dataset_params()."""
+    return entry_dir(data_file, dataset_params())
+
+
+def split_train_test(y):
+    """Stratified 80/20 split of the sample indices -> (train_idx, test_idx)."""
+    indices = np.arange(len(y))
+    train_idx, test_idx = train_test_split(indices, test_size=0.2, random_state=42, stratify=y)
+    return train_idx, test_idx
+
+
+def check_folds(y, folds: int):
+    """Raise ValueError unless ``y`` can be split into ``folds`` stratified folds."""
+    if folds < 2:
+        raise ValueError(f"cross-validation needs at least 2 folds, got {folds}")
+    classes, counts = np.unique(y, return_counts=True)
+    if len(classes) < 2:
+        raise ValueError("cross-validation needs students of both classes")
+    if folds > counts.min():
+        raise ValueError(f"{folds} folds need at least {folds} students per class; "
+                         f"class {classes[counts.argmin()]} has {counts.min()}")
+
+
+def kfold_splits(y, folds: int = CV_FOLDS) -> list[tuple]:
+    """Stratified, shuffled k-fold (train_idx, val_idx) pairs of the sample indices."""
+    check_folds(y, folds)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def build_dmsw_model(vocab_size, num_static_features, embedding_dim=EMBEDDING_DIM,
+                     filters=FILTERS, kernel_sizes=KERNEL_SIZES):
+    small_kernel, large_kernel = kernel_sizes
 
-def build_dmsw_model(vocab_size, num_static_features):
     # --- Branch 1: Numerical (Multiscale Sliding Window) ---
     input_num = Input(shape=(MAX_LEN, 2), name="numerical_input")
-    conv_num_1 = Conv1D(filters=32, kernel_size=3, activation="relu", padding="same")(input_num)
+    conv_num_1 = Conv1D(filters=filters, kernel_size=small_kernel, activation="relu", padding="same")(input_num)
     pool_num_1 = GlobalMaxPooling1D()(conv_num_1)
-    conv_num_2 = Conv1D(filters=32, kernel_size=5, activation="relu", padding="same")(input_num)
+    conv_num_2 = Conv1D(filters=filters, kernel_size=large_kernel, activation="relu", padding="same")(input_num)
     pool_num_2 = GlobalMaxPooling1D()(conv_num_2)
 
     # --- Branch 2: Textual (Dual-Modal) ---
     input_text = Input(shape=(MAX_LEN,), name="text_input")
-    embedding = Embedding(input_dim=vocab_size, output_dim=EMBEDDING_DIM)(input_text)
-    conv_text_1 = Conv1D(filters=32, kernel_size=3, activation="relu", padding="same")(embedding)
+    embedding = Embedding(input_dim=vocab_size, output_dim=embedding_dim)(input_text)
+    conv_text_1 = Conv1D(filters=filters, kernel_size=small_kernel, activation="relu", padding="same")(embedding)
     pool_text_1 = GlobalMaxPooling1D()(conv_text_1)
-    conv_text_2 = Conv1D(filters=32, kernel_size=5, activation="relu", padding="same")(embedding)
+    conv_text_2 = Conv1D(filters=filters, kernel_size=large_kernel, activation="relu", padding="same")(embedding)
     pool_text_2 = GlobalMaxPooling1D()(conv_text_2)
 
     # --- Branch 3: Static ---
@@ -162,25 +239,160 @@ def build_dmsw_model(vocab_size, num_static_features):
     return model
 
 
-def train_model():
-    df = load_data()
-    X, y, num_static = preprocess_data(df)
+def _streaming_inputs(X, y, train_idx, test_idx):
+    """
+    (train, test) tf.data pipelines over TFRecord shards of the two splits.
+    The test pipeline keeps ``test_idx`` order, so its labels are y[test_idx].
+    """
+    entry = dataset_entry_dir()
+    manifest = write_shards(X, y, {"train": train_idx, "test": test_idx}, entry, RECORDS_PER_SHARD)
+    print(f"  Streaming from {len(manifest['splits']['train']['shards'])} train / "
+          f"{len(manifest['splits']['test']['shards'])} test shards "
+          f"(shuffle buffer {SHUFFLE_BUFFER})")
+    train_ds = make_dataset(entry, manifest, "train", BATCH_SIZE, shuffle_buffer=SHUFFLE_BUFFER, seed=42)
+    test_ds = make_dataset(entry, manifest, "test", BATCH_SIZE)
+    return train_ds, test_ds
+
+
+class IndexedBatches(tf.keras.utils.Sequence):
+    """
+    Batches of ``X`` / ``y`` rows selected by ``indices``, read from the
+    (memory-mapped) arrays one batch at a time instead of copying the split.
+    With ``shuffle`` the order is reshuffled every epoch; each batch's rows
+    are read in ascending order, which keeps memmap reads sequential.
+    """
+
+    def __init__(self, X, y, indices, batch_size, shuffle=False, seed=42):
+        super().__init__()
+        self.X, self.y = X, y
+        self.indices = np.asarray(indices)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+        self._order = self._rng.permutation(self.indices) if shuffle else self.indices
+
+    def __len__(self):
+        return -(-len(self.indices) // self.batch_size)
+
+    def __getitem__(self, batch):
+        rows = np.sort(self._order[batch * self.batch_size:(batch + 1) * self.batch_size])
+        return tuple(x[rows] for x in self.X), self.y[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._order = self._rng.permutation(self.indices)
+
+
+def class_weights(y_train) -> dict:
+    """Balanced class weights, class label -> weight."""
+    unique_classes = np.unique(y_train)
+    weights = compute_class_weight("balanced", classes=unique_classes, y=y_train)
+    return {int(c): w for c, w in zip(unique_classes, weights)}
 
-    # --- Train / test split ---
-    indices = np.arange(len(y))
-    train_idx, test_idx, y_train, y_test = train_test_split(
-        indices, y, test_size=0.2, random_state=42, stratify=y
+
+def binary_metrics(y_true, y_pred_prob) -> dict:
+    """Confusion matrix, precision, recall and F1 at the 0.5 threshold."""
+    y_pred = (np.asarray(y_pred_prob).reshape(-1) >= 0.5).astype(int)
+    y_true = np.asarray(y_true)
+
+    tp = int(np.sum((y_pred == 1) & (y_true == 1)))
+    fp = int(np.sum((y_pred == 1) & (y_true == 0)))
+    fn = int(np.sum((y_pred == 0) & (y_true == 1)))
+    tn = int(np.sum((y_pred == 0) & (y_true == 0)))
+
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+        "confusion_matrix": {"TP": tp, "FP": fp, "FN": fn, "TN": tn},
+    }
+
+
+def fit_and_evaluate(X, y, num_static, train_idx, test_idx, hyperparameters=None, verbose=0):
+    """
+    Train a DMSW model on ``train_idx`` with early stopping on ``test_idx``
+    and score it there. ``hyperparameters`` overrides epochs, batch_size,
+    embedding_dim, filters and kernel_sizes. Returns (model, results).
+    """
+    hp = {
+        "epochs": EPOCHS,
+        "batch_size": BATCH_SIZE,
+        "embedding_dim": EMBEDDING_DIM,
+        "filters": FILTERS,
+        "kernel_sizes": list(KERNEL_SIZES),
+        **(hyperparameters or {}),
+    }
+    # Both splits are read from X batch by batch instead of being copied;
+    # the test rows are sorted so predictions line up with y_test
+    train_data = IndexedBatches(X, y, train_idx, hp["batch_size"], shuffle=True)
+    test_data = IndexedBatches(X, y, np.sort(test_idx), 1024)
+    y_train, y_test = y[train_idx], y[test_data.indices]
+    class_weight_dict = class_weights(y_train)
+
+    tf.keras.utils.set_random_seed(42)
+    model = build_dmsw_model(
+        VOCAB_SIZE, num_static,
+        embedding_dim=hp["embedding_dim"], filters=hp["filters"], kernel_sizes=hp["kernel_sizes"],
     )
+    early_stop = tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=PATIENCE, restore_best_weights=True)
+
+    started = time.perf_counter()
+    history = model.fit(
+        train_data,
+        epochs=hp["epochs"],
+        validation_data=test_data,
+        class_weight=class_weight_dict,
+        callbacks=[early_stop],
+        verbose=verbose,
+    )
+    train_seconds = time.perf_counter() - started
+
+    loss, acc = model.evaluate(test_data, verbose=0)
+    scores = binary_metrics(y_test, model.predict(test_data, verbose=0))
+    return model, {
+        "hyperparameters": hp,
+        "train_samples": len(y_train),
+        "test_samples": len(y_test),
+        "accuracy": round(float(acc), 4),
+        "loss": round(float(loss), 4),
+        "precision": round(scores["precision"], 4),
+        "recall": round(scores["recall"], 4),
+        "f1_score": round(scores["f1_score"], 4),
+        "confusion_matrix": scores["confusion_matrix"],
+        "epochs_completed": len(history.history["loss"]),
+        "train_seconds": round(train_seconds, 2),
+        "class_weights": {str(k): round(v, 4) for k, v in class_weight_dict.items()},
+    }
+
+
+def train_model():
+    if STREAMING and not DATASET_CACHE:
+        raise SystemExit("DMSW_STREAMING=1 needs the tensor cache (unset DMSW_DATASET_CACHE=0)")
 
-    X_train = [x[train_idx] for x in X]
-    X_test = [x[test_idx] for x in X]
+    X, y, num_static, scaler, vocab = load_dataset()
+    vocab.save(VOCAB_FILE)
+    with open(SCALER_FILE, "wb") as f:
+        pickle.dump(scaler, f)
+
+    # --- Train / test split ---
+    train_idx, test_idx = split_train_test(y)
+    y_train, y_test = y[train_idx], y[test_idx]
 
     print(f"\nTraining on {len(y_train)} samples, testing on {len(y_test)} samples")
+    if STREAMING:
+        train_data, test_data = _streaming_inputs(X, y, train_idx, test_idx)
+        fit_args = {"x": train_data, "validation_data": test_data}
+    else:
+        X_train = [x[train_idx] for x in X]
+        test_data = [x[test_idx] for x in X]
+        fit_args = {"x": X_train, "y": y_train, "batch_size": BATCH_SIZE,
+                    "validation_data": (test_data, y_test)}
 
     # --- Class weights to handle imbalance ---
-    unique_classes = np.unique(y_train)
-    class_weights_array = compute_class_weight("balanced", classes=unique_classes, y=y_train)
-    class_weight_dict = {int(c): w for c, w in zip(unique_classes, class_weights_array)}
+    class_weight_dict = class_weights(y_train)
     print(f"  Class weights: {class_weight_dict}")
 
     # --- Build model ---
@@ -203,34 +415,27 @@ def train_model():
 
     # --- Train ---
     history = model.fit(
-        X_train,
-        y_train,
+        **fit_args,
         epochs=EPOCHS,
-        batch_size=BATCH_SIZE,
-        validation_data=(X_test, y_test),
         class_weight=class_weight_dict,
         callbacks=[early_stop, checkpoint],
     )
 
     # --- Evaluate ---
-    loss, acc = model.evaluate(X_test, y_test, verbose=0)
+    if STREAMING:
+        loss, acc = model.evaluate(test_data, verbose=0)
+    else:
+        loss, acc = model.evaluate(test_data, y_test, verbose=0)
     print(f"\n{'='*50}")
     print(f"Test Accuracy : {acc*100:.2f}%")
     print(f"Test Loss     : {loss:.4f}")
     print(f"{'='*50}")
 
     # --- Extended metrics ---
-    y_pred_prob = model.predict(X_test, verbose=0).flatten()
-    y_pred = (y_pred_prob >= 0.5).astype(int)
-
-    tp = int(np.sum((y_pred == 1) & (y_test == 1)))
-    fp = int(np.sum((y_pred == 1) & (y_test == 0)))
-    fn = int(np.sum((y_pred == 0) & (y_test == 1)))
-    tn = int(np.sum((y_pred == 0) & (y_test == 0)))
-
-    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    y_pred_prob = model.predict(test_data, verbose=0).flatten()
+    scores = binary_metrics(y_test, y_pred_prob)
+    precision, recall, f1 = scores["precision"], scores["recall"], scores["f1_score"]
+    tp, fp, fn, tn = (scores["confusion_matrix"][k] for k in ("TP", "FP", "FN", "TN"))
 
     print(f"\nConfusion Matrix:")
     print(f"  TP={tp}  FP={fp}")
@@ -243,6 +448,7 @@ def train_model():
     metadata = {
         "trained_at": datetime.utcnow().isoformat() + "Z",
         "dataset_file": os.path.basename(DATA_FILE),
+        "input_pipeline": "tf.data (TFRecord shards)" if STREAMING else "in-memory arrays",
         "total_students": len(y),
         "train_samples": len(y_train),
         "test_samples": len(y_test),
@@ -266,6 +472,111 @@ def train_model():
     # Model is already saved by ModelCheckpoint callback (best weights)
     print(f"Best model saved to {MODEL_FILE}")
 
+    # Flat weights for the TensorFlow-free NumPy serving engine, with the
+    # scaler and behaviour-phrase tokens folded in (no pickles at serve time)
+    export_npz(model, WEIGHTS_FILE, scaler=scaler, vocab=vocab)
+    print(f"NumPy engine weights exported to {WEIGHTS_FILE} (fused preprocessing)")
+
+
+# ---------------------------------------------------------------------------
+# K-fold cross-validation
+# ---------------------------------------------------------------------------
+CV_METRICS = ("accuracy", "precision", "recall", "f1_score", "loss")
+
+
+def _train_fold(fold: int, train_idx, val_idx) -> dict:
+    """Train and score one fold (runs in a pool worker)."""
+    X, y, num_static, _, _ = load_dataset()  # memory maps of the shared cache entry
+    _, results = fit_and_evaluate(X, y, num_static, train_idx, val_idx)
+    results["fold"] = fold
+    return results
+
+
+def cross_validate(folds: int = CV_FOLDS, threads_per_worker: int = 1, report_file: str = CV_REPORT_FILE) -> dict:
+    """
+    Stratified k-fold cross-validation with the folds trained concurrently,
+    one pinned worker process per fold (fewer when there are not enough
+    cores). Every worker memory-maps the same cached tensors and reads its
+    fold rows from them batch by batch. The summary is written to
+    ``report_file`` (not the model metadata, which the API's artifact
+    watcher fingerprints) and returned. Raises ValueError (see check_folds)
+    before any worker starts when ``y`` cannot be split into ``folds``.
+    """
+    if not DATASET_CACHE:
+        print("Warning: DMSW_DATASET_CACHE=0, every fold preprocesses the CSV itself")
+    _, y, _, _, _ = load_dataset()  # builds the cache entry once, before the workers open it
+    splits = kfold_splits(y, folds)
+
+    threads = max(1, threads_per_worker)
+    groups = core_groups(threads, folds)
+    print(f"\n{folds}-fold cross-validation on {len(y)} students, {len(groups)} workers x {threads} cores")
+
+    started = time.perf_counter()
+    per_fold = []
+    with pinned_pool(groups, threads) as pool:
+        futures = [pool.submit(_train_fold, fold, train_idx, val_idx)
+                   for fold, (train_idx, val_idx) in enumerate(splits, start=1)]
+        for future in as_completed(futures):
+            result = future.result()
+            per_fold.append(result)
+            print(f"  fold {result['fold']}: accuracy={result['accuracy']:.4f} "
+                  f"F1={result['f1_score']:.4f} ({result['train_seconds']:.1f}s)", flush=True)
+    wall_seconds = time.perf_counter() - started
+    per_fold.sort(key=lambda r: r["fold"])
+
+    values = {m: np.array([r[m] for r in per_fold], dtype=np.float64) for m in CV_METRICS}
+    summary = {
+        "evaluated_at": datetime.utcnow().isoformat() + "Z",
+        "dataset_file": os.path.basename(DATA_FILE),
+        "folds": folds,
+        "stratified": True,
+        "hyperparameters": per_fold[0]["hyperparameters"],
+        # Sample standard deviation across folds
+        "mean": {m: round(float(v.mean()), 4) for m, v in values.items()},
+        "std": {m: round(float(v.std(ddof=1)), 4) for m, v in values.items()},
+        "confusion_matrix_total": {
+            k: sum(r["confusion_matrix"][k] for r in per_fold) for k in ("TP", "FP", "FN", "TN")
+        },
+        "per_fold": [
+            {k: r[k] for k in ("fold", "train_samples", "test_samples") + CV_METRICS
+             + ("confusion_matrix", "epochs_completed", "train_seconds")}
+            for r in per_fold
+        ],
+        "workers": len(groups),
+        "threads_per_worker": threads,
+        "wall_seconds": round(wall_seconds, 2),
+        "serial_train_seconds": round(sum(r["train_seconds"] for r in per_fold), 2),
+    }
+
+    with open(report_file, "w") as f:
+        json.dump(summary, f, indent=2)
+        f.write("\n")
+
+    print(f"\n{'='*50}")
+    for m in CV_METRICS:
+        print(f"{m:<10}: {summary['mean'][m]:.4f} ± {summary['std'][m]:.4f}")
+    print(f"{'='*50}")
+    print(f"Wall time {wall_seconds:.1f}s for {summary['serial_train_seconds']:.1f}s of fold training")
+    print(f"Cross-validation results saved to {report_file}")
+    return summary
+
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the DMSW model, or cross-validate it with --folds.")
+    parser.add_argument("--folds", type=int, nargs="?", const=CV_FOLDS,
+                        help=f"Run stratified k-fold cross-validation instead of training (default {CV_FOLDS} folds)")
+    parser.add_argument("--threads-per-worker", type=int, default=1,
+                        help="Cores (and TensorFlow threads) per fold worker (default 1)")
+    parser.add_argument("--cv-report", default=CV_REPORT_FILE,
+                        help="Where --folds writes its results (default cv_report.json)")
+    args = parser.parse_args()
+    if args.folds is not None and args.folds < 2:
+        parser.error(f"--folds must be at least 2, got {args.folds}")
+    if args.folds is not None:
+        try:
+            check_folds(load_dataset()[1], args.folds)
+        except ValueError as e:
+            parser.error(str(e))
+        cross_validate(args.folds, args.threads_per_worker, args.cv_report)
+    else:
+        train_model()
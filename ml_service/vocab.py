@@ -0,0 +1,165 @@
+"""
+Compact vocabulary index for the DMSW text branch.
+
+Replaces the pickled Keras ``Tokenizer``. The vocabulary is a JSON file that
+lists the words in index order plus the few settings tokenization needs, and
+``Vocabulary.first_token_ids`` maps a whole array of behaviour strings to
+their first-token IDs in one call: each distinct string is tokenized once and
+every other occurrence is a dictionary hit. Tokenization and indexing follow the Keras
+``Tokenizer`` exactly, so IDs from a migrated pickle are unchanged.
+
+Usage:
+  python vocab.py migrate [tokenizer.pkl] [vocab.json]   — convert a pickled Keras Tokenizer
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DMSW_VOCAB_PATH = os.path.join(BASE_DIR, "dmsw_vocab.json")
+DMSW_TOKENIZER_PATH = os.path.join(BASE_DIR, "dmsw_tokenizer.pkl")
+
+VOCAB_FORMAT_VERSION = 1
+
+# Keras Tokenizer defaults
+DEFAULT_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+
+class Vocabulary:
+    """Word index with Keras ``Tokenizer`` semantics (word-level only)."""
+
+    def __init__(self, words: list[str], num_words: int = None, oov_token: str = None,
+                 lower: bool = True, filters: str = DEFAULT_FILTERS, split: str = " "):
+        self.words = list(words)  # words[i] has ID i + 1; ID 0 is padding
+        self.word_index = {w: i for i, w in enumerate(self.words, start=1)}
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.oov_index = self.word_index.get(oov_token) if oov_token is not None else None
+        self.lower = lower
+        self.filters = filters
+        self.split = split
+        self._translate = str.maketrans({c: split for c in filters})
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def fit(cls, texts, num_words: int = None, oov_token: str = None) -> "Vocabulary":
+        """Build the index from ``texts`` the way ``Tokenizer.fit_on_texts`` does."""
+        vocab = cls([], num_words=num_words, oov_token=oov_token)
+        # Each distinct text is tokenized once; Counter keeps first-appearance
+        # order, which decides ties between equally frequent words
+        counts = {}
+        for text, n in Counter(map(str, texts)).items():
+            for word in vocab._words_of(text):
+                counts[word] = counts.get(word, 0) + n
+
+        ranked = sorted(counts, key=counts.get, reverse=True)
+        words = ([oov_token] if oov_token is not None else []) + ranked
+        return cls(words, num_words=num_words, oov_token=oov_token)
+
+    @classmethod
+    def from_keras(cls, tokenizer) -> "Vocabulary":
+        """Convert a fitted Keras ``Tokenizer`` (word-level, default analyzer)."""
+        if tokenizer.char_level or getattr(tokenizer, "analyzer", None) is not None:
+            raise ValueError("Only word-level tokenizers with the default analyzer can be converted")
+        words = [w for w, _ in sorted(tokenizer.word_index.items(), key=lambda item: item[1])]
+        return cls(words, num_words=tokenizer.num_words, oov_token=tokenizer.oov_token,
+                   lower=tokenizer.lower, filters=tokenizer.filters, split=tokenizer.split)
+
+    @classmethod
+    def load(cls, path: str = DMSW_VOCAB_PATH) -> "Vocabulary":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.get("format_version", 0)
+        if version != VOCAB_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vocabulary format version {version}")
+        return cls(data["words"], num_words=data.get("num_words"), oov_token=data.get("oov_token"),
+                   lower=data.get("lower", True), filters=data.get("filters", DEFAULT_FILTERS),
+                   split=data.get("split", " "))
+
+    def save(self, path: str = DMSW_VOCAB_PATH) -> str:
+        data = {
+            "format_version": VOCAB_FORMAT_VERSION,
+            "num_words": self.num_words,
+            "oov_token": self.oov_token,
+            "lower": self.lower,
+            "filters": self.filters,
+            "split": self.split,
+            "words": self.words,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+            f.write("\n")
+        return path
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def _words_of(self, text: str) -> list[str]:
+        if self.lower:
+            text = text.lower()
+        return [w for w in text.translate(self._translate).split(self.split) if w]
+
+    def _token_id(self, word: str):
+        """ID of one word, the OOV ID, or None when the word is dropped."""
+        i = self.word_index.get(word)
+        if i is not None and not (self.num_words and i >= self.num_words):
+            return i
+        return self.oov_index
+
+    def first_token_id(self, text: str) -> int:
+        """ID of the first kept token of ``text`` (0 when there is none)."""
+        for word in self._words_of(text):
+            i = self._token_id(word)
+            if i is not None:
+                return i
+        return 0
+
+    def first_token_ids(self, texts) -> np.ndarray:
+        """First-token ID of every string in ``texts`` (any shape), as int64."""
+        texts = np.asarray(texts, dtype=object)
+        # Memoized per distinct string: a hash lookup per element instead of
+        # sorting the column (np.unique), which dominates on million-row inputs
+        memo = {}
+
+        def token_id(text):
+            i = memo.get(text)
+            if i is None:
+                i = memo[text] = self.first_token_id(text)
+            return i
+
+        ids = np.fromiter(map(token_id, map(str, texts.ravel().tolist())), dtype=np.int64, count=texts.size)
+        return ids.reshape(texts.shape)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "migrate":
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 1
+
+    tokenizer_path = argv[1] if len(argv) > 1 else DMSW_TOKENIZER_PATH
+    vocab_path = argv[2] if len(argv) > 2 else DMSW_VOCAB_PATH
+
+    import pickle
+
+    with open(tokenizer_path, "rb") as f:
+        tokenizer = pickle.load(f)
+    vocab = Vocabulary.from_keras(tokenizer)
+    vocab.save(vocab_path)
+    print(f"Migrated {tokenizer_path} -> {vocab_path} ({len(vocab)} words)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""
+Process pools of CPU-pinned TensorFlow workers, for running several
+training jobs side by side (hyperparameter sweeps, k-fold folds).
+
+Each worker takes its own disjoint group of cores, pins itself to it and
+caps TensorFlow's thread pools to the group size, so concurrent trainings
+do not oversubscribe the machine. Workers are spawned rather than forked,
+so they start without the parent's TensorFlow state.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def core_groups(threads_per_worker: int, workers: int = None) -> list[list[int]]:
+    """Disjoint groups of ``threads_per_worker`` usable cores, one per worker."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    count = max(1, len(cores) // threads_per_worker)
+    if workers is not None:
+        count = min(count, workers)
+    return [cores[i * threads_per_worker:(i + 1) * threads_per_worker] or cores for i in range(count)]
+
+
+def worker_cores() -> list[int] | None:
+    """Cores the calling process may run on (None where affinity is not supported)."""
+    return sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+
+
+def _init_worker(groups, threads: int):
+    """Pin this worker to a free core group and cap TensorFlow's thread pools."""
+    cores = groups.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    import tensorflow as tf
+
+    tf.get_logger().setLevel("ERROR")
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+
+def pinned_pool(groups: list[list[int]], threads: int) -> ProcessPoolExecutor:
+    """A pool with one spawned worker per core group of ``groups``."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    for group in groups:
+        queue.put(group)
+    return ProcessPoolExecutor(max_workers=len(groups), mp_context=context,
+                               initializer=_init_worker, initargs=(queue, threads))